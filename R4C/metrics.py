@@ -0,0 +1,317 @@
+"""
+metrics.py
+
+This module contains the in-process metrics of R4C and their export
+in the Prometheus text format.
+
+Metrics are kept in memory of the worker process; every process exposes
+its own values on /metrics and Prometheus aggregates them.
+
+SQL queries are counted by a database execute wrapper installed on every
+connection. The wrapper records into the statistics of the current request,
+which are held in a context variable, so queries run by async views through
+sync_to_async are attributed to the right request as well.
+
+Classes:
+- Counter: A monotonically increasing value per label set.
+- Histogram: Distribution of observed values per label set.
+- Registry: A set of metrics rendered together.
+- RequestStats: SQL statistics of one request.
+
+Functions:
+- start_request: Starts collecting the SQL statistics of a request.
+- finish_request: Stops collecting the SQL statistics of a request.
+- install_query_wrapper: Installs the SQL wrapper on a database connection.
+- instrument_handler: Decorator that measures the time of a signal handler.
+- render: Renders all metrics in the Prometheus text format.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+
+# Latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Buckets for the number of SQL queries of a request
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Response size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    A monotonically increasing value per label set.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Text of the HELP line.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """
+        Increases the value of a label set.
+
+        Args:
+            amount (float): The increment.
+            labels: Label values.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """
+        Returns the lines of the metric values.
+
+        Returns:
+            list: Lines in the Prometheus text format.
+        """
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in values]
+
+
+class Histogram:
+    """
+    Distribution of observed values per label set.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Text of the HELP line.
+        buckets (tuple): Upper bounds of the buckets, in increasing order.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        # label set -> [counts per bucket + the +Inf bucket, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """
+        Records an observed value.
+
+        Args:
+            value (float): The observed value.
+            labels: Label values.
+        """
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        """
+        Returns the lines of the buckets, the sum and the count of every label set.
+
+        Returns:
+            list: Lines in the Prometheus text format.
+        """
+        with self._lock:
+            values = sorted((key, (list(c), s)) for key, (c, s) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                labels = _format_labels(key + (("le", bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    A set of metrics rendered together.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """
+        Adds a metric to the registry.
+
+        Args:
+            metric: A Counter or a Histogram.
+
+        Returns:
+            The registered metric.
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Renders all metrics in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(
+    Counter("r4c_requests_total", "Number of handled requests.")
+)
+REQUEST_DURATION = REGISTRY.register(
+    Histogram("r4c_request_duration_seconds", "Time spent handling a request.")
+)
+REQUEST_QUERIES = REGISTRY.register(
+    Histogram(
+        "r4c_request_queries", "Number of SQL queries run by a request.", QUERY_BUCKETS
+    )
+)
+QUERY_DURATION = REGISTRY.register(
+    Counter("r4c_db_query_seconds_total", "Time spent in SQL queries.")
+)
+RESPONSE_SIZE = REGISTRY.register(
+    Histogram(
+        "r4c_response_size_bytes",
+        "Size of non-streaming response bodies.",
+        SIZE_BUCKETS,
+    )
+)
+HANDLER_DURATION = REGISTRY.register(
+    Histogram("r4c_signal_handler_duration_seconds", "Time spent in signal handlers.")
+)
+
+
+@dataclass
+class RequestStats:
+    """
+    SQL statistics of one request.
+
+    Attributes:
+        queries (int): Number of run queries.
+        query_time (float): Time spent in the queries, in seconds.
+    """
+
+    queries: int = 0
+    query_time: float = 0.0
+
+
+_current_stats = contextvars.ContextVar("r4c_request_stats", default=None)
+
+
+def start_request():
+    """
+    Starts collecting the SQL statistics of a request.
+
+    Returns:
+        tuple: The statistics and the token to pass to finish_request.
+    """
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def finish_request(token):
+    """
+    Stops collecting the SQL statistics of a request.
+
+    Args:
+        token: The token returned by start_request.
+    """
+    _current_stats.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - started
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """
+    Installs the SQL wrapper on a database connection.
+
+    Connected to the connection_created signal; the wrapper list outlives
+    reconnections, so the wrapper is added only once.
+
+    Args:
+        sender: The database backend class.
+        connection: The database connection wrapper.
+        kwargs: Additional arguments.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def instrument_handler(handler):
+    """
+    Decorator that measures the time of a signal handler.
+
+    Args:
+        handler: The signal handler.
+
+    Returns:
+        The wrapped handler, reported under its function name.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            HANDLER_DURATION.observe(
+                time.perf_counter() - started, handler=handler.__name__
+            )
+
+    return wrapper
+
+
+def render():
+    """
+    Renders all metrics in the Prometheus text format.
+
+    Returns:
+        str: The exposition text.
+    """
+    return REGISTRY.render()
@@ -0,0 +1,102 @@
+"""
+middleware.py
+
+This module contains the middleware of the R4C project.
+
+Classes:
+- MetricsMiddleware: Records latency, SQL queries and response size of every request.
+"""
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+
+logger = logging.getLogger("R4C.slow_requests")
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL queries and response size of every request.
+
+    Requests are labelled with the name of the resolved URL pattern,
+    so the number of label sets does not grow with the number of URLs.
+    The body of a streaming response is produced after the middleware
+    returns, so its size and queries are not included.
+
+    Requests slower than settings.SLOW_REQUEST_MS milliseconds are logged
+    to the "R4C.slow_requests" logger (0 disables the log).
+    Set settings.METRICS_ENABLED to False to remove the middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, "SLOW_REQUEST_MS", 0)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        connection_created.connect(metrics.install_query_wrapper)
+        for connection in connections.all(initialized_only=True):
+            metrics.install_query_wrapper(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats, token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, stats, duration):
+        """
+        Records the metrics of a handled request.
+
+        Args:
+            request: The request object.
+            response: The response object.
+            stats (RequestStats): SQL statistics of the request.
+            duration (float): Time spent handling the request, in seconds.
+        """
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+
+        metrics.REQUESTS.inc(
+            view=view, method=request.method, status=response.status_code
+        )
+        metrics.REQUEST_DURATION.observe(duration, view=view, method=request.method)
+        metrics.REQUEST_QUERIES.observe(stats.queries, view=view)
+        metrics.QUERY_DURATION.inc(stats.query_time, view=view)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view=view)
+
+        if self.slow_request_ms and duration * 1000 >= self.slow_request_ms:
+            logger.warning(
+                f"Slow request: {request.method} {request.path} ({view}) "
+                f"status={response.status_code} time={duration * 1000:.1f}ms "
+                f"queries={stats.queries} query_time={stats.query_time * 1000:.1f}ms"
+            )
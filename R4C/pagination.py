@@ -0,0 +1,159 @@
+"""
+pagination.py
+
+This module contains pagination helpers shared by the list views.
+
+Classes:
+- HasNextPaginator: Paginator whose pages never run COUNT(*).
+- FastPaginationMixin: ListView mixin that uses HasNextPaginator.
+
+Functions:
+- prefix_range: Builds an index-friendly range filter for a prefix search.
+- estimate_count: Returns a cheap estimate of the number of rows of a table.
+"""
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connection
+from django.db.models import Max
+from django.http import Http404
+
+# Default number of rows on a page
+PAGE_SIZE = 50
+
+
+class HasNextPage(Page):
+    """
+    A page that knows whether a next page exists without knowing the total count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def has_next(self):
+        return self._has_next
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class HasNextPaginator(Paginator):
+    """
+    Paginator whose pages never run COUNT(*).
+
+    A page fetches one extra row to find out whether there is a next page,
+    so the cost of a page does not depend on the size of the table.
+    Pages never use the total count or the number of pages; count and
+    num_pages are inherited and run COUNT(*) only if called explicitly.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return HasNextPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
+
+
+class FastPaginationMixin:
+    """
+    ListView mixin with pagination that skips COUNT(*).
+
+    Set "count_rows = True" on the view to get an exact count
+    and the standard Django paginator instead.
+
+    Attributes:
+        paginate_by: number of rows on a page.
+        count_rows: whether to count the rows of the list.
+    """
+
+    paginate_by = PAGE_SIZE
+    count_rows = False
+
+    def get_paginator(self, queryset, per_page, orphans=0, **kwargs):
+        """
+        Returns the standard paginator if rows are counted, HasNextPaginator otherwise.
+        """
+        if self.count_rows:
+            return super().get_paginator(queryset, per_page, orphans, **kwargs)
+        return HasNextPaginator(queryset, per_page, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginates the queryset; "page=last" is a 404 when rows are not counted,
+        as the last page is unknown without a count.
+        """
+        if not self.count_rows:
+            page = self.kwargs.get(self.page_kwarg) or self.request.GET.get(
+                self.page_kwarg
+            )
+            if page == "last":
+                raise Http404("The last page is not available without a row count.")
+        return super().paginate_queryset(queryset, page_size)
+
+
+def prefix_range(field, prefix):
+    """
+    Builds an index-friendly range filter for a prefix search.
+
+    "field >= prefix AND field < prefix + U+FFFF" is served by a plain B-tree
+    index. It selects the same rows as LIKE 'prefix%' only under a binary
+    collation, where strings sharing a prefix sort next to each other: SQLite's
+    default BINARY collation or "C" on PostgreSQL. Linguistic collations
+    (e.g. en_US.UTF-8) ignore punctuation and case on the first pass and may
+    leave matching rows outside the range. Characters above U+FFFF right after
+    the prefix sort after the upper bound and are not selected either.
+
+    Parameters:
+        field(str): Name of the field.
+        prefix(str): The searched prefix.
+
+    Returns:
+        dict: Keyword arguments for QuerySet.filter().
+    """
+    return {f"{field}__gte": prefix, f"{field}__lt": prefix + "\uffff"}
+
+
+def estimate_count(model):
+    """
+    Returns a cheap estimate of the number of rows of a table.
+
+    On PostgreSQL the planner statistics are used, on other databases
+    the largest primary key, which is a single index lookup.
+
+    Parameters:
+        model: The model class.
+
+    Returns:
+        int: Estimated number of rows.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return model.objects.aggregate(max_pk=Max("pk"))["max_pk"] or 0
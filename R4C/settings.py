@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "R4C.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +56,12 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Request metrics, exposed on /metrics (R4C_METRICS=0 disables them).
+# Requests slower than R4C_SLOW_REQUEST_MS milliseconds are logged
+# to the "R4C.slow_requests" logger; 0 disables the log.
+METRICS_ENABLED = os.environ.get("R4C_METRICS", "1") == "1"
+SLOW_REQUEST_MS = int(os.environ.get("R4C_SLOW_REQUEST_MS", "0"))
+
 ROOT_URLCONF = "R4C.urls"
 TEMPLATES = [
     {
@@ -76,10 +85,98 @@ WSGI_APPLICATION = "R4C.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
-DATABASES = {
+# R4C_DB_ENGINE selects the database profile: "sqlite" (default) or "postgresql";
+# the postgresql profile needs psycopg, an optional dependency (see requirements.txt).
+# Both profiles keep connections open between requests (R4C_DB_CONN_MAX_AGE seconds).
+
+DB_ENGINE = os.environ.get("R4C_DB_ENGINE", "sqlite")
+DB_CONN_MAX_AGE = int(os.environ.get("R4C_DB_CONN_MAX_AGE", "600"))
+
+if DB_ENGINE == "postgresql":
+    # R4C_DB_POOL=1 enables the psycopg connection pool (requires psycopg[pool]);
+    # pooled connections are returned to the pool instead of being kept per thread.
+    # The prefix searches of the list views (R4C.pagination.prefix_range) expect
+    # the database to be created with the "C" collation.
+    DB_POOL = os.environ.get("R4C_DB_POOL", "") == "1"
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("R4C_DB_NAME", "r4c"),
+            "USER": os.environ.get("R4C_DB_USER", "r4c"),
+            "PASSWORD": os.environ.get("R4C_DB_PASSWORD", ""),
+            "HOST": os.environ.get("R4C_DB_HOST", "localhost"),
+            "PORT": os.environ.get("R4C_DB_PORT", "5432"),
+            "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": (
+                    {
+                        "min_size": int(os.environ.get("R4C_DB_POOL_MIN_SIZE", "2")),
+                        "max_size": int(os.environ.get("R4C_DB_POOL_MAX_SIZE", "20")),
+                    }
+                    if DB_POOL
+                    else False
+                ),
+            },
+        }
+    }
+elif DB_ENGINE == "sqlite":
+    # R4C_DB_WAL=1 enables WAL, which lets readers work while a robot batch is
+    # being written; synchronous=NORMAL is safe with WAL and avoids an fsync per
+    # commit. WAL is stored in the database file itself, so it is opt-in and the
+    # committed db.sqlite3 keeps its rollback journal unless a deployment asks.
+    # IMMEDIATE transactions take the write lock up front, so concurrent writers
+    # wait for up to "timeout" seconds instead of failing with "database is locked".
+    DB_WAL = os.environ.get("R4C_DB_WAL", "") == "1"
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("R4C_DB_NAME", os.path.join(BASE_DIR, "db.sqlite3")),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "OPTIONS": {
+                "timeout": int(os.environ.get("R4C_DB_TIMEOUT", "20")),
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    (
+                        "PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;"
+                        if DB_WAL
+                        else ""
+                    )
+                    + f"PRAGMA mmap_size={os.environ.get('R4C_DB_MMAP_SIZE', '268435456')};"
+                    "PRAGMA temp_store=MEMORY;"
+                ),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown R4C_DB_ENGINE: {DB_ENGINE}")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# R4C_CACHE_BACKEND selects the backend: "file" (default), "redis" or "locmem".
+# The versions of the robots table and of the registry are stored in the cache,
+# so every worker process must see the same cache: "locmem" is private to a
+# process and only suits a single worker (the "robots.W001" check warns about it).
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_LOCATIONS = {
+    "locmem": "r4c",
+    "file": os.path.join(BASE_DIR, "cache"),
+    "redis": "redis://127.0.0.1:6379/1",
+}
+CACHE_BACKEND = os.environ.get("R4C_CACHE_BACKEND", "file")
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.environ.get(
+            "R4C_CACHE_LOCATION", CACHE_LOCATIONS[CACHE_BACKEND]
+        ),
     }
 }
 
@@ -0,0 +1,203 @@
+import itertools
+import os
+import runpy
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Customer
+
+from . import metrics
+
+SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "settings.py")
+
+
+def load_settings(**environ):
+    """Executes the settings module with the given R4C_* environment variables."""
+    clean = {name: value for name, value in os.environ.items() if name[:4] != "R4C_"}
+    with mock.patch.dict(os.environ, {**clean, **environ}, clear=True):
+        return runpy.run_path(SETTINGS_PATH)
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    def test_sqlite_is_the_default_profile(self):
+        database = load_settings()["DATABASES"]["default"]
+
+        self.assertEqual(database["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(database["CONN_MAX_AGE"], 600)
+        self.assertEqual(database["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(database["OPTIONS"]["timeout"], 20)
+        self.assertIn("PRAGMA temp_store=MEMORY;", database["OPTIONS"]["init_command"])
+
+    def test_wal_is_opt_in(self):
+        default = load_settings()["DATABASES"]["default"]["OPTIONS"]["init_command"]
+        wal = load_settings(R4C_DB_WAL="1")["DATABASES"]["default"]["OPTIONS"][
+            "init_command"
+        ]
+
+        # both are persistent or only safe together, so they come as a pair
+        for pragma in ("journal_mode=WAL", "synchronous=NORMAL"):
+            self.assertNotIn(pragma, default)
+            self.assertIn(pragma, wal)
+
+    def test_sqlite_options_come_from_the_environment(self):
+        database = load_settings(
+            R4C_DB_NAME="/tmp/r4c.sqlite3",
+            R4C_DB_TIMEOUT="3",
+            R4C_DB_MMAP_SIZE="0",
+            R4C_DB_CONN_MAX_AGE="0",
+        )["DATABASES"]["default"]
+
+        self.assertEqual(database["NAME"], "/tmp/r4c.sqlite3")
+        self.assertEqual(database["OPTIONS"]["timeout"], 3)
+        self.assertIn("PRAGMA mmap_size=0;", database["OPTIONS"]["init_command"])
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+
+    def test_postgresql_keeps_connections_without_pool(self):
+        database = load_settings(R4C_DB_ENGINE="postgresql", R4C_DB_HOST="db")[
+            "DATABASES"
+        ]["default"]
+
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(database["HOST"], "db")
+        self.assertIs(database["OPTIONS"]["pool"], False)
+        self.assertEqual(database["CONN_MAX_AGE"], 600)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+
+    def test_postgresql_pool(self):
+        database = load_settings(
+            R4C_DB_ENGINE="postgresql",
+            R4C_DB_POOL="1",
+            R4C_DB_POOL_MIN_SIZE="1",
+            R4C_DB_POOL_MAX_SIZE="8",
+        )["DATABASES"]["default"]
+
+        self.assertEqual(database["OPTIONS"]["pool"], {"min_size": 1, "max_size": 8})
+        # pooled connections go back to the pool instead of being kept open
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            load_settings(R4C_DB_ENGINE="mysql")
+
+
+class SQLiteConnectionTests(TestCase):
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("The SQLite profile is not in use.")
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        # atomic() starts transactions with BEGIN <transaction_mode>
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_init_command_is_run_on_connect(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA temp_store")
+            # 2 is MEMORY
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+class MetricsTests(SimpleTestCase):
+    def test_counter_and_histogram_rendering(self):
+        registry = metrics.Registry()
+        counter = registry.register(metrics.Counter("c_total", "A counter."))
+        histogram = registry.register(metrics.Histogram("h", "A histogram.", (1, 5)))
+        counter.inc(view='say "hi"')
+        counter.inc(2, view='say "hi"')
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value, view="v")
+
+        self.assertEqual(
+            registry.render(),
+            "# HELP c_total A counter.\n"
+            "# TYPE c_total counter\n"
+            'c_total{view="say \\"hi\\""} 3\n'
+            "# HELP h A histogram.\n"
+            "# TYPE h histogram\n"
+            'h_bucket{view="v",le="1"} 2\n'
+            'h_bucket{view="v",le="5"} 3\n'
+            'h_bucket{view="v",le="+Inf"} 4\n'
+            'h_sum{view="v"} 14.5\n'
+            'h_count{view="v"} 4\n',
+        )
+
+
+class MetricsMiddlewareTests(TestCase):
+    def sample(self, line_start):
+        """Returns the value of a rendered sample, 0 if it was not recorded yet."""
+        for line in metrics.render().splitlines():
+            if line.startswith(line_start + " "):
+                return float(line.rsplit(" ", 1)[1])
+        return 0
+
+    def test_queries_are_counted_per_view(self):
+        Customer.objects.create(email="foo@example.com")
+        view = 'view="customers:customer_list"'
+        requests = self.sample(
+            f'r4c_requests_total{{method="GET",status="200",{view}}}'
+        )
+        queries = self.sample(f"r4c_request_queries_sum{{{view}}}")
+
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("customers:customer_list"))
+
+        self.assertGreater(len(captured), 0)
+        self.assertEqual(
+            self.sample(f'r4c_requests_total{{method="GET",status="200",{view}}}'),
+            requests + 1,
+        )
+        self.assertEqual(
+            self.sample(f"r4c_request_queries_sum{{{view}}}"),
+            queries + len(captured),
+        )
+
+    def test_unresolved_requests_share_a_label(self):
+        before = self.sample(
+            'r4c_requests_total{method="GET",status="404",view="unmatched"}'
+        )
+        self.client.get("/no/such/page/")
+        self.client.get("/no/such/page/either/")
+        self.assertEqual(
+            self.sample(
+                'r4c_requests_total{method="GET",status="404",view="unmatched"}'
+            ),
+            before + 2,
+        )
+
+    def test_metrics_view(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertIn(b"# TYPE r4c_requests_total counter", response.content)
+
+    @override_settings(SLOW_REQUEST_MS=500)
+    def test_slow_requests_are_logged(self):
+        # every clock reading is one second after the previous one
+        clock = itertools.count()
+        with mock.patch("time.perf_counter", side_effect=lambda: next(clock)):
+            with self.assertLogs("R4C.slow_requests", "WARNING") as logs:
+                self.client.get(reverse("metrics"))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Slow request: GET /metrics (metrics) status=200", logs.output[0])
+
+    @override_settings(SLOW_REQUEST_MS=60000)
+    def test_fast_requests_are_not_logged(self):
+        with self.assertNoLogs("R4C.slow_requests"):
+            self.client.get(reverse("metrics"))
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_zero_disables_the_log(self):
+        clock = itertools.count()
+        with mock.patch("time.perf_counter", side_effect=lambda: next(clock)):
+            with self.assertNoLogs("R4C.slow_requests"):
+                self.client.get(reverse("metrics"))
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_can_be_disabled(self):
+        before = metrics.render()
+        self.client.get(reverse("customers:customer_list"))
+        self.assertEqual(metrics.render(), before)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
@@ -17,9 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("robots.urls", namespace="robots")),
     path("customer/", include("customers.urls", namespace="customers")),
     path("order/", include("orders.urls", namespace="orders")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
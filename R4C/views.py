@@ -0,0 +1,34 @@
+"""
+views.py
+
+This module contains the views of the R4C project that do not belong to an application.
+
+Classes:
+- MetricsView: Exposes the metrics in the Prometheus text format.
+"""
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from . import metrics
+
+
+class MetricsView(View):
+    """
+    Exposes the metrics of the worker process in the Prometheus text format.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests from the Prometheus scraper.
+
+        Parameters:
+            request: The request object.
+
+        Returns:
+            HttpResponse: The metrics, or 404 if metrics are disabled.
+        """
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise Http404("Metrics are disabled.")
+        return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
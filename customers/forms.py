@@ -2,7 +2,7 @@ from django import forms
 from django.core.validators import EmailValidator
 from django.core.exceptions import ValidationError
 
-from .models import Customer
+from .models import Customer, normalize_email
 
 
 class CustomerForm(forms.ModelForm):
@@ -31,20 +31,21 @@ class CustomerForm(forms.ModelForm):
         """
         Validate the email field.
 
-        Checks if the entered email already exists in the database.
+        Normalizes the email (strips spaces, lowercases it) and
+        checks if it already exists in the database, case-insensitively.
         If the email already exists, a validation error is raised.
         Also checks if the email is in the correct format.
 
         Returns:
-            str: a verified and valid email.
+            str: a verified, valid and normalized email.
 
         Exceptions:
             ValidationError: if the email already exists or is invalid.
         """
-        email = self.cleaned_data.get("email")
+        email = normalize_email(self.cleaned_data.get("email"))
 
-        # checking email uniqueness
-        if Customer.objects.filter(email=email).exists():
+        # checking email uniqueness (served by the unique index on LOWER(email))
+        if Customer.objects.by_email(email).exists():
             raise ValidationError(
                 "Email уже существует. Пожалуйста, используйте другой email."
             )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_alter_customer_id"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customer",
+            name="email",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
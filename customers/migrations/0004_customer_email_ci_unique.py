@@ -0,0 +1,58 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:56
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def normalize_emails(apps, schema_editor):
+    """
+    Lowercases the stored emails and merges customers that become duplicates.
+
+    Orders and waitlist entries of a duplicate are moved to the oldest customer
+    with the same email before the duplicate is deleted.
+    """
+    Customer = apps.get_model("customers", "Customer")
+    Order = apps.get_model("orders", "Order")
+    WaitlistEntry = apps.get_model("orders", "WaitlistEntry")
+
+    kept = {}
+    for customer in Customer.objects.order_by("pk").iterator():
+        email = customer.email.strip().lower()
+        if email in kept:
+            Order.objects.filter(customer_id=customer.pk).update(
+                customer_id=kept[email]
+            )
+            WaitlistEntry.objects.filter(customer_id=customer.pk).update(
+                customer_id=kept[email]
+            )
+            customer.delete()
+            continue
+        kept[email] = customer.pk
+        if customer.email != email:
+            customer.email = email
+            customer.save(update_fields=["email"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_email_index"),
+        ("orders", "0005_order_robot_serial_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customer",
+            name="email",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="customer",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="customers_email_ci_unique",
+                violation_error_message="Email уже существует. Пожалуйста, используйте другой email.",
+            ),
+        ),
+    ]
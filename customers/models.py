@@ -1,8 +1,104 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Lower
+
+
+def normalize_email(email):
+    """
+    Normalizes an email address: strips spaces and lowercases it.
+
+    Parameters:
+        email(str): The email address.
+
+    Returns:
+        str: The normalized email address.
+    """
+    return (email or "").strip().lower()
+
+
+class CustomerQuerySet(models.QuerySet):
+    def by_email(self, email):
+        """
+        Filters customers by email, case-insensitively.
+
+        The lookup is on LOWER(email), so it is served by the unique index.
+
+        Parameters:
+            email(str): The email address.
+
+        Returns:
+            QuerySet: Customers with this email (at most one).
+        """
+        return self.alias(email_lower=Lower("email")).filter(
+            email_lower=normalize_email(email)
+        )
+
+    def by_emails(self, emails):
+        """
+        Filters customers by many emails, case-insensitively, with one query.
+
+        Parameters:
+            emails(iterable): Normalized email addresses.
+
+        Returns:
+            QuerySet: Customers with these emails.
+        """
+        return self.alias(email_lower=Lower("email")).filter(email_lower__in=emails)
+
+    def get_or_create_by_email(self, email):
+        """
+        Gets the customer with this email or creates a new one.
+
+        Safe under concurrency: if another request creates the same customer
+        in the meantime, the unique index rejects the duplicate
+        and the existing customer is returned.
+
+        Parameters:
+            email(str): The email address.
+
+        Returns:
+            tuple: The customer and whether it was created.
+        """
+        email = normalize_email(email)
+        customer = self.by_email(email).first()
+        if customer is not None:
+            return customer, False
+        try:
+            with transaction.atomic():
+                return self.create(email=email), True
+        except IntegrityError:
+            return self.by_email(email).get(), False
+
+    def bulk_get_or_create_by_email(self, emails):
+        """
+        Gets or creates customers for many emails with a constant number of queries.
+
+        Parameters:
+            emails(iterable): Email addresses.
+
+        Returns:
+            dict: Customers by normalized email.
+        """
+        emails = {normalize_email(email) for email in emails} - {""}
+        self.bulk_create(
+            [self.model(email=email) for email in emails], ignore_conflicts=True
+        )
+        return {customer.email.lower(): customer for customer in self.by_emails(emails)}
 
 
 class Customer(models.Model):
     email = models.CharField(max_length=255, blank=False, null=False)
 
+    objects = CustomerQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # one customer per email regardless of case
+            models.UniqueConstraint(
+                Lower("email"),
+                name="customers_email_ci_unique",
+                violation_error_message="Email уже существует. Пожалуйста, используйте другой email.",
+            ),
+        ]
+
     def __str__(self):
         return self.email
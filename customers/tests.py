@@ -1,3 +1,97 @@
+from django.db import IntegrityError
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .forms import CustomerForm
+from .models import Customer
+from .views import AUTOCOMPLETE_LIMIT
+
+
+class CustomerEmailTests(TestCase):
+    def test_get_or_create_ignores_case_and_spaces(self):
+        customer, created = Customer.objects.get_or_create_by_email(" Foo@Example.com ")
+        self.assertTrue(created)
+        self.assertEqual(customer.email, "foo@example.com")
+
+        same, created = Customer.objects.get_or_create_by_email("FOO@example.COM")
+        self.assertFalse(created)
+        self.assertEqual(same.pk, customer.pk)
+        self.assertEqual(Customer.objects.count(), 1)
+
+    def test_bulk_get_or_create_by_email(self):
+        existing = Customer.objects.create(email="Foo@Example.com")
+
+        customers = Customer.objects.bulk_get_or_create_by_email(
+            ["foo@example.com", "BAR@example.com", "bar@example.com ", ""]
+        )
+
+        self.assertEqual(set(customers), {"foo@example.com", "bar@example.com"})
+        self.assertEqual(customers["foo@example.com"].pk, existing.pk)
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_database_rejects_emails_differing_in_case(self):
+        Customer.objects.create(email="foo@example.com")
+        with self.assertRaises(IntegrityError):
+            Customer.objects.create(email="FOO@example.com")
+
+    def test_by_email_is_case_insensitive(self):
+        customer = Customer.objects.create(email="foo@example.com")
+        self.assertEqual(
+            list(Customer.objects.by_email(" FOO@Example.com")), [customer]
+        )
+
+    def test_form_rejects_existing_email_in_another_case(self):
+        Customer.objects.create(email="foo@example.com")
+        form = CustomerForm(data={"email": "Foo@Example.COM"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("email", form.errors)
+
+    def test_create_view_stores_normalized_email(self):
+        response = self.client.post(
+            reverse("customers:customer_add"), {"email": " New@Example.com"}
+        )
+        self.assertRedirects(response, reverse("customers:customer_list"))
+        self.assertEqual(
+            list(Customer.objects.values_list("email", flat=True)),
+            ["new@example.com"],
+        )
+
+
+class CustomerListTests(TestCase):
+    def test_search_matches_email_prefix_case_insensitively(self):
+        Customer.objects.create(email="alice@example.com")
+        Customer.objects.create(email="bob@example.com")
+
+        response = self.client.get(reverse("customers:customer_list"), {"q": "ALI"})
+
+        self.assertEqual(
+            [customer.email for customer in response.context["customers"]],
+            ["alice@example.com"],
+        )
+
+
+class CustomerAutocompleteTests(TestCase):
+    url = reverse("customers:customer_autocomplete")
+
+    @classmethod
+    def setUpTestData(cls):
+        for email in ("carol@example.com", "Alice@example.com", "alan@example.com"):
+            Customer.objects.create(email=email)
+
+    def results(self, query):
+        return self.client.get(self.url, {"q": query}).json()["results"]
+
+    def test_suggests_emails_by_prefix_in_order(self):
+        # emails are matched case-insensitively and suggested as stored
+        self.assertEqual(self.results(" AL"), ["alan@example.com", "Alice@example.com"])
+        self.assertEqual(self.results("car"), ["carol@example.com"])
+        self.assertEqual(self.results("dave"), [])
+
+    def test_empty_query_suggests_nothing(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.results(" "), [])
+
+    def test_suggestions_are_limited(self):
+        for i in range(AUTOCOMPLETE_LIMIT + 5):
+            Customer.objects.create(email=f"bob{i:02}@example.com")
+        self.assertEqual(len(self.results("bob")), AUTOCOMPLETE_LIMIT)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CustomerListView, CustomerCreateView
+from .views import CustomerListView, CustomerCreateView, CustomerAutocompleteView
 
 app_name = "customers"
 
@@ -8,4 +8,9 @@ urlpatterns = [
     path(
         "add/", CustomerCreateView.as_view(), name="customer_add"
     ),  # path to add client
+    path(
+        "autocomplete/",
+        CustomerAutocompleteView.as_view(),
+        name="customer_autocomplete",
+    ),  # email suggestions for the order form
 ]
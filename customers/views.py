@@ -1,18 +1,25 @@
-from django.shortcuts import render
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.http import JsonResponse
+from django.views import View
 from django.views.generic import ListView, CreateView
 from django.urls import reverse_lazy
 
-from .models import Customer
+from R4C.pagination import FastPaginationMixin, estimate_count, prefix_range
+from .models import Customer, normalize_email
 from .forms import CustomerForm
 
+# Maximum number of suggested emails
+AUTOCOMPLETE_LIMIT = 10
 
-class CustomerListView(ListView):
+
+class CustomerListView(FastPaginationMixin, ListView):
     """
     View for displaying a list of customers.
 
-    Uses the "Customer" model to get all customers
-    and displays them on the page using the template
-    "customers/index.html".
+    Uses the "Customer" model to get the customers
+    and displays them page by page using the template
+    "customers/index.html". Pages are built without COUNT(*).
 
     Attributes:
         model: the model used to get the data.
@@ -24,6 +31,38 @@ class CustomerListView(ListView):
     template_name = "customers/index.html"
     context_object_name = "customers"
 
+    def get_queryset(self):
+        """
+        Gets the customers, newest first, optionally filtered by email.
+
+        The "q" parameter is matched case-insensitively as an email prefix
+        with a range scan of the LOWER(email) index.
+
+        Returns:
+            QuerySet: the customers to display.
+        """
+        customers = Customer.objects.order_by("-id")
+        query = normalize_email(self.request.GET.get("q"))
+        if query:
+            customers = customers.alias(email_lower=Lower("email")).filter(
+                **prefix_range("email_lower", query)
+            )
+        return customers
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds the search query, the approximate number of customers
+        and a form for creating a new customer to the context.
+
+        Returns:
+            dict: context object with customers and form.
+        """
+        context = super().get_context_data(**kwargs)
+        context["query"] = normalize_email(self.request.GET.get("q"))
+        context["estimated_count"] = estimate_count(Customer)
+        context.setdefault("form", CustomerForm())
+        return context
+
 
 class CustomerCreateView(CreateView):
     """
@@ -51,10 +90,46 @@ class CustomerCreateView(CreateView):
         Handle a valid form.
 
         Called when the form has successfully validated.
-        Can be overridden tp perform additional logic
-        before saving the object.
+        If a concurrent request created a customer with the same email
+        after the form was validated, the unique index rejects the insert
+        and the form is shown again with an error.
 
         Returns:
             HttpResponse: the redirect response after successful creation.
         """
-        return super().form_valid(form)
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error(
+                "email", "Email уже существует. Пожалуйста, используйте другой email."
+            )
+            return self.form_invalid(form)
+
+
+class CustomerAutocompleteView(View):
+    """
+    View suggesting customer emails for the order form.
+    """
+
+    def get(self, request):
+        """
+        Processes a GET request with the beginning of an email ("q" parameter).
+
+        The prefix is matched with a range scan of the LOWER(email) index,
+        so only a handful of rows is read whatever the number of customers.
+
+        Returns:
+            JsonResponse: up to AUTOCOMPLETE_LIMIT matching emails.
+        """
+        query = normalize_email(request.GET.get("q"))
+        if not query:
+            return JsonResponse({"results": []})
+
+        emails = (
+            Customer.objects.alias(email_lower=Lower("email"))
+            .filter(**prefix_range("email_lower", query))
+            .order_by("email_lower")
+            .values_list("email", flat=True)[:AUTOCOMPLETE_LIMIT]
+        )
+        return JsonResponse({"results": list(emails)})
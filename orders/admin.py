@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Order
+from .models import NotificationJob, Order, WaitlistEntry
 
 
 class OrderAdmin(admin.ModelAdmin):
@@ -31,3 +31,48 @@ class OrderAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Order, OrderAdmin)
+
+
+class NotificationJobAdmin(admin.ModelAdmin):
+    """
+    Administrative interface settings for the NotificationJob model.
+
+    Attributes:
+        list_display: Fields to display in the job list.
+        list_filter: Fields to filter by.
+    """
+
+    list_display = ("robot", "status", "attempts", "created", "claimed", "processed")
+    list_filter = ("status",)
+    raw_id_fields = ("robot",)
+
+
+admin.site.register(NotificationJob, NotificationJobAdmin)
+
+
+@admin.action(description="Mark selected entries as fulfilled")
+def mark_fulfilled(modeladmin, request, queryset):
+    """
+    Marks the selected waitlist entries as fulfilled.
+    """
+    queryset.update(status=WaitlistEntry.STATUS_FULFILLED)
+
+
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """
+    Administrative interface settings for the WaitlistEntry model.
+
+    Attributes:
+        list_display: Fields to display in the waitlist.
+        list_filter: Fields to filter by.
+        search_fields: Fields to search by.
+    """
+
+    list_display = ("customer", "serial", "model", "version", "status", "notified")
+    list_filter = ("status",)
+    search_fields = ("customer__email", "serial")
+    raw_id_fields = ("order", "customer")
+    actions = [mark_fulfilled]
+
+
+admin.site.register(WaitlistEntry, WaitlistEntryAdmin)
@@ -1,5 +1,7 @@
 from django import forms
+from django.urls import reverse_lazy
 
+from customers.models import Customer
 from .models import Order
 
 
@@ -8,16 +10,36 @@ class OrderForm(forms.ModelForm):
     Form for creating or editing an order.
 
     This form is based on the "Order" model
-    and includes fields for selecting a customer
-    and entering the robot serial number.
+    and includes fields for the customer's email
+    and the robot serial number.
+
+    The customer is entered by email with autocompletion
+    instead of being picked from a list of all customers,
+    so the form does not load the customers table.
 
     Attributes:
+        customer_email: email of an existing customer.
         Meta: defines the model and fields that should be included in the form.
     """
 
+    customer_email = forms.EmailField(
+        label="Email клиента",
+        widget=forms.EmailInput(
+            attrs={
+                "class": "form-control",
+                "placeholder": "Начните вводить email клиента",
+                "list": "customer-emails",
+                "autocomplete": "off",
+                "data-autocomplete-url": reverse_lazy(
+                    "customers:customer_autocomplete"
+                ),
+            }
+        ),
+    )
+
     class Meta:
         model = Order
-        fields = ["customer", "robot_serial"]
+        fields = ["customer_email", "robot_serial"]
         widgets = {
             "robot_serial": forms.TextInput(
                 attrs={
@@ -26,3 +48,20 @@ class OrderForm(forms.ModelForm):
                 }
             ),
         }
+
+    def clean_customer_email(self):
+        """
+        Finds the customer by email (case-insensitively).
+
+        Returns:
+            str: The email address.
+
+        Exceptions:
+            ValidationError: if there is no customer with this email.
+        """
+        email = self.cleaned_data["customer_email"]
+        customer = Customer.objects.by_email(email).first()
+        if customer is None:
+            raise forms.ValidationError("Клиент с таким email не найден.")
+        self.instance.customer = customer
+        return email
@@ -0,0 +1,223 @@
+"""
+imports.py
+
+This module contains the bulk import of orders from CSV, Excel and JSON files.
+
+Every record has an "email" (of the customer) and a "robot_serial".
+All customers of a file are resolved with one query, all orders are saved
+with bulk_create in one transaction and put on the waitlist together.
+
+Functions:
+- parse_orders: Decodes an uploaded file into records.
+- import_orders: Validates the records and saves the valid orders.
+"""
+
+import csv
+import io
+import json
+import re
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from customers.models import Customer, normalize_email
+from .models import Order
+from .waitlist import add_to_waitlist
+
+# Maximum number of orders in one file
+MAX_IMPORT_SIZE = 10000
+
+# Number of orders inserted by one INSERT statement
+BULK_CREATE_BATCH_SIZE = 500
+
+# Columns of the CSV and Excel files
+IMPORT_FIELDS = ("email", "robot_serial")
+
+# Robot serial numbers: up to 5 letters, digits or dashes
+SERIAL_RE = re.compile(r"^[\w-]{1,5}$")
+
+FORMATS = {
+    ".csv": "csv",
+    ".xlsx": "xlsx",
+    ".json": "json",
+    "text/csv": "csv",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/json": "json",
+}
+
+
+class OrderImportError(ValueError):
+    """Raised when an import file cannot be decoded as a whole."""
+
+
+def _check_header(header):
+    missing = [field for field in IMPORT_FIELDS if field not in header]
+    if missing:
+        raise OrderImportError(f"Missing columns: {', '.join(missing)}.")
+
+
+def _read_csv(content):
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise OrderImportError("The file must be UTF-8 encoded.")
+    reader = csv.DictReader(io.StringIO(text))
+    _check_header(reader.fieldnames or [])
+    return list(reader)
+
+
+def _read_xlsx(content):
+    # imported on first use: openpyxl is slow to import and rarely needed
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    except Exception:
+        raise OrderImportError("Invalid Excel file.")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or "").strip() for cell in next(rows, ())]
+        _check_header(header)
+        return [
+            dict(zip(header, ("" if cell is None else str(cell) for cell in row)))
+            for row in rows
+            if any(cell is not None for cell in row)
+        ]
+    finally:
+        workbook.close()
+
+
+def _read_json(content):
+    try:
+        records = json.loads(content)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise OrderImportError("Invalid JSON.")
+    if not isinstance(records, list):
+        raise OrderImportError("Expected a JSON array of orders.")
+    return records
+
+
+READERS = {"csv": _read_csv, "xlsx": _read_xlsx, "json": _read_json}
+
+
+def parse_orders(content, name="", content_type=""):
+    """
+    Decodes an uploaded file into records.
+
+    The format is taken from the file extension, or from the content type
+    when the file is sent as the request body.
+
+    Parameters:
+        content(bytes): The file content.
+        name(str): The file name.
+        content_type(str): The content type.
+
+    Returns:
+        list: Records, dicts with "email" and "robot_serial" keys.
+
+    Exceptions:
+        OrderImportError: if the format is unknown, the file cannot be decoded,
+            it is empty or too large.
+    """
+    extension = name[name.rfind(".") :].lower() if "." in name else ""
+    file_format = FORMATS.get(extension) or FORMATS.get(content_type)
+    if file_format is None:
+        raise OrderImportError("Unsupported file format, use CSV, XLSX or JSON.")
+
+    records = READERS[file_format](content)
+    if not records:
+        raise OrderImportError("The file contains no orders.")
+    if len(records) > MAX_IMPORT_SIZE:
+        raise OrderImportError(
+            f"Too many orders: {len(records)}, the maximum is {MAX_IMPORT_SIZE}."
+        )
+    return records
+
+
+def _validate(record):
+    """
+    Validates a single record.
+
+    Parameters:
+        record: A decoded record.
+
+    Returns:
+        tuple: (email, serial, None) for a valid record
+            or (None, None, error message).
+    """
+    if not isinstance(record, dict):
+        return None, None, "Invalid record."
+
+    email = normalize_email(record.get("email"))
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None, None, "Invalid email."
+
+    serial = str(record.get("robot_serial") or "").strip()
+    if not SERIAL_RE.match(serial):
+        return None, None, "Invalid robot serial."
+    return email, serial, None
+
+
+def import_orders(records, create_customers=False):
+    """
+    Validates the records and saves the valid orders in one transaction.
+
+    Customers are resolved by email with a single query (unknown customers
+    are created with one more INSERT if create_customers is set), the orders
+    are inserted with bulk_create and put on the waitlist, which bulk_create
+    would otherwise skip because it does not send post_save.
+
+    Parameters:
+        records(list): Decoded records.
+        create_customers(bool): Whether to create customers with unknown emails.
+
+    Returns:
+        list: Per-record results in the order of the input, each a dict with
+            "index", "status" ("accepted" or "rejected") and either "id" or "error".
+    """
+    results = []
+    valid = []
+    for index, record in enumerate(records):
+        email, serial, error = _validate(record)
+        if error:
+            results.append({"index": index, "status": "rejected", "error": error})
+        else:
+            results.append({"index": index, "status": "accepted"})
+            valid.append((index, email, serial))
+
+    if not valid:
+        return results
+
+    with transaction.atomic():
+        emails = {email for _, email, _ in valid}
+        if create_customers:
+            customers = Customer.objects.bulk_get_or_create_by_email(emails)
+        else:
+            customers = {
+                customer.email.lower(): customer
+                for customer in Customer.objects.by_emails(emails)
+            }
+
+        orders = []
+        for index, email, serial in valid:
+            customer = customers.get(email)
+            if customer is None:
+                results[index] = {
+                    "index": index,
+                    "status": "rejected",
+                    "error": "Unknown customer.",
+                }
+                continue
+            orders.append((index, Order(customer=customer, robot_serial=serial)))
+
+        saved = Order.objects.bulk_create(
+            [order for _, order in orders], batch_size=BULK_CREATE_BATCH_SIZE
+        )
+        add_to_waitlist(saved)
+
+    for (index, _), order in zip(orders, saved):
+        results[index]["id"] = order.pk
+    return results
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.notifications import BATCH_SIZE, DeliveryError, process_pending_jobs
+
+
+class Command(BaseCommand):
+    """
+    Sends the customer notifications queued in the outbox.
+
+    Without --loop the command drains the queue and exits,
+    which is suitable for cron. With --loop it keeps polling
+    the queue and can be run as a long-lived worker.
+    """
+
+    help = "Sends the customer notifications queued in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of jobs processed in one batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when it is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls of an empty queue (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        total_jobs = total_emails = 0
+        while True:
+            try:
+                jobs, emails = process_pending_jobs(options["batch_size"])
+            except DeliveryError as de:
+                if not options["loop"]:
+                    raise CommandError(str(de))
+                self.stderr.write(str(de))
+                time.sleep(options["interval"])
+                continue
+            total_jobs += jobs
+            total_emails += emails
+            if jobs:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {total_jobs} jobs, sent {total_emails} emails."
+            )
+        )
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:53
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+MODEL_SERIAL_RE = re.compile(r"^(?P<model>\w{2})-(?P<version>\w{2})$")
+
+
+def fill_waitlist(apps, schema_editor):
+    """Puts the customers of existing orders on the waitlist."""
+    Order = apps.get_model("orders", "Order")
+    WaitlistEntry = apps.get_model("orders", "WaitlistEntry")
+
+    entries = []
+    for order in Order.objects.iterator():
+        match = MODEL_SERIAL_RE.match(order.robot_serial)
+        model, version = (match["model"], match["version"]) if match else ("", "")
+        entries.append(
+            WaitlistEntry(
+                order_id=order.pk,
+                customer_id=order.customer_id,
+                serial=order.robot_serial,
+                model=model,
+                version=version,
+            )
+        )
+    WaitlistEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_alter_customer_id"),
+        ("orders", "0003_notificationjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("serial", models.CharField(max_length=5)),
+                ("model", models.CharField(blank=True, max_length=2)),
+                ("version", models.CharField(blank=True, max_length=2)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("notified", "Notified"),
+                            ("fulfilled", "Fulfilled"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("notified", models.DateTimeField(blank=True, null=True)),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="customers.customer",
+                    ),
+                ),
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entry",
+                        to="orders.order",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "waitlist entries",
+                "indexes": [
+                    models.Index(
+                        fields=["serial", "status"], name="orders_wait_serial_idx"
+                    ),
+                    models.Index(
+                        fields=["model", "version", "status"],
+                        name="orders_wait_model_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_waitlist, migrations.RunPython.noop),
+    ]
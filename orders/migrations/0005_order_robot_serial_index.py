@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0004_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="robot_serial",
+            field=models.CharField(db_index=True, max_length=5),
+        ),
+    ]
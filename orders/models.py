@@ -1,8 +1,88 @@
 from django.db import models
 
 from customers.models import Customer
+from robots.models import Robot
 
 
 class Order(models.Model):
-    customer = models.ForeignKey(Customer,on_delete=models.CASCADE)
-    robot_serial = models.CharField(max_length=5,blank=False, null=False)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    robot_serial = models.CharField(
+        max_length=5, blank=False, null=False, db_index=True
+    )
+
+
+class NotificationJob(models.Model):
+    """
+    Outbox entry: customers waiting for the robot have to be notified.
+
+    Jobs are created in the same transaction as the robot
+    and processed later by the "send_notifications" command,
+    which claims them ("sending") before the emails are sent.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    robot = models.ForeignKey(Robot, on_delete=models.CASCADE)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    claimed = models.DateTimeField(blank=True, null=True)
+    processed = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # the worker picks pending jobs in creation order
+            models.Index(fields=["status", "id"], name="orders_notif_status_idx"),
+        ]
+
+
+class WaitlistEntry(models.Model):
+    """
+    A customer waiting for a robot to become available.
+
+    An entry is created for every order. New robots are matched against
+    pending entries by serial number or by model and version; a matched
+    entry is marked as notified, so the customer gets only one email.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_NOTIFIED = "notified"
+    STATUS_FULFILLED = "fulfilled"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_NOTIFIED, "Notified"),
+        (STATUS_FULFILLED, "Fulfilled"),
+    ]
+
+    order = models.OneToOneField(
+        Order, on_delete=models.CASCADE, related_name="waitlist_entry"
+    )
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    serial = models.CharField(max_length=5)
+    model = models.CharField(max_length=2, blank=True)
+    version = models.CharField(max_length=2, blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    notified = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name_plural = "waitlist entries"
+        indexes = [
+            models.Index(fields=["serial", "status"], name="orders_wait_serial_idx"),
+            models.Index(
+                fields=["model", "version", "status"], name="orders_wait_model_idx"
+            ),
+        ]
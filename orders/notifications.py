@@ -0,0 +1,196 @@
+"""
+notifications.py
+
+This module contains the delivery of customer notifications queued in the outbox.
+
+Functions:
+- enqueue_notifications: Queues notification jobs for new robots.
+- build_notification: Builds the email about the robot's availability.
+- process_pending_jobs: Sends the emails for a batch of pending jobs.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.mail import get_connection, send_mass_mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import NotificationJob
+from .waitlist import mark_notified, match_robots
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_FROM_EMAIL = "from@example.com"
+
+# Number of jobs processed in one batch
+BATCH_SIZE = 500
+
+# A job is marked as failed after this many unsuccessful attempts
+MAX_ATTEMPTS = 5
+
+# A job still sending after this long was abandoned by its worker and is claimed again
+STALE_AFTER = timedelta(minutes=10)
+
+
+class DeliveryError(Exception):
+    """Raised when a batch of notifications could not be sent."""
+
+
+def enqueue_notifications(robots):
+    """
+    Queues notification jobs for new robots.
+
+    Parameters:
+        robots(list): The created Robot instances.
+    """
+    NotificationJob.objects.bulk_create(
+        [NotificationJob(robot=robot) for robot in robots]
+    )
+
+
+def build_notification(email, model, version):
+    """
+    Builds the email about the robot's availability.
+
+    Parameters:
+        email(str): The client's email address.
+        model(str): The robot's model.
+        version(str): The robot's version.
+
+    Returns:
+        tuple: (subject, message, from_email, recipient_list) for send_mass_mail.
+    """
+    subject = f"{model}-{version} снова в наличие!"  # email header
+    message = (
+        f"Добрый день!\nНедавно вы интересовались нашим роботом модели {model}, версии {version}. "
+        "Этот робот теперь в наличии. Если вам подходит этот вариант - пожалуйста, свяжитесь с нами."
+    )  # email body
+    return subject, message, NOTIFICATION_FROM_EMAIL, [email]
+
+
+def _claim_jobs(batch_size):
+    """
+    Claims a batch of pending jobs (and abandoned sending ones) in creation order.
+
+    Rows are locked (skipping the ones locked by other workers) where the
+    database supports it, and the claimed jobs are switched to "sending"
+    with one more attempt. The transaction is short: it is committed
+    before any email is sent.
+
+    Parameters:
+        batch_size(int): Maximum number of jobs.
+
+    Returns:
+        list: The claimed NotificationJob instances with robots preloaded.
+    """
+    now = timezone.now()
+    abandoned = Q(status=NotificationJob.STATUS_SENDING, claimed__lt=now - STALE_AFTER)
+    with transaction.atomic():
+        # a worker died while sending these too many times, do not retry them
+        NotificationJob.objects.filter(abandoned, attempts__gte=MAX_ATTEMPTS).update(
+            status=NotificationJob.STATUS_FAILED, processed=now
+        )
+        jobs = list(
+            NotificationJob.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("robot")
+            .filter(Q(status=NotificationJob.STATUS_PENDING) | abandoned)
+            .order_by("id")[:batch_size]
+        )
+        NotificationJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=NotificationJob.STATUS_SENDING,
+            claimed=now,
+            attempts=F("attempts") + 1,
+        )
+    for job in jobs:
+        job.status, job.claimed = NotificationJob.STATUS_SENDING, now
+        job.attempts += 1
+    return jobs
+
+
+def _register_success(job_ids, entries):
+    """
+    Marks the jobs as sent and their waitlist entries as notified.
+
+    Parameters:
+        job_ids(list): Primary keys of the claimed jobs.
+        entries(list): The notified WaitlistEntry instances.
+    """
+    with transaction.atomic():
+        mark_notified(entries)
+        NotificationJob.objects.filter(
+            pk__in=job_ids, status=NotificationJob.STATUS_SENDING
+        ).update(status=NotificationJob.STATUS_SENT, processed=timezone.now())
+
+
+def _register_failure(job_ids):
+    """
+    Registers an unsuccessful attempt for the jobs.
+
+    Jobs go back to pending to be retried until they reach MAX_ATTEMPTS,
+    then they are marked as failed.
+
+    Parameters:
+        job_ids(list): Primary keys of the claimed jobs.
+    """
+    with transaction.atomic():
+        jobs = NotificationJob.objects.filter(
+            pk__in=job_ids, status=NotificationJob.STATUS_SENDING
+        )
+        jobs.filter(attempts__gte=MAX_ATTEMPTS).update(
+            status=NotificationJob.STATUS_FAILED, processed=timezone.now()
+        )
+        jobs.update(status=NotificationJob.STATUS_PENDING)
+
+
+def process_pending_jobs(batch_size=BATCH_SIZE):
+    """
+    Sends the emails for a batch of pending jobs.
+
+    The waitlist entries satisfied by the robots of the batch are fetched
+    with one query, each customer gets one email per robot model and version,
+    and all emails are sent through a single SMTP connection.
+    Notified entries leave the waitlist, so customers are not notified twice.
+
+    The jobs are claimed in one short transaction and the result is recorded
+    in another; no transaction is open while the mail server is contacted,
+    so robot ingestion never waits for it.
+
+    Parameters:
+        batch_size(int): Maximum number of jobs to process.
+
+    Returns:
+        tuple: Number of processed jobs and number of sent emails.
+
+    Exceptions:
+        DeliveryError: if the emails could not be sent; the attempt is registered
+            and the jobs will be retried.
+    """
+    jobs = _claim_jobs(batch_size)
+    if not jobs:
+        return 0, 0
+    job_ids = [job.pk for job in jobs]
+
+    try:
+        # one indexed query resolves all robots of the batch against the waitlist
+        matches = match_robots(
+            [job.robot for job in jobs], {job.robot_id: job.created for job in jobs}
+        )
+
+        recipients = set()
+        for entry, robot in matches:
+            recipients.add((entry.customer.email, robot.model, robot.version))
+
+        messages = [
+            build_notification(email, model, version)
+            for email, model, version in sorted(recipients)
+        ]
+        sent = send_mass_mail(messages, connection=get_connection()) or 0
+    except Exception as e:
+        logger.error(f"Sending notifications failed: {e}")
+        _register_failure(job_ids)
+        raise DeliveryError(f"Sending notifications failed: {e}") from e
+
+    _register_success(job_ids, [entry for entry, _ in matches])
+    return len(jobs), sent
@@ -4,26 +4,54 @@ signals.py
 This module contains signals for handling events related to order and robot models.
 
 Signals:
-- notify_customers: Notifies customers via email when a new robot is created.
+- add_order_to_waitlist: Puts the customer of a new order on the waitlist.
+- notify_customers: Queues customer notifications when a new robot is created.
+- notify_customers_bulk: Queues customer notifications when robots are created in bulk.
+
+The emails are sent later by the "send_notifications" command,
+so creating a robot does not wait for the mail server.
+The time spent in every handler is reported on /metrics.
 """
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
+
+from R4C.metrics import instrument_handler
 
 from .models import Order
+from .notifications import enqueue_notifications
+from .waitlist import add_to_waitlist
 from robots.models import Robot
+from robots.signals import robots_created
+
+
+@receiver(post_save, sender=Order)
+@instrument_handler
+def add_order_to_waitlist(sender, instance, created, **kwargs):
+    """
+    Puts the customer of a new order on the waitlist.
+
+    Parameters:
+        sender: The model class that sends the signal (Order).
+        instance: The model instance that was saved.
+        created: A boolean flag indicating whether a new instance was created.
+        kwargs: Additional arguments.
+    """
+    if created:
+        add_to_waitlist([instance])
 
 
 @receiver(post_save, sender=Robot)
+@instrument_handler
 def notify_customers(sender, instance, created, **kwargs):
     """
-    Notifies customers via email about the availability of a new robot.
+    Queues notifications to customers about the availability of a new robot.
 
     This signal is triggered after the Robot model instance is saved.
 
-    If the instance is created (created=True), the function looks for all orders
-    associated with the robot serial number and sends notifications to customers.
+    If the instance is created (created=True), a notification job is added
+    to the outbox; the robot is matched against the waitlist
+    when the job is processed.
 
     Parameters:
         sender: The model class that sends the signal (Robot).
@@ -32,28 +60,22 @@ def notify_customers(sender, instance, created, **kwargs):
         kwargs: Additional arguments.
     """
     if created:
-        # we receive all orders for this robot by serial number
-        orders = Order.objects.filter(robot_serial=instance.serial)
-        for order in orders:
-            send_notification_email(
-                order.customer.email, instance.model, instance.version
-            )
+        enqueue_notifications([instance])
 
 
-def send_notification_email(email, model, version):
+@receiver(robots_created, sender=Robot)
+@instrument_handler
+def notify_customers_bulk(sender, robots, **kwargs):
     """
-    Sends an email notification about the robot's availability.
+    Queues notifications to customers about the availability of robots created in bulk.
+
+    This signal is sent by the batch ingestion after bulk_create,
+    which does not trigger post_save, in the transaction that saves the robots,
+    so the notification jobs are committed together with them.
 
     Parameters:
-        email(str): The client's email address.
-        model(str): The robot's model.
-        version(str): The robot's version.
+        sender: The model class that sends the signal (Robot).
+        robots: The list of created Robot instances.
+        kwargs: Additional arguments.
     """
-    subject = f"{model}-{version} снова в наличие!"  # email header
-    message = (
-        f"Добрый день!\nНедавно вы интересовались нашим роботом модели {model}, версии {version}. "
-        "Этот робот теперь в наличии. Если вам подходит этот вариант - пожалуйста, свяжитесь с нами."
-    )  # email body
-    send_mail(
-        subject, message, "from@example.com", [email]
-    )  # sending an email to a customer
+    enqueue_notifications(robots)
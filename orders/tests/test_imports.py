@@ -0,0 +1,157 @@
+import io
+import json
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import Workbook
+
+from customers.models import Customer
+from orders.imports import OrderImportError, import_orders, parse_orders
+from orders.models import Order, WaitlistEntry
+
+
+def xlsx(rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    content = io.BytesIO()
+    workbook.save(content)
+    return content.getvalue()
+
+
+class ParseOrdersTests(TestCase):
+    expected = [{"email": "foo@example.com", "robot_serial": "R2-D2"}]
+
+    def test_formats(self):
+        csv = "\ufeffemail,robot_serial\r\nfoo@example.com,R2-D2\r\n".encode()
+        excel = xlsx([["email", "robot_serial"], ["foo@example.com", "R2-D2"], []])
+        body = json.dumps(self.expected).encode()
+
+        self.assertEqual(parse_orders(csv, "orders.CSV"), self.expected)
+        self.assertEqual(parse_orders(excel, "orders.xlsx"), self.expected)
+        self.assertEqual(
+            parse_orders(body, content_type="application/json"), self.expected
+        )
+
+    def test_undecodable_files(self):
+        cases = [
+            (b"email;serial", "orders.txt"),
+            (b"email,serial\r\nfoo@example.com,R2-D2", "orders.csv"),
+            (b"\xff\xfe", "orders.csv"),
+            (b"not a workbook", "orders.xlsx"),
+            (b"{", "orders.json"),
+            (b'{"email": "foo@example.com"}', "orders.json"),
+            (b"[]", "orders.json"),
+        ]
+        for content, name in cases:
+            with self.subTest(content=content, name=name):
+                with self.assertRaises(OrderImportError):
+                    parse_orders(content, name)
+
+    def test_size_limit(self):
+        with mock.patch("orders.imports.MAX_IMPORT_SIZE", 1):
+            with self.assertRaisesMessage(OrderImportError, "Too many orders: 2"):
+                parse_orders(json.dumps(self.expected * 2).encode(), "orders.json")
+
+
+class ImportOrdersTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="foo@example.com")
+
+    def test_results_follow_the_records(self):
+        results = import_orders(
+            [
+                {"email": " FOO@example.com", "robot_serial": "R2-D2"},
+                {"email": "foo", "robot_serial": "R2-D2"},
+                {"email": "foo@example.com", "robot_serial": "R2-D2-XL"},
+                {"email": "bar@example.com", "robot_serial": "X5-LO"},
+                "foo@example.com",
+            ]
+        )
+
+        order = Order.objects.get()
+        self.assertEqual(
+            results,
+            [
+                {"index": 0, "status": "accepted", "id": order.pk},
+                {"index": 1, "status": "rejected", "error": "Invalid email."},
+                {"index": 2, "status": "rejected", "error": "Invalid robot serial."},
+                {"index": 3, "status": "rejected", "error": "Unknown customer."},
+                {"index": 4, "status": "rejected", "error": "Invalid record."},
+            ],
+        )
+        self.assertEqual((order.customer, order.robot_serial), (self.customer, "R2-D2"))
+        # bulk_create sends no post_save, the orders are put on the waitlist explicitly
+        self.assertEqual(WaitlistEntry.objects.get().order, order)
+
+    def test_unknown_customers_can_be_created(self):
+        records = [
+            {"email": f"customer{i}@example.com", "robot_serial": "X5-LO"}
+            for i in range(20)
+        ]
+        # customers, orders and waitlist entries are written with one INSERT each
+        with self.assertNumQueries(6):
+            results = import_orders(records, create_customers=True)
+
+        self.assertEqual({result["status"] for result in results}, {"accepted"})
+        self.assertEqual(Customer.objects.count(), 21)
+        self.assertEqual(WaitlistEntry.objects.count(), 20)
+
+
+class OrderImportViewTests(TestCase):
+    url = reverse("orders:order_import")
+
+    def setUp(self):
+        Customer.objects.create(email="foo@example.com")
+
+    def upload(self, content, name="orders.csv", **data):
+        return self.client.post(
+            self.url, {"file": SimpleUploadedFile(name, content), **data}
+        )
+
+    def test_all_orders_imported_returns_201(self):
+        response = self.upload(b"email,robot_serial\nfoo@example.com,R2-D2\n")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["imported"], 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_some_orders_imported_returns_207(self):
+        response = self.upload(
+            b"email,robot_serial\nfoo@example.com,R2-D2\nbar@example.com,R2-D2\n"
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            (response.json()["imported"], response.json()["rejected"]), (1, 1)
+        )
+        self.assertEqual(response.json()["results"][1]["error"], "Unknown customer.")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_create_customers(self):
+        response = self.upload(
+            b"email,robot_serial\nbar@example.com,R2-D2\n", create_customers="1"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Customer.objects.filter(email="bar@example.com").exists())
+
+    def test_no_orders_imported_returns_400(self):
+        response = self.client.post(
+            self.url,
+            json.dumps([{"email": "bar@example.com", "robot_serial": "R2-D2"}]),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["imported"], 0)
+        self.assertFalse(Order.objects.exists())
+
+    def test_undecodable_file_returns_400(self):
+        with self.assertLogs("orders.views", "ERROR"):
+            response = self.upload(b"email\nfoo@example.com\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Missing columns: robot_serial."})
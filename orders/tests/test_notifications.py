@@ -0,0 +1,164 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import NotificationJob, Order, WaitlistEntry
+from orders.notifications import (
+    MAX_ATTEMPTS,
+    STALE_AFTER,
+    DeliveryError,
+    _claim_jobs,
+    process_pending_jobs,
+)
+from robots.models import Robot
+
+
+def connection_in_transaction():
+    return connection.in_atomic_block or not connection.get_autocommit()
+
+
+def make_robot(model="R2", version="D2"):
+    return Robot.objects.create(model=model, version=version, created=timezone.now())
+
+
+class NotificationWorkerTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="foo@example.com")
+        self.order = Order.objects.create(customer=self.customer, robot_serial="R2-D2")
+
+    def test_robots_queue_jobs(self):
+        robot = make_robot()
+        job = NotificationJob.objects.get()
+        self.assertEqual(
+            (job.robot, job.status), (robot, NotificationJob.STATUS_PENDING)
+        )
+
+    def test_customer_gets_one_email_per_product(self):
+        make_robot()
+        make_robot()
+        make_robot("X5", "LO")
+
+        self.assertEqual(process_pending_jobs(), (3, 1))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["foo@example.com"])
+        self.assertIn("R2-D2", mail.outbox[0].subject)
+        self.assertEqual(
+            set(NotificationJob.objects.values_list("status", "attempts")),
+            {(NotificationJob.STATUS_SENT, 1)},
+        )
+        entry = WaitlistEntry.objects.get()
+        self.assertEqual(entry.status, WaitlistEntry.STATUS_NOTIFIED)
+
+    def test_customers_are_not_notified_twice(self):
+        make_robot()
+        process_pending_jobs()
+        make_robot()
+
+        self.assertEqual(process_pending_jobs(), (1, 0))
+        self.assertEqual(process_pending_jobs(), (0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        make_robot()
+        claimed = _claim_jobs(10)
+
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claimed[0].status, NotificationJob.STATUS_SENDING)
+        self.assertEqual(process_pending_jobs(), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+    def test_abandoned_jobs_are_claimed_again(self):
+        make_robot()
+        _claim_jobs(10)
+        NotificationJob.objects.update(
+            claimed=timezone.now() - STALE_AFTER - timedelta(seconds=1)
+        )
+
+        self.assertEqual(process_pending_jobs(), (1, 1))
+        self.assertEqual(NotificationJob.objects.get().attempts, 2)
+
+    def test_abandoned_jobs_fail_after_max_attempts(self):
+        make_robot()
+        NotificationJob.objects.update(
+            status=NotificationJob.STATUS_SENDING,
+            attempts=MAX_ATTEMPTS,
+            claimed=timezone.now() - STALE_AFTER - timedelta(seconds=1),
+        )
+
+        self.assertEqual(process_pending_jobs(), (0, 0))
+        self.assertEqual(
+            NotificationJob.objects.get().status, NotificationJob.STATUS_FAILED
+        )
+
+    @mock.patch("orders.notifications.send_mass_mail", side_effect=SMTPException)
+    def test_failed_jobs_are_retried_up_to_max_attempts(self, send_mass_mail):
+        make_robot()
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            with self.assertRaises(DeliveryError), self.assertLogs(
+                "orders.notifications", "ERROR"
+            ):
+                process_pending_jobs()
+            job = NotificationJob.objects.get()
+            self.assertEqual(job.attempts, attempt)
+            expected = (
+                NotificationJob.STATUS_FAILED
+                if attempt == MAX_ATTEMPTS
+                else NotificationJob.STATUS_PENDING
+            )
+            self.assertEqual(job.status, expected)
+
+        self.assertEqual(process_pending_jobs(), (0, 0))
+        self.assertEqual(send_mass_mail.call_count, MAX_ATTEMPTS)
+        # the customer is still waiting
+        self.assertEqual(
+            WaitlistEntry.objects.get().status, WaitlistEntry.STATUS_PENDING
+        )
+
+    def test_failed_attempt_is_followed_by_a_successful_one(self):
+        make_robot()
+        with mock.patch(
+            "orders.notifications.send_mass_mail", side_effect=SMTPException
+        ), self.assertRaises(DeliveryError), self.assertLogs("orders.notifications"):
+            process_pending_jobs()
+
+        self.assertEqual(process_pending_jobs(), (1, 1))
+        job = NotificationJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (NotificationJob.STATUS_SENT, 2))
+
+
+class NotificationTransactionTests(TransactionTestCase):
+    def test_no_transaction_is_open_while_sending(self):
+        customer = Customer.objects.create(email="foo@example.com")
+        Order.objects.create(customer=customer, robot_serial="R2-D2")
+        make_robot()
+        observed = {}
+
+        def send(messages, connection=None):
+            observed["in_transaction"] = connection_in_transaction()
+            # the claim is committed before the mail server is contacted
+            observed["status"] = NotificationJob.objects.get().status
+            # and robots can be saved while the emails are being sent
+            make_robot()
+            return len(messages)
+
+        with mock.patch("orders.notifications.send_mass_mail", side_effect=send):
+            self.assertEqual(process_pending_jobs(), (1, 1))
+
+        self.assertEqual(
+            observed,
+            {"in_transaction": False, "status": NotificationJob.STATUS_SENDING},
+        )
+        self.assertEqual(
+            NotificationJob.objects.filter(
+                status=NotificationJob.STATUS_PENDING
+            ).count(),
+            1,
+        )
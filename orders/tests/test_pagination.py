@@ -0,0 +1,95 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Customer
+from orders.models import Order
+from R4C.pagination import PAGE_SIZE, prefix_range
+
+
+class OrderListPaginationTests(TestCase):
+    url = reverse("orders:order_list")
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(email="foo@example.com")
+        Order.objects.bulk_create(
+            Order(customer=customer, robot_serial="R2-D2")
+            for _ in range(PAGE_SIZE + 10)
+        )
+
+    def test_pages_are_built_without_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            [query for query in queries if "COUNT(" in query["sql"].upper()]
+        )
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_next())
+        self.assertEqual(len(page.object_list), PAGE_SIZE)
+        self.assertEqual((page.start_index(), page.end_index()), (1, PAGE_SIZE))
+
+    def test_last_partial_page(self):
+        response = self.client.get(self.url, {"page": 2})
+
+        page = response.context["page_obj"]
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+        self.assertEqual(
+            (page.start_index(), page.end_index()), (PAGE_SIZE + 1, PAGE_SIZE + 10)
+        )
+        self.assertEqual(repr(page), "<Page 2>")
+
+    def test_pages_follow_each_other(self):
+        first = self.client.get(self.url).context["orders"]
+        second = self.client.get(self.url, {"page": 2}).context["orders"]
+        self.assertEqual(
+            [order.pk for order in [*first, *second]],
+            list(Order.objects.order_by("-id").values_list("pk", flat=True)),
+        )
+
+    def test_unknown_pages_return_404(self):
+        for page in ("last", "3", "0", "x"):
+            with self.subTest(page=page):
+                response = self.client.get(self.url, {"page": page})
+                self.assertEqual(response.status_code, 404)
+
+    def test_search_by_customer_email_and_serial(self):
+        other = Customer.objects.create(email="bar@example.com")
+        order = Order.objects.create(customer=other, robot_serial="X5-LO")
+
+        by_email = self.client.get(self.url, {"q": "BAR@"}).context["orders"]
+        by_serial = self.client.get(self.url, {"q": "X5"}).context["orders"]
+
+        self.assertEqual(list(by_email), [order])
+        self.assertEqual(list(by_serial), [order])
+
+
+class PrefixRangeTests(TestCase):
+    serials = ["R2", "R2-D2", "R2-D3", "R2\uffef", "R3-D2", "r2-D2", "R-2", "13-XS"]
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(email="foo@example.com")
+        Order.objects.bulk_create(
+            Order(customer=customer, robot_serial=serial) for serial in cls.serials
+        )
+
+    def test_builds_a_range(self):
+        self.assertEqual(
+            prefix_range("robot_serial", "R2"),
+            {"robot_serial__gte": "R2", "robot_serial__lt": "R2\uffff"},
+        )
+
+    def test_selects_the_rows_starting_with_the_prefix(self):
+        # SQLite compares strings with the binary collation, as prefix_range expects
+        for prefix in ("", "R", "R2", "R2-", "R2-D2", "r", "1", "Z"):
+            with self.subTest(prefix=prefix):
+                found = Order.objects.filter(**prefix_range("robot_serial", prefix))
+                self.assertCountEqual(
+                    found.values_list("robot_serial", flat=True),
+                    [serial for serial in self.serials if serial.startswith(prefix)],
+                )
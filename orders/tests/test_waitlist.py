@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order, WaitlistEntry
+from orders.notifications import process_pending_jobs
+from orders.waitlist import mark_notified, match_robots, parse_serial
+from robots.models import Robot
+
+
+def make_robot(model="R2", version="D2", serial=""):
+    return Robot.objects.create(
+        model=model, version=version, serial=serial, created=timezone.now()
+    )
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="foo@example.com")
+
+    def order(self, serial):
+        Order.objects.create(customer=self.customer, robot_serial=serial)
+        return WaitlistEntry.objects.get(serial=serial)
+
+    def test_parse_serial(self):
+        self.assertEqual(parse_serial("R2-D2"), ("R2", "D2"))
+        for serial in ("R2D2", "R2-D22", "", None):
+            with self.subTest(serial=serial):
+                self.assertEqual(parse_serial(serial), ("", ""))
+
+    def test_orders_join_the_waitlist(self):
+        entry = self.order("X5-LO")
+        self.assertEqual(
+            (entry.customer, entry.model, entry.version, entry.status),
+            (self.customer, "X5", "LO", WaitlistEntry.STATUS_PENDING),
+        )
+
+    def test_matched_serial(self):
+        entry = self.order("R2-D2")
+        robot = make_robot()
+
+        self.assertEqual(match_robots([robot]), [(entry, robot)])
+
+    def test_serial_without_model_and_version_is_matched_by_serial(self):
+        entry = self.order("R2D2")
+        self.assertEqual((entry.model, entry.version), ("", ""))
+        robot = make_robot(serial="R2D2")
+
+        self.assertEqual(match_robots([robot]), [(entry, robot)])
+
+    def test_unmatched_serial(self):
+        self.order("X5-LO")
+        self.assertEqual(match_robots([make_robot(), make_robot("X5", "XS")]), [])
+        self.assertEqual(match_robots([]), [])
+
+    def test_notified_entries_are_not_matched(self):
+        entry = self.order("R2-D2")
+        mark_notified([entry])
+
+        self.assertEqual(match_robots([make_robot()]), [])
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistEntry.STATUS_NOTIFIED)
+        self.assertIsNotNone(entry.notified)
+
+    def test_robot_queued_before_the_order_is_not_matched(self):
+        robot = make_robot()
+        queued = timezone.now()
+        entry = self.order("R2-D2")
+
+        self.assertEqual(match_robots([robot], {robot.pk: queued}), [])
+        # a robot queued after the order satisfies it
+        later = make_robot()
+        self.assertEqual(
+            match_robots(
+                [robot, later],
+                {robot.pk: queued, later.pk: queued + timedelta(hours=1)},
+            ),
+            [(entry, later)],
+        )
+
+    def test_order_placed_after_the_robot_is_not_notified(self):
+        make_robot()
+        self.order("R2-D2")
+
+        self.assertEqual(process_pending_jobs(), (1, 0))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            WaitlistEntry.objects.get().status, WaitlistEntry.STATUS_PENDING
+        )
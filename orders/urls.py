@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import OrderListView
+from .views import OrderImportView, OrderListView
 
 app_name = "orders"
 
 urlpatterns = [
     path("", OrderListView.as_view(), name="order_list"),
+    path("import/", OrderImportView.as_view(), name="order_import"),
 ]
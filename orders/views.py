@@ -1,16 +1,25 @@
-from django.shortcuts import render, redirect
+import logging
+
+from django.db.models.functions import Lower
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.views import View
 from django.views.generic import ListView
 
+from R4C.pagination import FastPaginationMixin, estimate_count, prefix_range
 from .models import Order
 from .forms import OrderForm
+from .imports import OrderImportError, import_orders, parse_orders
+
+logger = logging.getLogger(__name__)
 
 
-class OrderListView(ListView):
+class OrderListView(FastPaginationMixin, ListView):
     """
     View for displaying a list of orders and handling the form creating them.
 
-    Uses the "Order" model to get all orders and displays them on the page
-    using the "orders/index.html" template.
+    Uses the "Order" model to get the orders and displays them page by page
+    using the "orders/index.html" template. Pages are built without COUNT(*).
     Also handles POST requests for creating new orders.
 
     Attributes:
@@ -25,22 +34,36 @@ class OrderListView(ListView):
 
     def get_queryset(self):
         """
-        Gets all orders using the related "customer" model.
+        Gets the orders, newest first, using the related "customer" model.
+
+        The "q" parameter is matched as a customer email prefix if it contains "@",
+        otherwise as a robot serial number prefix; both use index range scans.
 
         Returns:
-            QuerySet: all orders with customer data preloaded.
+            QuerySet: orders with customer data preloaded.
         """
-        return Order.objects.select_related("customer")
+        orders = Order.objects.select_related("customer").order_by("-id")
+        query = self.request.GET.get("q", "").strip()
+        if "@" in query:
+            orders = orders.alias(customer_email=Lower("customer__email")).filter(
+                **prefix_range("customer_email", query.lower())
+            )
+        elif query:
+            orders = orders.filter(**prefix_range("robot_serial", query))
+        return orders
 
     def get_context_data(self, **kwargs):
         """
-        Adds a from for creating a new order to the context.
+        Adds the search query, the approximate number of orders
+        and a form for creating a new order to the context.
 
         Returns:
             dict: context object with orders and form.
         """
         context = super().get_context_data(**kwargs)
-        context["form"] = OrderForm()
+        context["query"] = self.request.GET.get("q", "").strip()
+        context["estimated_count"] = estimate_count(Order)
+        context.setdefault("form", OrderForm())
         return context
 
     def post(self, request, *args, **kwargs):
@@ -59,5 +82,61 @@ class OrderListView(ListView):
             form.save()
             return redirect("orders:order_list")
 
-        context = {"form": form, "orders": self.get_queryset()}
-        return render(request, self.template_name, context)
+        # the form with errors is shown under the first page of orders
+        self.object_list = self.get_queryset()
+        return self.render_to_response(self.get_context_data(form=form))
+
+
+class OrderImportView(View):
+    """
+    View for importing many orders from a CSV, Excel or JSON file.
+
+    The file is either uploaded as the "file" field of a multipart form
+    or sent as the request body with a matching Content-Type.
+    Every row has the customer's email and the robot serial number.
+    """
+
+    def post(self, request):
+        """
+        Processes a POST request with an import file.
+
+        Unknown customers are rejected unless the "create_customers"
+        parameter is set, in which case they are created.
+
+        Parameters:
+            request: The request object.
+
+        Returns:
+            JsonResponse: Counters and per-row results. Status 201 if every order
+                was imported, 207 if only some were, 400 if none were.
+        """
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                records = parse_orders(upload.read(), upload.name, upload.content_type)
+            else:
+                records = parse_orders(request.body, content_type=request.content_type)
+        except OrderImportError as oie:
+            logger.error(f"Invalid order import: {oie}")
+            return JsonResponse({"error": str(oie)}, status=400)
+
+        create_customers = bool(
+            request.POST.get("create_customers") or request.GET.get("create_customers")
+        )
+        results = import_orders(records, create_customers=create_customers)
+
+        imported = sum(1 for result in results if result["status"] == "accepted")
+        rejected = len(results) - imported
+        logger.info(f"Orders imported: {imported} imported, {rejected} rejected")
+
+        if not rejected:
+            status = 201
+        elif imported:
+            status = 207
+        else:
+            status = 400
+
+        return JsonResponse(
+            {"imported": imported, "rejected": rejected, "results": results},
+            status=status,
+        )
@@ -0,0 +1,126 @@
+"""
+waitlist.py
+
+This module contains the waitlist of customers waiting for robots.
+
+Functions:
+- parse_serial: Extracts the model and version from a serial number like "R2-D2".
+- add_to_waitlist: Creates waitlist entries for orders.
+- match_robots: Finds pending waitlist entries satisfied by new robots.
+- mark_notified: Marks waitlist entries as notified.
+"""
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import WaitlistEntry
+
+# Serial numbers made of the model and the version, e.g. "R2-D2"
+MODEL_SERIAL_RE = re.compile(r"^(?P<model>\w{2})-(?P<version>\w{2})$")
+
+
+def parse_serial(serial):
+    """
+    Extracts the model and version from a serial number like "R2-D2".
+
+    Parameters:
+        serial(str): The robot serial number.
+
+    Returns:
+        tuple: Model and version, or two empty strings
+            if the serial number does not contain them.
+    """
+    match = MODEL_SERIAL_RE.match(serial or "")
+    if match is None:
+        return "", ""
+    return match["model"], match["version"]
+
+
+def add_to_waitlist(orders):
+    """
+    Creates waitlist entries for orders.
+
+    Parameters:
+        orders(list): Saved Order instances.
+    """
+    entries = []
+    for order in orders:
+        model, version = parse_serial(order.robot_serial)
+        entries.append(
+            WaitlistEntry(
+                order=order,
+                customer_id=order.customer_id,
+                serial=order.robot_serial,
+                model=model,
+                version=version,
+            )
+        )
+    WaitlistEntry.objects.bulk_create(entries)
+
+
+def match_robots(robots, queued=None):
+    """
+    Finds pending waitlist entries satisfied by new robots.
+
+    An entry matches a robot with the same serial number or with the same
+    model and version. All robots are resolved with a single query that
+    uses the (serial, status) and (model, version, status) indexes.
+    A robot only satisfies entries that existed when it was queued for
+    notification: orders placed afterwards wait for the next robot.
+
+    Parameters:
+        robots(list): Robot instances.
+        queued(dict): Time each robot was queued, by robot id;
+            robots without a time match entries of any age.
+
+    Returns:
+        list: Pairs of (WaitlistEntry, Robot) with customers preloaded.
+    """
+    queued = queued or {}
+    by_serial = {}
+    by_model = {}
+    for robot in robots:
+        if robot.serial:
+            by_serial.setdefault(robot.serial, []).append(robot)
+        by_model.setdefault((robot.model, robot.version), []).append(robot)
+    if not by_model:
+        return []
+
+    conditions = [Q(serial__in=by_serial)] if by_serial else []
+    conditions += [Q(model=model, version=version) for model, version in by_model]
+    entries = (
+        WaitlistEntry.objects.filter(status=WaitlistEntry.STATUS_PENDING)
+        .filter(reduce(or_, conditions))
+        .select_related("customer")
+    )
+
+    matches = []
+    for entry in entries:
+        candidates = by_serial.get(entry.serial, []) + by_model.get(
+            (entry.model, entry.version), []
+        )
+        for robot in candidates:
+            if entry.created <= queued.get(robot.pk, entry.created):
+                matches.append((entry, robot))
+                break
+    return matches
+
+
+def mark_notified(entries):
+    """
+    Marks waitlist entries as notified.
+
+    Only pending entries are updated, so an entry fulfilled in the meantime
+    keeps its status.
+
+    Parameters:
+        entries(list): WaitlistEntry instances.
+    """
+    WaitlistEntry.objects.filter(
+        pk__in=[entry.pk for entry in entries],
+        status=WaitlistEntry.STATUS_PENDING,
+    ).update(status=WaitlistEntry.STATUS_NOTIFIED, notified=timezone.now())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Robot
+from .models import ReportJob, Robot, RobotModel, RobotVersion
 
 
 class RobotAdmin(admin.ModelAdmin):
@@ -7,3 +7,26 @@ class RobotAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Robot, RobotAdmin)
+
+
+class RobotVersionInline(admin.TabularInline):
+    model = RobotVersion
+    extra = 1
+
+
+class RobotModelAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "is_active")
+    list_filter = ("is_active",)
+    inlines = [RobotVersionInline]
+
+
+admin.site.register(RobotModel, RobotModelAdmin)
+
+
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "format", "start", "end", "status", "progress", "created")
+    list_filter = ("status", "format")
+    readonly_fields = ("key", "file", "error", "created", "started", "finished")
+
+
+admin.site.register(ReportJob, ReportJobAdmin)
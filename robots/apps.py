@@ -2,4 +2,15 @@ from django.apps import AppConfig
 
 
 class RobotsConfig(AppConfig):
-    name = 'robots'
+    name = "robots"
+
+    def ready(self):
+        """
+        Method called when the application is ready.
+
+        Imports signals defined in the "robots.signals" module
+        and system checks defined in "robots.checks" to ensure
+        that they are registered when the application starts.
+        """
+        import robots.checks  # register system checks
+        import robots.signals  # import signals
@@ -0,0 +1,170 @@
+"""
+async_views.py
+
+This module contains native async versions of the robot API, export and report views.
+
+Under an ASGI server these views do not hold a thread while they wait
+for the database or the cache, so one worker process can serve many
+concurrent factory controllers and downloads.
+
+Views:
+- AsyncRobotApiView: Creates a robot via the API.
+- AsyncRobotJson: Streams the list of robots in JSON or NDJSON format.
+- AsyncRobotExcel: Downloads the weekly production report.
+"""
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+
+from .cache import REPORT_CACHE_TIMEOUT, arobots_version, report_etag, report_key
+from .exports import (
+    ExportFilterError,
+    astream_json_array,
+    astream_ndjson,
+    filter_robots,
+)
+from .idempotency import IdempotencyError, idempotency_key, run_once
+from .models import Robot
+from .registry import aget_registry
+from .summary import group_by_model, production_summary
+from .validation import error_response_data, validate_robot
+from .views import RobotApiView, RobotExcel, idempotent_response
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRobotApiView(RobotApiView):
+    async def post(self, request):
+        """
+        Handles POST requests to create a new robot via the API.
+
+        Async version of RobotApiView.post. A request with an idempotency key
+        is processed in the sync thread, in the transaction that stores the key.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            JsonResponse: A response with a success or error message.
+        """
+        try:
+            data = json.loads(request.body)
+            logger.info(f"Received data: {data}")
+
+            key = idempotency_key(request, data)
+            if key is not None:
+                result = await sync_to_async(run_once)(
+                    "robot", key, request.body, lambda: self.create_robot(data)
+                )
+                return idempotent_response(*result)
+
+            # the registry may have to be reloaded, which must not run in the event loop
+            registry = await aget_registry()
+            cleaned, errors = validate_robot(data, registry=registry)
+            if errors:
+                return JsonResponse(error_response_data(errors), status=400)
+
+            # Creating a new robot
+            robot = await Robot.objects.acreate(**cleaned)
+
+            return JsonResponse(
+                {
+                    "message": "Robot created successfully.",
+                    "id": robot.pk,
+                    "serial": robot.serial,
+                },
+                status=201,
+            )
+
+        except json.JSONDecodeError:
+            logger.error("Invalid JSON received.")
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+        except IdempotencyError as ie:
+            return JsonResponse({"error": str(ie)}, status=ie.status_code)
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+            return JsonResponse({"error": "An unexpected error occurred."}, status=500)
+
+
+class AsyncRobotJson(View):
+    async def get(self, request):
+        """
+        Processes GET requests to download the list of robots in JSON format.
+
+        Async version of RobotJson.get: the rows are read with an async
+        server-side cursor and streamed by an async iterator.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            StreamingHttpResponse: A list of robots to download.
+        """
+        try:
+            robots = filter_robots(request.GET)
+        except ExportFilterError as fe:
+            return JsonResponse({"error": str(fe)}, status=400)
+
+        if request.GET.get("format") == "ndjson":
+            response = StreamingHttpResponse(
+                astream_ndjson(robots), content_type="application/x-ndjson"
+            )
+            response["Content-Disposition"] = 'attachment; filename="robots.ndjson"'
+        else:
+            response = StreamingHttpResponse(
+                astream_json_array(robots), content_type="application/json"
+            )
+            response["Content-Disposition"] = 'attachment; filename="robots.json"'
+
+        return response
+
+
+class AsyncRobotExcel(RobotExcel):
+    async def get(self, request):
+        """
+        Processes GET requests to download the weekly production report.
+
+        Async version of RobotExcel.get: the cache and the aggregation query
+        are awaited, and the workbook is built in the sync thread
+        so the event loop is not blocked.
+
+        Args:
+            request: Request object.
+        Returns:
+            HttpResponse: Excel file to download.
+        """
+        start_date, end_date = self.get_report_window()
+        version, modified = await arobots_version()
+        etag = report_etag(version, start_date, end_date)
+        # the window moves with time, so the report can change without new robots
+        last_modified = int(max(modified, end_date).timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            xlsx_key = report_key(version, start_date, end_date, "xlsx")
+            excel_file = await cache.aget(xlsx_key)
+            if excel_file is None:
+                counts_key = report_key(version, start_date, end_date, "counts")
+                robots_data = await cache.aget(counts_key)
+                if robots_data is None:
+                    rows = await sync_to_async(production_summary)(start_date, end_date)
+                    robots_data = group_by_model(rows)
+                    await cache.aset(counts_key, robots_data, REPORT_CACHE_TIMEOUT)
+                # in the sync thread: the workbook reads the registry, and database
+                # connections opened in other threads would never be closed
+                excel_file = await sync_to_async(self.create_excel_file)(robots_data)
+                await cache.aset(xlsx_key, excel_file, REPORT_CACHE_TIMEOUT)
+            response = self.send_excel_file(excel_file)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
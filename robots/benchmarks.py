@@ -0,0 +1,556 @@
+"""
+benchmarks.py
+
+This module contains the benchmark suite of the R4C endpoints,
+run by the "benchmark" management command.
+
+Every scenario is run a number of times against a database seeded with
+synthetic robots, customers and orders. For each scenario the latency
+percentiles, the throughput, the number of SQL queries and the peak
+Python memory are measured and can be compared with a baseline file.
+
+Functions:
+- seed: Fills the database with synthetic data.
+- run_scenarios: Runs the benchmark scenarios and returns their metrics.
+- compare_with_baseline: Finds regressions against a baseline.
+- measure_startup: Measures the startup of a worker process.
+- compare_serializers: Compares the robot serializers with the previous implementation.
+"""
+
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order, WaitlistEntry
+from orders.notifications import process_pending_jobs
+from .exports import DATE_FORMAT, EXPORT_CHUNK_SIZE
+from .models import Robot, VALID_MODELS
+from .rollup import rebuild_rollup
+from .serializers import encode_items, encode_lines
+
+VERSIONS = ["D2", "XS", "LT", "A1", "B7", "C8"]
+
+# Number of rows inserted by one bulk_create while seeding
+SEED_BATCH_SIZE = 10000
+
+# Robots are spread over this many days before now
+SEED_DAYS = 90
+
+# Metrics compared with the baseline; a higher value is worse for all of them
+COMPARED_METRICS = ("p95_ms", "queries", "peak_memory_kb")
+
+# Startup metrics compared with the baseline
+STARTUP_METRICS = ("import_ms", "rss_kb")
+
+# The scenarios cache reports and pages built from the benchmark database, and
+# some of them clear the cache between runs: they get a private in-memory cache
+# so neither touches the cache of a running server
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmarks",
+    }
+}
+
+# Modules a worker must not import before it serves a request that needs them
+HEAVY_MODULES = ("openpyxl", "numpy", "pandas", "pyarrow")
+
+# Run in a fresh interpreter: loads the WSGI application and the URL configuration
+# (which imports every view) as a worker does, then prints its measurements
+STARTUP_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "R4C.settings")
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+import_ms = (time.perf_counter() - started) * 1000
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss_kb //= 1024
+except ImportError:
+    rss_kb = 0
+heavy = [name for name in json.loads(sys.argv[1]) if name in sys.modules]
+print(json.dumps({"import_ms": import_ms, "rss_kb": rss_kb, "heavy": heavy}))
+"""
+
+
+def _batches(total, size=SEED_BATCH_SIZE):
+    """
+    Splits a number of rows into batch sizes.
+
+    Args:
+        total (int): Number of rows.
+        size (int): Maximum batch size.
+
+    Yields:
+        int: Size of the next batch.
+    """
+    while total > 0:
+        yield min(size, total)
+        total -= size
+
+
+def seed(robots, customers, orders, rng=None):
+    """
+    Fills the database with synthetic data.
+
+    Args:
+        robots (int): Number of robots.
+        customers (int): Number of customers.
+        orders (int): Number of orders.
+        rng (random.Random): Random generator, for reproducible data.
+    """
+    rng = rng or random.Random(0)
+    now = timezone.now()
+    products = [(model, version) for model in VALID_MODELS for version in VERSIONS]
+
+    for size in _batches(robots):
+        batch = []
+        for _ in range(size):
+            model, version = rng.choice(products)
+            batch.append(
+                Robot(
+                    serial=f"{model}-{version}",
+                    model=model,
+                    version=version,
+                    created=now - timedelta(seconds=rng.randrange(SEED_DAYS * 86400)),
+                )
+            )
+        Robot.objects.bulk_create(batch)
+    rebuild_rollup()
+
+    created = 0
+    for size in _batches(customers):
+        Customer.objects.bulk_create(
+            [Customer(email=f"customer{created + i}@example.com") for i in range(size)]
+        )
+        created += size
+
+    customer_ids = list(Customer.objects.values_list("pk", flat=True))
+    for size in _batches(orders):
+        batch = []
+        for _ in range(size):
+            model, version = rng.choice(products)
+            batch.append(
+                Order(
+                    customer_id=rng.choice(customer_ids),
+                    robot_serial=f"{model}-{version}",
+                )
+            )
+        # bulk_create does not send post_save, the waitlist is filled explicitly
+        saved = Order.objects.bulk_create(batch)
+        WaitlistEntry.objects.bulk_create(
+            [
+                WaitlistEntry(
+                    order=order,
+                    customer_id=order.customer_id,
+                    serial=order.robot_serial,
+                    model=order.robot_serial[:2],
+                    version=order.robot_serial[3:],
+                )
+                for order in saved
+            ]
+        )
+
+
+def _robot_payload():
+    """
+    Builds the payload of one robot for the API scenarios.
+
+    Returns:
+        dict: A robot in the API format.
+    """
+    return {
+        "model": random.choice(VALID_MODELS),
+        "version": random.choice(VERSIONS),
+        "created": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _consume(response):
+    """
+    Reads the whole response body, including streamed ones.
+
+    Args:
+        response: The test client response.
+
+    Returns:
+        int: Size of the body in bytes.
+    """
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _scenario_robot_api(client):
+    body = json.dumps(_robot_payload())
+    return client.post("/api/robots/", body, content_type="application/json")
+
+
+def _scenario_robot_batch_api(client):
+    body = json.dumps([_robot_payload() for _ in range(100)])
+    return client.post("/api/robots/batch/", body, content_type="application/json")
+
+
+def _scenario_robot_json(client):
+    return client.get("/download/")
+
+
+def _scenario_json_view(client):
+    return client.get("/json/")
+
+
+def _scenario_download_excel(client):
+    return client.get("/download_excel/")
+
+
+# Emails of the seeded customers, read once per run_scenarios call
+_customer_emails = []
+
+
+def _load_customer_emails():
+    # ORDER BY RANDOM() sorts the whole table, so a customer is picked in Python
+    if not _customer_emails:
+        _customer_emails.extend(Customer.objects.values_list("email", flat=True))
+
+
+def _scenario_order_create(client):
+    email = random.choice(_customer_emails)
+    model, version = random.choice(VALID_MODELS), random.choice(VERSIONS)
+    return client.post(
+        "/order/", {"customer_email": email, "robot_serial": f"{model}-{version}"}
+    )
+
+
+def _clear_cache():
+    # run under BENCHMARK_CACHES: only the private cache of the benchmark is cleared
+    cache.clear()
+
+
+def _reset_waitlist():
+    # put everybody back on the waitlist so every run has customers to notify
+    WaitlistEntry.objects.update(status=WaitlistEntry.STATUS_PENDING)
+
+
+def _scenario_notification_signal(client):
+    model, version = random.choice(VALID_MODELS), random.choice(VERSIONS)
+    Robot.objects.create(
+        serial=f"{model}-{version}",
+        model=model,
+        version=version,
+        created=timezone.now(),
+    )
+    process_pending_jobs()
+
+
+SCENARIOS = {
+    "robot_api": _scenario_robot_api,
+    "robot_batch_api": _scenario_robot_batch_api,
+    "robot_json": _scenario_robot_json,
+    "json_view": _scenario_json_view,
+    "download_excel": _scenario_download_excel,
+    "order_create": _scenario_order_create,
+    "notification_signal": _scenario_notification_signal,
+}
+
+# Untimed preparation run before every run of a scenario
+SETUPS = {
+    # measure building the report, not serving it from the cache
+    "download_excel": _clear_cache,
+    "order_create": _load_customer_emails,
+    "notification_signal": _reset_waitlist,
+}
+
+
+def _percentile(values, percent):
+    """
+    Returns the percentile of the values (nearest-rank method).
+
+    Args:
+        values (list): Measured values.
+        percent (float): Percentile, 0-100.
+
+    Returns:
+        float: The percentile.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _run_scenario(scenario, setup, client, iterations):
+    """
+    Runs one scenario and measures it.
+
+    An untimed warm-up run fills the import and connection caches first.
+    The latency is measured without tracemalloc, which slows Python down;
+    the peak memory is measured by one extra traced run.
+
+    Args:
+        scenario: The scenario function.
+        setup: Function run before every run of the scenario, or None.
+        client (Client): The test client.
+        iterations (int): Number of measured runs.
+
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    if setup:
+        setup()
+    response = scenario(client)
+    if response is not None:
+        _consume(response)
+
+    latencies = []
+    queries = 0
+    response_bytes = 0
+    for _ in range(iterations):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = scenario(client)
+            if response is not None:
+                response_bytes += _consume(response)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries += len(captured)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    response = scenario(client)
+    if response is not None:
+        _consume(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_seconds = sum(latencies) / 1000
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "throughput_rps": round(iterations / total_seconds, 2) if total_seconds else 0,
+        "queries": round(queries / iterations, 2),
+        "response_kb": round(response_bytes / iterations / 1024, 2),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run_scenarios(names, iterations):
+    """
+    Runs the benchmark scenarios and returns their metrics.
+
+    The scenarios run with the private BENCHMARK_CACHES.
+
+    Args:
+        names (list): Names of the scenarios (keys of SCENARIOS).
+        iterations (int): Number of measured runs per scenario.
+
+    Returns:
+        dict: Metrics by scenario name.
+    """
+    client = Client()
+    _customer_emails.clear()
+    with override_settings(CACHES=BENCHMARK_CACHES):
+        return {
+            name: _run_scenario(SCENARIOS[name], SETUPS.get(name), client, iterations)
+            for name in names
+        }
+
+
+def compare_with_baseline(results, baseline, tolerance, metrics=COMPARED_METRICS):
+    """
+    Finds regressions against a baseline.
+
+    Args:
+        results (dict): Metrics by scenario name.
+        baseline (dict): Baseline metrics by scenario name.
+        tolerance (float): Allowed relative increase, e.g. 0.5 for 50%.
+        metrics (tuple): Names of the compared metrics.
+
+    Returns:
+        list: Descriptions of the regressions (empty if there are none).
+    """
+    regressions = []
+    for name, measured in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        for metric in metrics:
+            if metric not in expected:
+                continue
+            limit = expected[metric] * (1 + tolerance)
+            if measured[metric] > limit:
+                regressions.append(
+                    f"{name}.{metric}: {measured[metric]} > {expected[metric]} "
+                    f"(+{tolerance:.0%} allowed)"
+                )
+    return regressions
+
+
+def measure_startup(runs, settings_module=None):
+    """
+    Measures the startup of a worker process.
+
+    Every run starts a fresh interpreter that loads the WSGI application
+    and the URL configuration, so module caches of this process do not
+    affect the measurement.
+
+    Args:
+        runs (int): Number of measured processes.
+        settings_module (str): DJANGO_SETTINGS_MODULE of the probes
+            (the one of this process by default).
+
+    Returns:
+        dict: Median "import_ms" and "rss_kb" (peak resident memory) of the runs
+            and the sorted HEAVY_MODULES that were imported ("heavy_modules").
+    """
+    env = dict(os.environ)
+    if settings_module:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+    import_times, rss, heavy = [], [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE, json.dumps(HEAVY_MODULES)],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            env=env,
+            text=True,
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        import_times.append(probe["import_ms"])
+        rss.append(probe["rss_kb"])
+        heavy.update(probe["heavy"])
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(import_times), 1),
+        "rss_kb": round(statistics.median(rss)),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def _legacy_items(rows):
+    """The previous JSON array encoding: one strftime and json.dumps per robot."""
+    return ", ".join(
+        json.dumps(
+            {
+                "model": model,
+                "version": version,
+                "created": created.strftime(DATE_FORMAT),
+            }
+        )
+        for model, version, created in rows
+    ).encode()
+
+
+def _legacy_lines(rows):
+    """The previous NDJSON encoding: one strftime and json.dumps per robot."""
+    lines = [
+        json.dumps(
+            {
+                "model": model,
+                "version": version,
+                "created": created.strftime(DATE_FORMAT),
+            }
+        )
+        for model, version, created in rows
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+SERIALIZERS = {
+    ("legacy", "json"): _legacy_items,
+    ("legacy", "ndjson"): _legacy_lines,
+    ("current", "json"): encode_items,
+    ("current", "ndjson"): encode_lines,
+}
+
+
+def _synthetic_chunks(rows, rows_per_second, rng):
+    """
+    Generates export rows, EXPORT_CHUNK_SIZE at a time.
+
+    Args:
+        rows (int): Number of rows.
+        rows_per_second (int): Number of consecutive rows sharing a timestamp.
+        rng (random.Random): Random generator.
+
+    Yields:
+        list: (model, version, created) tuples, as fetched by the exports.
+    """
+    start = timezone.now().replace(microsecond=0) - timedelta(days=SEED_DAYS)
+    products = [(model, version) for model in VALID_MODELS for version in VERSIONS]
+    for offset, size in zip(
+        range(0, rows, EXPORT_CHUNK_SIZE), _batches(rows, EXPORT_CHUNK_SIZE)
+    ):
+        yield [
+            (
+                *rng.choice(products),
+                start + timedelta(seconds=(offset + index) // rows_per_second),
+            )
+            for index in range(size)
+        ]
+
+
+def compare_serializers(rows, rows_per_second=1, rng=None):
+    """
+    Compares the robot serializers with the previous implementation.
+
+    The rows are generated in memory, a chunk at a time, so only the conversion
+    and encoding are measured: both implementations fetch the same columns.
+    The peak memory is measured by an extra traced run over one chunk.
+
+    Args:
+        rows (int): Number of rows.
+        rows_per_second (int): Number of consecutive rows sharing a timestamp.
+        rng (random.Random): Random generator, for reproducible data.
+
+    Returns:
+        dict: By (implementation, format): "seconds", "rows_per_s",
+            "output_mb" and "chunk_peak_kb".
+    """
+    rng = rng or random.Random(0)
+    seconds = dict.fromkeys(SERIALIZERS, 0.0)
+    output = dict.fromkeys(SERIALIZERS, 0)
+    sample = None
+    for chunk in _synthetic_chunks(rows, rows_per_second, rng):
+        sample = sample or chunk
+        for name, serializer in SERIALIZERS.items():
+            started = time.perf_counter()
+            output[name] += len(serializer(chunk))
+            seconds[name] += time.perf_counter() - started
+
+    results = {}
+    for name, serializer in SERIALIZERS.items():
+        tracemalloc.start()
+        serializer(sample or [])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            "seconds": round(seconds[name], 3),
+            "rows_per_s": round(rows / seconds[name]) if seconds[name] else 0,
+            "output_mb": round(output[name] / 1024 / 1024, 1),
+            "chunk_peak_kb": round(peak / 1024, 1),
+        }
+    return results
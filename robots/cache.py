@@ -0,0 +1,144 @@
+"""
+cache.py
+
+This module contains the cache of robot reports and pages.
+
+Every change of the robots table bumps a version stored in the cache.
+Cached reports, pages and template fragments are keyed by this version,
+so a change makes all of them stale at once without deleting keys one by one.
+
+Functions:
+- robots_version: Returns the current version of the robots table.
+- arobots_version: Async version of robots_version.
+- bump_robots_version: Marks the robots table as changed.
+- report_key: Builds the cache key of a report part for a window.
+- report_etag: Builds the ETag of a report for a window.
+- view_key: Builds the cache key of a view for the query parameters of a request.
+- view_etag: Builds the ETag of a view for the query parameters of a request.
+"""
+
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import urlencode
+
+VERSION_KEY = "robots:version"
+
+# Cached reports expire after an hour even if the robots did not change
+REPORT_CACHE_TIMEOUT = 60 * 60
+
+# Cached pages and template fragments expire after an hour as well
+VIEW_CACHE_TIMEOUT = 60 * 60
+
+
+def bump_robots_version():
+    """
+    Marks the robots table as changed.
+
+    The new version is random, so versions generated by different
+    workers never collide even if the cache was cleared in between.
+
+    Returns:
+        tuple: The new version and its modification time.
+    """
+    state = {"version": uuid.uuid4().hex, "modified": timezone.now()}
+    cache.set(VERSION_KEY, state, timeout=None)
+    return state["version"], state["modified"]
+
+
+def robots_version():
+    """
+    Returns the current version of the robots table.
+
+    Returns:
+        tuple: The version (str) and the time it was set (datetime).
+    """
+    state = cache.get(VERSION_KEY)
+    if state is None:
+        return bump_robots_version()
+    return state["version"], state["modified"]
+
+
+async def arobots_version():
+    """
+    Async version of robots_version.
+
+    Returns:
+        tuple: The version (str) and the time it was set (datetime).
+    """
+    state = await cache.aget(VERSION_KEY)
+    if state is None:
+        state = {"version": uuid.uuid4().hex, "modified": timezone.now()}
+        await cache.aset(VERSION_KEY, state, timeout=None)
+    return state["version"], state["modified"]
+
+
+def report_key(version, start, end, part):
+    """
+    Builds the cache key of a report part for a window.
+
+    Args:
+        version (str): Version of the robots table.
+        start (datetime): Start of the report window.
+        end (datetime): End of the report window.
+        part (str): Part of the report, e.g. "counts" or "xlsx".
+
+    Returns:
+        str: The cache key.
+    """
+    return (
+        f"robots:report:{version}:{start.timestamp():.0f}:{end.timestamp():.0f}:{part}"
+    )
+
+
+def report_etag(version, start, end):
+    """
+    Builds the ETag of a report for a window.
+
+    Args:
+        version (str): Version of the robots table.
+        start (datetime): Start of the report window.
+        end (datetime): End of the report window.
+
+    Returns:
+        str: A quoted ETag value.
+    """
+    digest = hashlib.md5(report_key(version, start, end, "").encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def view_key(version, view, params):
+    """
+    Builds the cache key of a view for the query parameters of a request.
+
+    The parameters are sorted, so their order in the URL does not matter.
+
+    Args:
+        version (str): Version of the robots table.
+        view (str): Name of the view, e.g. "json_view".
+        params (QueryDict): The query parameters.
+
+    Returns:
+        str: The cache key.
+    """
+    query = urlencode(sorted(params.lists()), doseq=True)
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f"robots:view:{version}:{view}:{digest}"
+
+
+def view_etag(version, view, params):
+    """
+    Builds the ETag of a view for the query parameters of a request.
+
+    Args:
+        version (str): Version of the robots table.
+        view (str): Name of the view.
+        params (QueryDict): The query parameters.
+
+    Returns:
+        str: A quoted ETag value.
+    """
+    digest = hashlib.md5(view_key(version, view, params).encode()).hexdigest()
+    return f'"{digest}"'
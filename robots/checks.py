@@ -0,0 +1,42 @@
+"""
+checks.py
+
+This module contains the system checks of the robots application.
+
+Functions:
+- check_shared_cache: Warns when the cache is not shared between worker processes.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warns when the cache is not shared between worker processes.
+
+    The versions of the robots table (robots.cache) and of the registry
+    (robots.registry) are stored in the cache; with a per-process cache
+    a worker keeps serving its cached pages and registry after another
+    worker has changed the robots.
+
+    Args:
+        app_configs: The checked applications (unused).
+
+    Returns:
+        list: A warning if the default cache is the local memory cache.
+    """
+    if settings.CACHES.get("default", {}).get("BACKEND") != LOCMEM_BACKEND:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process, so the robot and "
+            "registry versions are not shared between workers.",
+            hint='Set R4C_CACHE_BACKEND to "file" or "redis" when running '
+            "more than one worker process.",
+            id="robots.W001",
+        )
+    ]
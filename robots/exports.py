@@ -0,0 +1,244 @@
+"""
+exports.py
+
+This module contains the streaming export of robots in JSON and NDJSON formats.
+
+Functions:
+- parse_bound: Parses a date range bound given as a date or a date and time.
+- filter_robots: Builds a queryset of robots filtered by the request parameters.
+- row_chunks: Reads the exported columns with a server-side cursor, a chunk at a time.
+- iter_robots: Iterates over the robots with a server-side cursor.
+- stream_indented_json: Yields the robots as chunks of an indented JSON array.
+- stream_json_array: Yields the robots as chunks of a JSON array.
+- stream_ndjson: Yields the robots as chunks of NDJSON, one robot per line.
+- arow_chunks, astream_json_array, astream_ndjson: Async versions for async views.
+
+Rows are converted and encoded by the serializers module.
+"""
+
+import json
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Robot
+from .serializers import encode_items, encode_lines, serialize_robots
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Number of rows fetched from the database cursor at once
+# and serialised into a single chunk of the response
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = ("model", "version", "created")
+
+
+class ExportFilterError(ValueError):
+    """Raised when an export filter parameter has an invalid value."""
+
+
+def parse_bound(value):
+    """
+    Parses a date range bound.
+
+    Args:
+        value (str): Date (YYYY-MM-DD) or date and time.
+
+    Returns:
+        tuple: An aware datetime and a flag telling whether only a date was given.
+
+    Raises:
+        ExportFilterError: If the value cannot be parsed.
+    """
+    try:
+        day = parse_date(value)
+        moment = datetime.combine(day, time.min) if day else parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ExportFilterError(f"Invalid date: {value}.")
+
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment, day is not None
+
+
+def filter_robots(params):
+    """
+    Builds a queryset of robots filtered by the request parameters.
+
+    Supported parameters: model, version, created_from, created_to.
+    A date-only created_to includes the whole day.
+
+    Args:
+        params (QueryDict): The request GET parameters.
+
+    Returns:
+        QuerySet: Robots ordered by primary key.
+
+    Raises:
+        ExportFilterError: If a date parameter is invalid.
+    """
+    robots = Robot.objects.order_by("pk")
+
+    if params.get("model"):
+        robots = robots.filter(model=params["model"])
+    if params.get("version"):
+        robots = robots.filter(version=params["version"])
+    if params.get("created_from"):
+        created_from, _ = parse_bound(params["created_from"])
+        robots = robots.filter(created__gte=created_from)
+    if params.get("created_to"):
+        created_to, whole_day = parse_bound(params["created_to"])
+        if whole_day:
+            robots = robots.filter(created__lt=created_to + timedelta(days=1))
+        else:
+            robots = robots.filter(created__lte=created_to)
+
+    return robots
+
+
+def row_chunks(queryset):
+    """
+    Reads the robots with a server-side cursor, EXPORT_CHUNK_SIZE rows at a time.
+
+    Only the exported columns are fetched and no model instances are built,
+    so memory usage does not depend on the size of the table.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        list: (model, version, created) tuples.
+    """
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        yield chunk
+
+
+async def arow_chunks(queryset):
+    """
+    Async version of row_chunks.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        list: (model, version, created) tuples.
+    """
+    # values() rather than values_list(): the values_list iterable runs its query
+    # as soon as it is created, which aiterator() does in the async context
+    rows = queryset.values(*EXPORT_FIELDS).aiterator(chunk_size=EXPORT_CHUNK_SIZE)
+    chunk = []
+    async for row in rows:
+        chunk.append((row["model"], row["version"], row["created"]))
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_robots(queryset):
+    """
+    Iterates over the robots with a server-side cursor.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        dict: A robot with the "model", "version" and "created" keys.
+    """
+    for chunk in row_chunks(queryset):
+        yield from serialize_robots(chunk)
+
+
+def stream_indented_json(queryset):
+    """
+    Yields the robots as chunks of an indented JSON array.
+
+    The text is the one of json.dumps(robots, ensure_ascii=False, indent=4),
+    for display on a web page.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        str: Consecutive parts of the JSON document.
+    """
+    empty = True
+    for chunk in row_chunks(queryset):
+        items = [
+            "    "
+            + json.dumps(robot, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+            for robot in serialize_robots(chunk)
+        ]
+        yield ("[\n" if empty else ",\n") + ",\n".join(items)
+        empty = False
+    yield "[]" if empty else "\n]"
+
+
+def stream_json_array(queryset):
+    """
+    Yields the robots as chunks of a JSON array.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        bytes: Consecutive parts of the JSON document.
+    """
+    yield b"["
+    separator = b""
+    for chunk in row_chunks(queryset):
+        yield separator + encode_items(chunk)
+        separator = b","
+    yield b"]"
+
+
+def stream_ndjson(queryset):
+    """
+    Yields the robots as chunks of NDJSON, one robot per line.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        bytes: Consecutive lines of the NDJSON document.
+    """
+    for chunk in row_chunks(queryset):
+        yield encode_lines(chunk)
+
+
+async def astream_json_array(queryset):
+    """
+    Async version of stream_json_array.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        bytes: Consecutive parts of the JSON document.
+    """
+    yield b"["
+    separator = b""
+    async for chunk in arow_chunks(queryset):
+        yield separator + encode_items(chunk)
+        separator = b","
+    yield b"]"
+
+
+async def astream_ndjson(queryset):
+    """
+    Async version of stream_ndjson.
+
+    Args:
+        queryset (QuerySet): Robots to export.
+
+    Yields:
+        bytes: Consecutive lines of the NDJSON document.
+    """
+    async for chunk in arow_chunks(queryset):
+        yield encode_lines(chunk)
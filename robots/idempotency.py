@@ -0,0 +1,173 @@
+"""
+idempotency.py
+
+This module contains the idempotency of the robot ingestion endpoints.
+
+Factory controllers retry requests on timeouts. A request sent with an
+idempotency key ("Idempotency-Key" header, or an "idempotency_key" field of
+a single robot payload) is processed once: its response is stored in the
+IdempotencyKey table in the transaction that creates the robots, and a retry
+with the same key gets the stored response without creating robots or
+queueing notifications again.
+
+Concurrent requests with the same key are serialized by the unique constraint
+on (endpoint, key): the later transaction fails to store its key, is rolled
+back with everything it created and returns the response of the first one.
+Server errors are not stored, so such requests can be retried.
+
+Functions:
+- idempotency_key: Returns the idempotency key of a request.
+- run_once: Runs a request handler once per idempotency key.
+- purge_expired_keys: Deletes the keys older than the TTL.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_FIELD = "idempotency_key"
+
+# Header set on responses replayed from a stored result
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Keys are honoured for this long after the first request
+IDEMPOTENCY_TTL = timedelta(hours=24)
+
+KEY_MAX_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+class IdempotencyError(ValueError):
+    """Raised when the idempotency key of a request cannot be used."""
+
+    status_code = 400
+
+
+class KeyReuseError(IdempotencyError):
+    """Raised when an idempotency key is reused for a different request."""
+
+    status_code = 422
+
+
+def idempotency_key(request, data=None):
+    """
+    Returns the idempotency key of a request.
+
+    The header takes precedence over the payload field.
+
+    Args:
+        request: The request object.
+        data: The decoded payload, for the "idempotency_key" field.
+
+    Returns:
+        str: The key, or None if the request has none.
+
+    Raises:
+        IdempotencyError: If the key is not a string of 1 to KEY_MAX_LENGTH characters.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None and isinstance(data, dict):
+        key = data.get(IDEMPOTENCY_FIELD)
+    if key is None:
+        return None
+    if not isinstance(key, str) or not 0 < len(key) <= KEY_MAX_LENGTH:
+        raise IdempotencyError("Invalid idempotency key.")
+    return key
+
+
+def _stored(endpoint, key, fingerprint):
+    """
+    Returns the unexpired stored result of a key.
+
+    Args:
+        endpoint (str): Name of the endpoint.
+        key (str): The idempotency key.
+        fingerprint (str): SHA-256 of the request body.
+
+    Returns:
+        IdempotencyKey: The stored result, or None.
+
+    Raises:
+        KeyReuseError: If the key was used for a different request body.
+    """
+    record = IdempotencyKey.objects.filter(
+        endpoint=endpoint,
+        key=key,
+        created__gte=timezone.now() - IDEMPOTENCY_TTL,
+    ).first()
+    if record is not None and record.fingerprint != fingerprint:
+        raise KeyReuseError("The idempotency key was used for a different request.")
+    return record
+
+
+def run_once(endpoint, key, body, handler):
+    """
+    Runs a request handler once per idempotency key.
+
+    Args:
+        endpoint (str): Name of the endpoint, keys are unique per endpoint.
+        key (str): The idempotency key, or None to just run the handler.
+        body (bytes): The request body; a key may only be reused with the same body.
+        handler: A function returning the response data and status code.
+            It runs in the transaction that stores the key.
+
+    Returns:
+        tuple: The response data, the status code and whether
+            the response was replayed from a stored result.
+
+    Raises:
+        KeyReuseError: If the key was used for a different request body.
+    """
+    if key is None:
+        data, status = handler()
+        return data, status, False
+
+    fingerprint = hashlib.sha256(body).hexdigest()
+    record = _stored(endpoint, key, fingerprint)
+    if record is not None:
+        return record.response, record.status_code, True
+
+    try:
+        with transaction.atomic():
+            data, status = handler()
+            if status < 500:
+                # an expired result of the key still holds the unique constraint
+                IdempotencyKey.objects.filter(
+                    endpoint=endpoint,
+                    key=key,
+                    created__lt=timezone.now() - IDEMPOTENCY_TTL,
+                ).delete()
+                IdempotencyKey.objects.create(
+                    endpoint=endpoint,
+                    key=key,
+                    fingerprint=fingerprint,
+                    status_code=status,
+                    response=data,
+                )
+    except IntegrityError:
+        # a concurrent request with the same key was committed first
+        record = _stored(endpoint, key, fingerprint)
+        if record is None:
+            raise
+        return record.response, record.status_code, True
+    return data, status, False
+
+
+def purge_expired_keys(ttl=IDEMPOTENCY_TTL):
+    """
+    Deletes the keys older than the TTL.
+
+    Args:
+        ttl (timedelta): How long keys are kept.
+
+    Returns:
+        int: Number of deleted keys.
+    """
+    deleted, _ = IdempotencyKey.objects.filter(
+        created__lt=timezone.now() - ttl
+    ).delete()
+    return deleted
@@ -0,0 +1,121 @@
+"""
+ingestion.py
+
+This module contains the batch ingestion logic for robots received via the API.
+
+Functions:
+- parse_batch: Splits a JSON array or NDJSON request body into records.
+- ingest_batch: Validates records and saves the valid ones in one transaction.
+"""
+
+import json
+
+from django.db import transaction
+
+from .models import Robot
+from .rollup import record_robots
+from .signals import robots_created
+from .validation import error_response_data, validate_batch
+
+# Maximum number of records accepted in a single request
+MAX_BATCH_SIZE = 10000
+
+# Number of rows sent to the database in one INSERT statement
+BULK_CREATE_BATCH_SIZE = 500
+
+NDJSON_CONTENT_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+)
+
+
+class BatchError(ValueError):
+    """Raised when the request body as a whole cannot be processed."""
+
+
+def parse_batch(body, content_type):
+    """
+    Splits the request body into a list of records.
+
+    A JSON body must contain an array of objects. An NDJSON body contains
+    one object per line; a line that is not valid JSON does not reject the
+    whole batch, it is returned as None and rejected individually.
+
+    Args:
+        body (bytes): The raw request body.
+        content_type (str): The request content type.
+
+    Returns:
+        list: Decoded records (None for undecodable NDJSON lines).
+
+    Raises:
+        BatchError: If the body is not a JSON array, is empty or is too large.
+    """
+    if content_type in NDJSON_CONTENT_TYPES:
+        records = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                records.append(None)
+    else:
+        try:
+            records = json.loads(body)
+        except json.JSONDecodeError:
+            raise BatchError("Invalid JSON.")
+        if not isinstance(records, list):
+            raise BatchError("A JSON array of robots is expected.")
+
+    if not records:
+        raise BatchError("Empty batch.")
+    if len(records) > MAX_BATCH_SIZE:
+        raise BatchError(f"Too many robots in one request (max {MAX_BATCH_SIZE}).")
+    return records
+
+
+def ingest_batch(records):
+    """
+    Validates the records and saves all valid robots in one transaction.
+
+    Invalid records are reported and skipped, they do not prevent
+    the valid ones from being saved.
+
+    Args:
+        records (list): Decoded records.
+
+    Returns:
+        list: Per-record results in the order of the input, each a dict with
+            "index", "status" ("accepted" or "rejected") and either "id"
+            or "error" and "errors" (see validation.validate_robot).
+            Accepted records identical to an earlier one have "duplicate_of".
+    """
+    results = []
+    robots = []
+    for index, (cleaned, errors, duplicate_of) in enumerate(validate_batch(records)):
+        if errors:
+            results.append(
+                {"index": index, "status": "rejected", **error_response_data(errors)}
+            )
+        else:
+            results.append({"index": index, "status": "accepted"})
+            if duplicate_of is not None:
+                results[index]["duplicate_of"] = duplicate_of
+            # bulk_create bypasses Robot.save, so the serial comes from validation
+            robots.append((index, Robot(**cleaned)))
+
+    if robots:
+        with transaction.atomic():
+            saved = Robot.objects.bulk_create(
+                [robot for _, robot in robots], batch_size=BULK_CREATE_BATCH_SIZE
+            )
+            record_robots(saved)
+            # bulk_create does not send post_save, notify receivers explicitly;
+            # inside the transaction, so queued notifications commit with the robots
+            robots_created.send(sender=Robot, robots=saved)
+        for (index, _), robot in zip(robots, saved):
+            results[index]["id"] = robot.pk
+
+    return results
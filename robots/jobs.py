@@ -0,0 +1,252 @@
+"""
+jobs.py
+
+This module contains the background generation of production reports.
+
+A request enqueues a ReportJob instead of building the report itself.
+The "run_report_jobs" command claims pending jobs, writes every report
+into MEDIA_ROOT/reports/ through the report engine and records its
+progress, so clients can poll the job and download the finished file.
+
+Identical reports share one job: the job key covers the report parameters
+and the version of the robots table, so a request made while the same
+report is queued or running joins that job, and a finished report is
+reused until the robots change.
+
+Functions:
+- job_key: Builds the key identifying a report and the state of the robots.
+- report_spec: Returns the report specification of a job.
+- enqueue_report: Queues a report job or returns an identical existing one.
+- run_job: Builds the report of a claimed job.
+- process_pending_jobs: Claims pending jobs and builds their reports.
+- cleanup_reports: Deletes finished jobs and their files after a retention period.
+"""
+
+import hashlib
+import logging
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import robots_version
+from .models import ReportJob
+from .reports import ReportSpec, write_report
+
+logger = logging.getLogger(__name__)
+
+# A running job not finished after this long is considered abandoned and retried
+STALE_AFTER = timedelta(minutes=30)
+
+# Finished jobs and their files are kept for this long
+RETENTION = timedelta(days=7)
+
+UNFINISHED = (ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING)
+
+
+def job_key(spec, version):
+    """
+    Builds the key identifying a report and the state of the robots.
+
+    Args:
+        spec (ReportSpec): The report specification.
+        version (str): Version of the robots table.
+
+    Returns:
+        str: A SHA-256 hex digest.
+    """
+    parts = (
+        spec.start.isoformat(),
+        spec.end.isoformat(),
+        spec.granularity or "",
+        spec.format,
+        version,
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def report_spec(job):
+    """
+    Returns the report specification of a job.
+
+    Args:
+        job (ReportJob): The job.
+
+    Returns:
+        ReportSpec: The report specification.
+    """
+    return ReportSpec(job.start, job.end, job.granularity or None, job.format)
+
+
+def enqueue_report(spec):
+    """
+    Queues a report job or returns an identical existing one.
+
+    A finished report whose file still exists is returned as is. Otherwise
+    a pending job is created; if an identical job is already queued or
+    running, the unique constraint on unfinished keys rejects the insert
+    and that job is returned instead.
+
+    Args:
+        spec (ReportSpec): The report specification.
+
+    Returns:
+        tuple: The job (ReportJob) and whether it was created.
+    """
+    version, _ = robots_version()
+    key = job_key(spec, version)
+
+    done = (
+        ReportJob.objects.filter(key=key, status=ReportJob.STATUS_DONE)
+        .order_by("-id")
+        .first()
+    )
+    if done is not None and done.file and done.file.storage.exists(done.file.name):
+        return done, False
+
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(
+                key=key,
+                start=spec.start,
+                end=spec.end,
+                granularity=spec.granularity or "",
+                format=spec.format,
+            )
+    except IntegrityError:
+        # an identical job is queued or running, or has finished in between
+        return ReportJob.objects.filter(key=key).latest("id"), False
+    return job, True
+
+
+def _claim_jobs(limit):
+    """
+    Takes up to limit pending jobs (and abandoned running ones) in creation order.
+
+    Rows are locked (skipping the ones locked by other workers) where the
+    database supports it; each job is then switched to running with an UPDATE
+    conditioned on its previous state, so a job is never claimed twice even
+    where rows cannot be locked.
+
+    Args:
+        limit (int): Maximum number of jobs.
+
+    Returns:
+        list: The claimed ReportJob instances.
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        candidates = (
+            ReportJob.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                Q(status=ReportJob.STATUS_PENDING)
+                | Q(status=ReportJob.STATUS_RUNNING, started__lt=now - STALE_AFTER)
+            )
+            .order_by("id")[:limit]
+        )
+        for job in candidates:
+            updated = ReportJob.objects.filter(
+                pk=job.pk, status=job.status, started=job.started
+            ).update(status=ReportJob.STATUS_RUNNING, started=now, progress=0)
+            if updated:
+                job.status, job.started, job.progress = ReportJob.STATUS_RUNNING, now, 0
+                claimed.append(job)
+    return claimed
+
+
+def run_job(job):
+    """
+    Builds the report of a claimed job.
+
+    The report is written into a temporary file and then stored as the
+    job's file; the progress (percentage of processed chunks) is saved
+    after every chunk of the report.
+
+    Args:
+        job (ReportJob): A job claimed by process_pending_jobs.
+
+    Returns:
+        bool: Whether the report was built.
+    """
+    spec = report_spec(job)
+
+    def progress(done, total):
+        ReportJob.objects.filter(pk=job.pk).update(progress=done * 100 // total)
+
+    try:
+        with tempfile.TemporaryFile() as report:
+            write_report(spec, report, progress)
+            report.seek(0)
+            job.file.save(f"{uuid.uuid4().hex}.{spec.format}", File(report), save=False)
+    except Exception as e:
+        logger.error(f"Report job {job.pk} failed: {e}")
+        ReportJob.objects.filter(pk=job.pk).update(
+            status=ReportJob.STATUS_FAILED, error=str(e), finished=timezone.now()
+        )
+        return False
+
+    ReportJob.objects.filter(pk=job.pk).update(
+        status=ReportJob.STATUS_DONE,
+        progress=100,
+        file=job.file.name,
+        finished=timezone.now(),
+    )
+    return True
+
+
+def _run_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        # every thread has its own database connections
+        connections.close_all()
+
+
+def process_pending_jobs(workers=1):
+    """
+    Claims pending jobs and builds their reports.
+
+    Up to workers jobs are claimed and built in parallel threads;
+    report building mostly waits for the database and file writes.
+
+    Args:
+        workers (int): Number of reports built at the same time.
+
+    Returns:
+        tuple: Number of built reports and number of failed jobs.
+    """
+    jobs = _claim_jobs(workers)
+    if not jobs:
+        return 0, 0
+    if workers == 1:
+        results = [run_job(job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_run_in_thread, jobs))
+    built = sum(results)
+    return built, len(results) - built
+
+
+def cleanup_reports(retention=RETENTION):
+    """
+    Deletes finished jobs and their files after a retention period.
+
+    Files are removed by the post_delete handler of ReportJob.
+
+    Args:
+        retention (timedelta): How long finished jobs are kept.
+
+    Returns:
+        int: Number of deleted jobs.
+    """
+    expired = ReportJob.objects.exclude(status__in=UNFINISHED).filter(
+        finished__lt=timezone.now() - retention
+    )
+    deleted, _ = expired.delete()
+    return deleted
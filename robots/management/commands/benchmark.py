@@ -0,0 +1,163 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from robots.benchmarks import SCENARIOS, compare_with_baseline, run_scenarios, seed
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "baseline.json")
+
+
+class Command(BaseCommand):
+    """
+    Runs the benchmark suite of the R4C endpoints.
+
+    The suite runs in a separate test database seeded with synthetic data,
+    so the working database is never touched. The results are compared
+    with a baseline file and the command fails if a scenario regressed.
+    """
+
+    help = "Benchmarks the R4C endpoints against synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--robots", type=int, default=10000, help="Number of seeded robots."
+        )
+        parser.add_argument(
+            "--customers",
+            type=int,
+            default=None,
+            help="Number of seeded customers (default: robots / 10).",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=None,
+            help="Number of seeded orders (default: robots / 10).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Number of measured runs per scenario.",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(SCENARIOS),
+            help="Scenario to run, can be repeated (default: all).",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=DEFAULT_BASELINE,
+            help="Baseline file to compare with.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the results to the baseline file instead of comparing.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed relative increase of a metric, e.g. 0.5 for 50%%.",
+        )
+
+    def handle(self, *args, **options):
+        robots = options["robots"]
+        customers = options["customers"]
+        customers = robots // 10 if customers is None else customers
+        orders = options["orders"]
+        orders = robots // 10 if orders is None else orders
+        names = options["scenario"] or list(SCENARIOS)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(
+                f"Seeding {robots} robots, {customers} customers, {orders} orders..."
+            )
+            seed(robots, customers, orders)
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+            ):
+                results = run_scenarios(names, options["iterations"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.print_results(results)
+
+        if options["update_baseline"]:
+            self.write_baseline(options["baseline"], robots, results)
+            return
+
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write(
+                f"No baseline at {options['baseline']}, nothing to compare."
+            )
+            return
+
+        with open(options["baseline"]) as f:
+            baseline = json.load(f)
+        if baseline.get("robots") != robots:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"The baseline was recorded with {baseline.get('robots')} robots, "
+                    f"this run used {robots}."
+                )
+            )
+
+        regressions = compare_with_baseline(
+            results, baseline.get("scenarios", {}), options["tolerance"]
+        )
+        if regressions:
+            raise CommandError("Regressions found:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions."))
+
+    def print_results(self, results):
+        """
+        Prints the metrics of the scenarios as a table.
+
+        Parameters:
+            results(dict): Metrics by scenario name.
+        """
+        columns = [
+            "p50_ms",
+            "p95_ms",
+            "p99_ms",
+            "throughput_rps",
+            "queries",
+            "response_kb",
+            "peak_memory_kb",
+        ]
+        self.stdout.write(
+            f"{'scenario':<22}" + "".join(f"{column:>16}" for column in columns)
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:<22}" + "".join(f"{metrics[column]:>16}" for column in columns)
+            )
+
+    def write_baseline(self, path, robots, results):
+        """
+        Writes the results to the baseline file.
+
+        Parameters:
+            path(str): Path to the baseline file.
+            robots(int): Number of seeded robots.
+            results(dict): Metrics by scenario name.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"robots": robots, "scenarios": results}, f, indent=4)
+            f.write("\n")
+        self.stdout.write(self.style.SUCCESS(f"Baseline written to {path}."))
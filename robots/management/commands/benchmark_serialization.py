@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.benchmarks import compare_serializers
+from robots.serializers import JSON_BACKEND
+
+
+class Command(BaseCommand):
+    """
+    Compares the robot export serializers with the previous implementation.
+
+    Synthetic rows are converted and encoded as a JSON array and as NDJSON
+    by both implementations. The command fails if the current serializers
+    are slower than the previous ones.
+    """
+
+    help = "Benchmarks the serialization of robot exports."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=1000000, help="Number of serialized rows."
+        )
+        parser.add_argument(
+            "--rows-per-second",
+            type=int,
+            default=1,
+            help="Number of consecutive rows sharing a timestamp.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["rows_per_second"] < 1:
+            raise CommandError("--rows and --rows-per-second must be at least 1.")
+        self.stdout.write(
+            f"Serializing {options['rows']} rows (JSON encoder: {JSON_BACKEND})..."
+        )
+        results = compare_serializers(options["rows"], options["rows_per_second"])
+
+        columns = ["seconds", "rows_per_s", "output_mb", "chunk_peak_kb"]
+        self.stdout.write(
+            f"{'serializer':<12}{'format':<8}"
+            + "".join(f"{column:>16}" for column in columns)
+        )
+        for (implementation, output_format), metrics in results.items():
+            self.stdout.write(
+                f"{implementation:<12}{output_format:<8}"
+                + "".join(f"{metrics[column]:>16}" for column in columns)
+            )
+
+        slower = []
+        for output_format in ("json", "ndjson"):
+            legacy = results[("legacy", output_format)]["seconds"]
+            current = results[("current", output_format)]["seconds"]
+            self.stdout.write(f"{output_format}: {legacy / current:.1f}x faster")
+            if current > legacy:
+                slower.append(output_format)
+        if slower:
+            raise CommandError(
+                "The serializers are slower than the previous implementation: "
+                + ", ".join(slower)
+            )
@@ -0,0 +1,88 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.benchmarks import STARTUP_METRICS, compare_with_baseline, measure_startup
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "startup.json")
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the startup of a worker process.
+
+    Fresh interpreters load the WSGI application and the URL configuration;
+    their import time and resident memory are compared with a baseline file.
+    The command fails if a metric regressed or if a heavy optional module
+    (openpyxl, numpy, pandas, pyarrow) is imported at startup.
+    """
+
+    help = "Benchmarks the import time and memory of a starting worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs", type=int, default=10, help="Number of measured processes."
+        )
+        parser.add_argument(
+            "--settings-module",
+            default=os.environ.get("DJANGO_SETTINGS_MODULE"),
+            help="DJANGO_SETTINGS_MODULE of the measured processes.",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=DEFAULT_BASELINE,
+            help="Baseline file to compare with.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the results to the baseline file instead of comparing.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed relative increase of a metric, e.g. 0.5 for 50%%.",
+        )
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be at least 1.")
+        result = measure_startup(options["runs"], options["settings_module"])
+        self.stdout.write(
+            f"import: {result['import_ms']} ms, RSS: {result['rss_kb']} KB "
+            f"(median of {result['runs']} runs)"
+        )
+
+        if result["heavy_modules"]:
+            raise CommandError(
+                "Heavy modules imported at startup: "
+                + ", ".join(result["heavy_modules"])
+            )
+
+        if options["update_baseline"]:
+            os.makedirs(os.path.dirname(options["baseline"]), exist_ok=True)
+            with open(options["baseline"], "w") as f:
+                json.dump({"startup": result}, f, indent=4)
+                f.write("\n")
+            self.stdout.write(
+                self.style.SUCCESS(f"Baseline written to {options['baseline']}.")
+            )
+            return
+
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write(
+                f"No baseline at {options['baseline']}, nothing to compare."
+            )
+            return
+
+        with open(options["baseline"]) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(
+            {"startup": result}, baseline, options["tolerance"], STARTUP_METRICS
+        )
+        if regressions:
+            raise CommandError("Regressions found:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions."))
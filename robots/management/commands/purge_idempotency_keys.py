@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.idempotency import IDEMPOTENCY_TTL, purge_expired_keys
+
+
+class Command(BaseCommand):
+    """
+    Deletes the stored results of expired idempotency keys.
+
+    Expired keys are already ignored by the ingestion endpoints;
+    run the command from cron to keep the table small.
+    """
+
+    help = "Deletes the stored results of expired idempotency keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=IDEMPOTENCY_TTL.total_seconds() / 3600,
+            help="Age in hours after which keys are deleted.",
+        )
+
+    def handle(self, *args, **options):
+        if options["hours"] < 0:
+            raise CommandError("--hours must not be negative.")
+        deleted = purge_expired_keys(timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired keys."))
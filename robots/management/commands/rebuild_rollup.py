@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the daily production rollup from the robots table.
+
+    Needed after robots were changed bypassing Robot.save and the batch
+    ingestion (e.g. raw SQL or QuerySet.update) or after TIME_ZONE changed.
+    """
+
+    help = "Recomputes the daily production rollup from the robots table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="First day to recompute (YYYY-MM-DD); all days by default.",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['since']}")
+
+        rows = rebuild_rollup(since)
+        self.stdout.write(self.style.SUCCESS(f"Rollup rebuilt: {rows} rows."))
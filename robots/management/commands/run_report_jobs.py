@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.jobs import RETENTION, cleanup_reports, process_pending_jobs
+
+
+class Command(BaseCommand):
+    """
+    Builds the production reports queued as report jobs.
+
+    Without --loop the command drains the queue and exits,
+    which is suitable for cron. With --loop it keeps polling
+    the queue and can be run as a long-lived worker.
+    Finished jobs older than the retention period are deleted
+    with their files whenever the queue is empty.
+    """
+
+    help = "Builds the production reports queued as report jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of reports built at the same time.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when it is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls of an empty queue (with --loop).",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=float,
+            default=RETENTION.total_seconds() / 86400,
+            help="Days finished reports are kept; 0 disables the cleanup.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+        retention = timedelta(days=options["retention_days"])
+
+        total_built = total_failed = total_deleted = 0
+        while True:
+            built, failed = process_pending_jobs(options["workers"])
+            total_built += built
+            total_failed += failed
+            if built or failed:
+                continue
+            if retention:
+                total_deleted += cleanup_reports(retention)
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {total_built} reports, {total_failed} failed, "
+                f"deleted {total_deleted} expired reports."
+            )
+        )
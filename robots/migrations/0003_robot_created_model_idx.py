@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0002_alter_robot_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="robot",
+            index=models.Index(
+                fields=["created", "model", "version"], name="robots_created_model_idx"
+            ),
+        ),
+    ]
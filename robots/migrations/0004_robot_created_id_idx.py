@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0003_robot_created_model_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="robot",
+            index=models.Index(fields=["created", "id"], name="robots_created_id_idx"),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:03
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+
+def fill_serials(apps, schema_editor):
+    """Numbers the robots that were created through the API without a serial."""
+    Robot = apps.get_model("robots", "Robot")
+    Robot.objects.filter(serial="").update(
+        serial=Concat("model", Value("-"), "version")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0004_robot_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_serials, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="robot",
+            name="serial",
+            field=models.CharField(db_index=True, max_length=5),
+        ),
+    ]
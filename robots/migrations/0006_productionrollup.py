@@ -0,0 +1,57 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:05
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_rollup(apps, schema_editor):
+    """Counts the existing robots per day, model and version."""
+    Robot = apps.get_model("robots", "Robot")
+    ProductionRollup = apps.get_model("robots", "ProductionRollup")
+
+    rows = (
+        Robot.objects.annotate(day=TruncDate("created"))
+        .values("day", "model", "version")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    ProductionRollup.objects.bulk_create(
+        [ProductionRollup(**row) for row in rows], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0005_robot_serial_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("model", models.CharField(max_length=2)),
+                ("version", models.CharField(max_length=2)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "model", "version"), name="robots_rollup_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The models that were hardcoded in VALID_MODELS before the registry
+INITIAL_MODELS = ["R2", "13", "X5"]
+
+
+def register_models(apps, schema_editor):
+    """Registers the initial robot models, without restricting their versions."""
+    RobotModel = apps.get_model("robots", "RobotModel")
+    RobotModel.objects.bulk_create([RobotModel(code=code) for code in INITIAL_MODELS])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0006_productionrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RobotModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=2, unique=True)),
+                ("name", models.CharField(blank=True, max_length=100)),
+                ("is_active", models.BooleanField(default=True)),
+            ],
+            options={
+                "ordering": ["code"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RobotVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=2)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "robot_model",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="versions",
+                        to="robots.robotmodel",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["robot_model", "code"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("robot_model", "code"), name="robots_version_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(register_models, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,191 @@
-from django.db import models
+from django.db import models, transaction
+
+# Models registered by the initial migration; the registry (RobotModel) is authoritative
+VALID_MODELS = ["R2", "13", "X5"]
+
+
+def make_serial(model, version):
+    """
+    Builds the serial number of a robot from its model and version, e.g. "R2-D2".
+
+    The serial is derived rather than taken from a counter, so any number
+    of robots can be numbered concurrently without locking a shared row.
+
+    Args:
+        model (str): The robot's model.
+        version (str): The robot's version.
+
+    Returns:
+        str: The serial number.
+    """
+    return f"{model}-{version}"
 
 
 class Robot(models.Model):
-    serial = models.CharField(max_length=5, blank=False, null=False)
+    # "model-version" code that orders refer to, see make_serial
+    serial = models.CharField(max_length=5, blank=False, null=False, db_index=True)
     model = models.CharField(max_length=2, blank=False, null=False)
     version = models.CharField(max_length=2, blank=False, null=False)
     created = models.DateTimeField(blank=False, null=False)
+
+    class Meta:
+        indexes = [
+            # serves production summaries: range on created, grouping by model/version
+            models.Index(
+                fields=["created", "model", "version"],
+                name="robots_created_model_idx",
+            ),
+            # serves keyset pagination of the catalogue by (created, id)
+            models.Index(fields=["created", "id"], name="robots_created_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # robots created through the API come without a serial number
+        if not self.serial:
+            self.serial = make_serial(self.model, self.version)
+        # the production rollup is updated by post_save in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ProductionRollup(models.Model):
+    """
+    Number of robots of a model and version produced on a day.
+
+    Maintained incrementally when robots are created or deleted
+    (see robots.rollup) and rebuilt by the "rebuild_rollup" command.
+    Days are dates in the TIME_ZONE of the project.
+    """
+
+    day = models.DateField()
+    model = models.CharField(max_length=2)
+    version = models.CharField(max_length=2)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "model", "version"], name="robots_rollup_unique"
+            )
+        ]
+
+
+class RobotModel(models.Model):
+    """
+    A robot model that the factory produces, e.g. "R2".
+
+    The registry of models and versions is read through robots.registry,
+    which caches it in every process.
+    """
+
+    code = models.CharField(max_length=2, unique=True)
+    name = models.CharField(max_length=100, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["code"]
+
+    def __str__(self):
+        return self.code
+
+
+class RobotVersion(models.Model):
+    """
+    A version of a robot model, e.g. "D2" of "R2".
+
+    A model without active versions accepts robots of any version;
+    once versions are registered, only those are accepted.
+    """
+
+    robot_model = models.ForeignKey(
+        RobotModel, on_delete=models.CASCADE, related_name="versions"
+    )
+    code = models.CharField(max_length=2)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["robot_model", "code"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["robot_model", "code"], name="robots_version_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.robot_model.code}-{self.code}"
+
+
+class ReportJob(models.Model):
+    """
+    A production report built in the background by the "run_report_jobs" command.
+
+    Identical reports requested while one is queued or running share one job:
+    "key" identifies the report parameters and the state of the robots table,
+    and at most one unfinished job may exist per key.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    key = models.CharField(max_length=64)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    granularity = models.CharField(max_length=5, blank=True)
+    format = models.CharField(max_length=7)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    progress = models.PositiveSmallIntegerField(default=0)
+    file = models.FileField(upload_to="reports/", blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+    finished = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # the worker picks pending jobs in creation order
+            models.Index(fields=["status", "id"], name="robots_report_status_idx"),
+            # finished reports are reused for identical requests
+            models.Index(fields=["key", "status"], name="robots_report_key_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(status__in=["pending", "running"]),
+                name="robots_report_unfinished_unique",
+            )
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    The result of an ingestion request sent with an idempotency key.
+
+    A retried request with the same key gets the stored response instead of
+    creating the robots again (see robots.idempotency). Keys expire after
+    a TTL and are removed by the "purge_idempotency_keys" command.
+    """
+
+    endpoint = models.CharField(max_length=16)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request body, to detect a key reused for another request
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["endpoint", "key"], name="robots_idempotency_key_unique"
+            )
+        ]
@@ -0,0 +1,130 @@
+"""
+pagination.py
+
+This module contains keyset (cursor) pagination of robots.
+
+Robots are listed from the newest to the oldest by (created, id).
+Instead of an OFFSET, a page is requested relative to the cursor
+of a neighbouring page, so every page costs one index range scan
+regardless of how deep it is in the production history.
+
+Functions:
+- encode_cursor: Builds the cursor of a robot.
+- decode_cursor: Parses a cursor.
+- paginate_robots: Returns one page of robots.
+"""
+
+import base64
+from dataclasses import dataclass
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Number of robot cards on a page
+PAGE_SIZE = 24
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class KeysetPage:
+    """
+    One page of robots.
+
+    Attributes:
+        items (list): Robots on the page, newest first.
+        next_cursor (str): Cursor to request the next (older) page, or None.
+        previous_cursor (str): Cursor to request the previous (newer) page, or None.
+    """
+
+    items: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+
+def encode_cursor(robot):
+    """
+    Builds the cursor of a robot.
+
+    Args:
+        robot (Robot): A robot on a page.
+
+    Returns:
+        str: An URL-safe cursor.
+    """
+    value = f"{robot.created.isoformat()}|{robot.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Parses a cursor.
+
+    Args:
+        cursor (str): A cursor built by encode_cursor.
+
+    Returns:
+        tuple: Creation time and id of the robot.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid page cursor.")
+    if created is None:
+        raise InvalidCursor("Invalid page cursor.")
+    return created, pk
+
+
+def paginate_robots(queryset, after=None, before=None, per_page=PAGE_SIZE):
+    """
+    Returns one page of robots.
+
+    Args:
+        queryset (QuerySet): Robots to paginate (filters are kept).
+        after (str): Cursor of the last robot of the previous page.
+        before (str): Cursor of the first robot of the next page.
+        per_page (int): Number of robots on a page.
+
+    Returns:
+        KeysetPage: The requested page (the first one without cursors).
+
+    Raises:
+        InvalidCursor: If a cursor is malformed.
+    """
+    if before:
+        created, pk = decode_cursor(before)
+        # walk towards newer robots and restore the order afterwards
+        rows = list(
+            queryset.filter(
+                Q(created__gt=created) | Q(created=created, pk__gt=pk)
+            ).order_by("created", "pk")[: per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        return KeysetPage(
+            items=items,
+            next_cursor=encode_cursor(items[-1]) if items else None,
+            previous_cursor=encode_cursor(items[0]) if has_more else None,
+        )
+
+    if after:
+        created, pk = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(created__lt=created) | Q(created=created, pk__lt=pk)
+        )
+    rows = list(queryset.order_by("-created", "-pk")[: per_page + 1])
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    return KeysetPage(
+        items=items,
+        next_cursor=encode_cursor(items[-1]) if has_more else None,
+        previous_cursor=encode_cursor(items[0]) if after and items else None,
+    )
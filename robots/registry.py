@@ -0,0 +1,144 @@
+"""
+registry.py
+
+This module contains the cached registry of robot models and versions.
+
+The registry is stored in the RobotModel and RobotVersion tables and kept
+in the memory of every process, so lookups are dictionary hits. A change
+of the registry stores a new version in the shared cache; every process
+compares its copy with that version at most once per CHECK_INTERVAL
+seconds and reloads it when it is stale, so new products are picked up
+by all workers without a restart.
+
+Functions:
+- get_registry: Returns the registry as {model: frozenset of versions}.
+- aget_registry: Async version of get_registry.
+- model_codes: Returns the codes of the active models.
+- is_valid_product: Checks whether a model and version may be produced.
+- invalidate_registry: Makes all processes reload the registry.
+"""
+
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .models import RobotModel, RobotVersion
+
+VERSION_KEY = "robots:registry:version"
+
+# Seconds between checks of the shared registry version
+CHECK_INTERVAL = 5
+
+_lock = threading.Lock()
+_state = {"version": None, "registry": None, "checked": 0.0}
+
+
+def _load():
+    """
+    Reads the active models and versions from the database.
+
+    Returns:
+        dict: {model code: frozenset of version codes} in model order.
+    """
+    registry = {
+        code: set()
+        for code in RobotModel.objects.filter(is_active=True).values_list(
+            "code", flat=True
+        )
+    }
+    versions = RobotVersion.objects.filter(
+        is_active=True, robot_model__is_active=True
+    ).values_list("robot_model__code", "code")
+    for model, version in versions:
+        registry[model].add(version)
+    return {model: frozenset(codes) for model, codes in registry.items()}
+
+
+def get_registry():
+    """
+    Returns the registry of active robot models and their versions.
+
+    Returns:
+        dict: {model code: frozenset of version codes}; an empty set means
+            that any version of the model is accepted.
+    """
+    now = time.monotonic()
+    # read once: invalidate_registry may reset it concurrently
+    registry = _state["registry"]
+    if registry is not None and now - _state["checked"] < CHECK_INTERVAL:
+        return registry
+
+    with _lock:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # first lookup after the cache was cleared
+            cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(VERSION_KEY)
+        registry = _state["registry"]
+        if registry is None or version != _state["version"]:
+            registry = _load()
+            _state["registry"] = registry
+            _state["version"] = version
+        _state["checked"] = now
+        return registry
+
+
+async def aget_registry():
+    """
+    Async version of get_registry.
+
+    A fresh copy is returned without leaving the event loop; checking the
+    shared version and reloading the registry run in the sync thread,
+    as they query the cache and the database.
+
+    Returns:
+        dict: {model code: frozenset of version codes}.
+    """
+    registry = _state["registry"]
+    if registry is not None and time.monotonic() - _state["checked"] < CHECK_INTERVAL:
+        return registry
+    return await sync_to_async(get_registry)()
+
+
+def model_codes():
+    """
+    Returns the codes of the active models.
+
+    Returns:
+        list: Model codes in registry order.
+    """
+    return list(get_registry())
+
+
+def is_valid_product(model, version, registry=None):
+    """
+    Checks whether a model and version may be produced.
+
+    Args:
+        model (str): The model code.
+        version (str): The version code.
+        registry (dict): The registry, to avoid looking it up per record.
+
+    Returns:
+        tuple: Whether the model is valid and whether the version is valid.
+    """
+    registry = get_registry() if registry is None else registry
+    versions = registry.get(model) if isinstance(model, str) else None
+    if versions is None:
+        return False, False
+    return True, not versions or (isinstance(version, str) and version in versions)
+
+
+def invalidate_registry():
+    """
+    Makes all processes reload the registry.
+
+    The current process reloads it on the next lookup,
+    the others within CHECK_INTERVAL seconds.
+    """
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    with _lock:
+        _state["registry"] = None
@@ -0,0 +1,353 @@
+"""
+reports.py
+
+This module contains the production report engine.
+
+A report counts robots per model and version (and optionally per day, week
+or month) over an arbitrary date range and is written as an Excel workbook
+(a summary sheet plus a sheet per model), CSV, JSON or, when pyarrow
+is installed, Parquet.
+
+The range is processed chunk by chunk: every chunk is aggregated by
+production_summary (whole days come from the daily rollup) and its rows
+are written out before the next chunk is read, so the memory used does not
+grow with the length of the range. Chunk bounds are aligned to the periods
+of the report, so no period is split between chunks.
+
+openpyxl (which also loads numpy when it is installed) and pyarrow are
+imported on first use, so loading the URL configuration does not pay for
+them in processes that never build a workbook.
+
+Classes:
+- ReportSpec: Parameters of a report.
+
+Functions:
+- spec_from_params: Builds a report specification from request parameters.
+- iter_report_rows: Yields the rows of a report chunk by chunk.
+- write_report: Writes a report into a binary file.
+- weekly_workbook: Builds the weekly workbook of RobotExcel.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .exports import ExportFilterError
+from .registry import get_registry, model_codes
+from .summary import DEFAULT_WINDOW, production_summary, window_from_params
+
+CONTENT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Formats offered and accepted: Parquet needs the optional pyarrow package
+REPORT_FORMATS = {
+    name: content_type
+    for name, content_type in CONTENT_TYPES.items()
+    if name != "parquet" or importlib.util.find_spec("pyarrow") is not None
+}
+
+# Chunk length in weeks for weekly reports; other reports are chunked by month
+WEEKS_PER_CHUNK = 4
+
+# Number of rows in a Parquet row group
+PARQUET_ROW_GROUP_SIZE = 10000
+
+SUMMARY_SHEET_TITLE = "Итого"
+REPORT_HEADERS = ["Модель", "Версия", "Количество"]
+PERIOD_HEADER = "Период"
+WEEKLY_HEADERS = ["Модель", "Версия", "Количество за неделю"]
+
+
+class ReportError(ValueError):
+    """Raised when a report cannot be built with the requested parameters."""
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    """
+    Parameters of a report.
+
+    Attributes:
+        start (datetime): Start of the range (inclusive).
+        end (datetime): End of the range (inclusive).
+        granularity (str): "day", "week", "month" or None for totals only.
+        format (str): One of CONTENT_TYPES.
+    """
+
+    start: datetime
+    end: datetime
+    granularity: str = None
+    format: str = "xlsx"
+
+    @property
+    def content_type(self):
+        return CONTENT_TYPES[self.format]
+
+    @property
+    def filename(self):
+        return f"robots_{self.start:%Y%m%d}_{self.end:%Y%m%d}.{self.format}"
+
+
+def spec_from_params(params):
+    """
+    Builds a report specification from request parameters.
+
+    Supported parameters: start, end, granularity (see window_from_params)
+    and format (xlsx by default).
+
+    Args:
+        params (QueryDict): The request parameters.
+
+    Returns:
+        ReportSpec: The report specification.
+
+    Raises:
+        ReportError: If a parameter is invalid.
+    """
+    try:
+        start, end, granularity = window_from_params(params)
+    except ExportFilterError as fe:
+        raise ReportError(str(fe))
+    if not params.get("end"):
+        # the default window ends now; truncated to the minute as in RobotExcel,
+        # so identical requests within a minute get the same report (and job)
+        end = end.replace(second=0, microsecond=0)
+        if not params.get("start"):
+            start = end - DEFAULT_WINDOW
+    if start > end:
+        raise ReportError("The start of the range is after its end.")
+
+    report_format = params.get("format") or "xlsx"
+    if report_format not in REPORT_FORMATS:
+        raise ReportError(f"Unsupported format: {report_format}.")
+    return ReportSpec(start, end, granularity, report_format)
+
+
+def _chunk_bounds(start, end, granularity):
+    """
+    Splits the range into chunks aligned to the periods of the report.
+
+    Args:
+        start (datetime): Start of the range.
+        end (datetime): End of the range.
+        granularity (str): Period of the report.
+
+    Yields:
+        tuple: Start and end (inclusive) of every chunk.
+    """
+    day = timezone.localtime(start).date()
+    if granularity == "week":
+        day -= timedelta(days=day.weekday())
+    else:
+        day = day.replace(day=1)
+
+    chunk_start = start
+    while chunk_start <= end:
+        if granularity == "week":
+            day += timedelta(weeks=WEEKS_PER_CHUNK)
+        else:
+            day = (day + timedelta(days=32)).replace(day=1)
+        boundary = timezone.make_aware(datetime.combine(day, time.min))
+        chunk_end = min(boundary - timedelta(microseconds=1), end)
+        yield chunk_start, chunk_end
+        chunk_start = boundary
+
+
+def iter_report_rows(spec, progress=None):
+    """
+    Yields the rows of a report chunk by chunk.
+
+    Reports without granularity are totals over the whole range,
+    so their counts are accumulated over the chunks (one entry
+    per model and version) and yielded at the end.
+
+    Args:
+        spec (ReportSpec): The report specification.
+        progress: Optional callback called with the number of processed
+            chunks and the total number of chunks after every chunk.
+
+    Yields:
+        dict: Rows with "model", "version", "count"
+            and a "period" (date) if the report has a granularity.
+    """
+    totals = {}
+    chunks = list(_chunk_bounds(spec.start, spec.end, spec.granularity))
+    for index, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+        for row in production_summary(chunk_start, chunk_end, spec.granularity):
+            if spec.granularity:
+                yield {**row, "period": timezone.localtime(row["period"]).date()}
+            else:
+                key = (row["model"], row["version"])
+                totals[key] = totals.get(key, 0) + row["count"]
+        if progress is not None:
+            progress(index, len(chunks))
+
+    for (model, version), count in sorted(totals.items()):
+        yield {"model": model, "version": version, "count": count}
+
+
+def _row_values(row, granularity):
+    values = [row["model"], row["version"], row["count"]]
+    return [row["period"]] + values if granularity else values
+
+
+def _headers(granularity):
+    return [PERIOD_HEADER] + REPORT_HEADERS if granularity else REPORT_HEADERS
+
+
+def _write_xlsx(spec, out, progress=None):
+    """
+    Writes the report as a workbook: a summary sheet with the totals
+    per model and version, then a sheet per model with the report rows.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    # the summary sheet comes first but is filled once all rows are counted
+    summary = workbook.create_sheet(title=SUMMARY_SHEET_TITLE)
+    sheets = {}
+    for model in model_codes():
+        sheets[model] = workbook.create_sheet(title=model)
+        sheets[model].append(_headers(spec.granularity))
+
+    totals = {}
+    for row in iter_report_rows(spec, progress):
+        sheet = sheets.get(row["model"])
+        if sheet is None:
+            # a model removed from the registry that still has robots
+            sheet = sheets[row["model"]] = workbook.create_sheet(title=row["model"])
+            sheet.append(_headers(spec.granularity))
+        sheet.append(_row_values(row, spec.granularity))
+        key = (row["model"], row["version"])
+        totals[key] = totals.get(key, 0) + row["count"]
+
+    summary.append(REPORT_HEADERS)
+    for (model, version), count in sorted(totals.items()):
+        summary.append([model, version, count])
+    summary.append([SUMMARY_SHEET_TITLE, "", sum(totals.values())])
+    workbook.save(out)
+
+
+def _write_csv(spec, out, progress=None):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(_headers(spec.granularity))
+    for row in iter_report_rows(spec, progress):
+        writer.writerow(_row_values(row, spec.granularity))
+    text.flush()
+    text.detach()
+
+
+def _write_json(spec, out, progress=None):
+    header = {
+        "start": spec.start,
+        "end": spec.end,
+        "granularity": spec.granularity,
+    }
+    # the rows are written one by one between the header and the closing bracket
+    opening = json.dumps(header, cls=DjangoJSONEncoder)[:-1] + ', "rows": ['
+    out.write(opening.encode())
+    for index, row in enumerate(iter_report_rows(spec, progress)):
+        prefix = "," if index else ""
+        out.write((prefix + json.dumps(row, cls=DjangoJSONEncoder)).encode())
+    out.write(b"]}")
+
+
+def _write_parquet(spec, out, progress=None):
+    """
+    Writes the report as Parquet, one row group per chunk of rows.
+
+    Requires the optional pyarrow package.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ReportError("Parquet reports require the pyarrow package.")
+
+    fields = [
+        ("model", pyarrow.string()),
+        ("version", pyarrow.string()),
+        ("count", pyarrow.int64()),
+    ]
+    if spec.granularity:
+        fields.insert(0, ("period", pyarrow.date32()))
+    schema = pyarrow.schema(fields)
+
+    with pyarrow.parquet.ParquetWriter(out, schema) as writer:
+        batch = []
+        for row in iter_report_rows(spec, progress):
+            batch.append(row)
+            if len(batch) >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+
+
+WRITERS = {
+    "xlsx": _write_xlsx,
+    "csv": _write_csv,
+    "json": _write_json,
+    "parquet": _write_parquet,
+}
+
+
+def write_report(spec, out, progress=None):
+    """
+    Writes a report into a binary file.
+
+    Args:
+        spec (ReportSpec): The report specification.
+        out: A writable binary file object.
+        progress: Optional progress callback, see iter_report_rows.
+
+    Raises:
+        ReportError: If the format needs a missing optional package.
+    """
+    WRITERS[spec.format](spec, out, progress)
+
+
+def weekly_workbook(data):
+    """
+    Builds the weekly workbook of RobotExcel.
+
+    Every registered model gets a sheet, even without robots in the window.
+    Uses a write-only workbook: rows are written straight to the sheets
+    without building intermediate tables.
+
+    Args:
+        data (dict): Counts as {model: {version: count}}.
+
+    Returns:
+        bytes: Content of the workbook.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    # a sheet for every registered model, then for unregistered ones with robots
+    models = list(get_registry())
+    models += [model for model in data if model not in models]
+    for model in models:
+        sheet = workbook.create_sheet(title=model)
+        sheet.append(WEEKLY_HEADERS)
+        for version, count in data.get(model, {}).items():
+            sheet.append([model, version, count])
+
+    # a workbook must contain at least one sheet
+    if not models:
+        workbook.create_sheet().append(WEEKLY_HEADERS)
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,127 @@
+"""
+rollup.py
+
+This module maintains the daily production rollup: the number of robots
+of every model and version produced per day (ProductionRollup).
+
+Reports read whole days from the rollup instead of scanning the robots
+table, so their cost depends on the number of days, not of robots.
+
+Functions:
+- rollup_day: Returns the rollup day of a robot's creation time.
+- record_robots: Adds robots to the rollup (or removes them).
+- rebuild_rollup: Recomputes the rollup from the robots table.
+- daily_counts: Returns the rollup rows of a range of days.
+"""
+
+from collections import Counter
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ProductionRollup, Robot
+
+
+def rollup_day(created):
+    """
+    Returns the rollup day of a robot's creation time.
+
+    Args:
+        created: Creation time as a datetime (naive ones are in TIME_ZONE)
+            or as an ISO string, as received from the robot form.
+
+    Returns:
+        date: The day in the project's time zone.
+    """
+    if isinstance(created, str):
+        created = Robot._meta.get_field("created").to_python(created)
+    if timezone.is_naive(created):
+        return created.date()
+    return timezone.localtime(created).date()
+
+
+def record_robots(robots, sign=1):
+    """
+    Adds robots to the rollup (or removes them).
+
+    Missing rows are created first, then each (day, model, version) is
+    incremented with a single UPDATE ... SET count = count + n, so concurrent
+    writers never lose an increment. Call it inside the transaction
+    that saves the robots.
+
+    Args:
+        robots (list): Robot instances.
+        sign (int): 1 to add the robots, -1 to remove them.
+    """
+    counts = Counter(
+        (rollup_day(robot.created), robot.model, robot.version) for robot in robots
+    )
+    if not counts:
+        return
+
+    if sign > 0:
+        ProductionRollup.objects.bulk_create(
+            [
+                ProductionRollup(day=day, model=model, version=version)
+                for day, model, version in counts
+            ],
+            ignore_conflicts=True,
+        )
+    for (day, model, version), count in counts.items():
+        ProductionRollup.objects.filter(day=day, model=model, version=version).update(
+            count=F("count") + sign * count
+        )
+
+
+def rebuild_rollup(since=None):
+    """
+    Recomputes the rollup from the robots table.
+
+    Args:
+        since (date): First day to recompute; all days if None.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    robots = Robot.objects.all()
+    rollups = ProductionRollup.objects.all()
+    if since is not None:
+        start = timezone.make_aware(datetime.combine(since, datetime.min.time()))
+        robots = robots.filter(created__gte=start)
+        rollups = rollups.filter(day__gte=since)
+
+    rows = (
+        robots.annotate(day=TruncDate("created"))
+        .values("day", "model", "version")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = ProductionRollup.objects.bulk_create(
+            [ProductionRollup(**row) for row in rows.iterator()], batch_size=500
+        )
+    return len(created)
+
+
+def daily_counts(first_day, last_day):
+    """
+    Returns the rollup rows of a range of days.
+
+    Args:
+        first_day (date): First day (inclusive).
+        last_day (date): Last day (inclusive).
+
+    Returns:
+        QuerySet: Dicts with "day", "model", "version" and "count" keys.
+    """
+    return (
+        ProductionRollup.objects.filter(
+            day__gte=first_day, day__lte=last_day, count__gt=0
+        )
+        .values("day", "model", "version", "count")
+        .order_by("day", "model", "version")
+    )
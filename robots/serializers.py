@@ -0,0 +1,143 @@
+"""
+serializers.py
+
+This module contains the serialization of robot rows shared by the exports
+and the JSON page.
+
+Rows are (model, version, created) tuples fetched with values_list, so no
+model instances are built. Timestamps are formatted with datetime.isoformat,
+which is implemented in C and faster than strftime, and a timestamp equal to
+the one of the previous row is not formatted again: the robots of a batch
+are stored next to each other and share their creation time.
+
+The exports encode the rows straight to bytes, without building a dict per
+robot: the JSON of the model and version is encoded once per pair (with
+orjson when it is installed, or the standard json module otherwise) and
+joined with the timestamps, which never need escaping.
+
+Functions:
+- format_timestamps: Formats the creation times of a chunk of rows.
+- serialize_robots: Converts a chunk of rows to robot dicts.
+- encode_items: Encodes a chunk of rows as comma-separated JSON array items.
+- encode_lines: Encodes a chunk of rows as NDJSON lines.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, the standard json module is used without it
+    orjson = None
+
+# Name of the JSON encoder in use
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# json.dumps builds a new encoder per call when given options, so one is reused
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _dumps(value):
+    """Encodes a value as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _encoder.encode(value).encode()
+
+
+def _format(value):
+    """Formats a timestamp as strftime("%Y-%m-%d %H:%M:%S") would."""
+    return value.isoformat(" ", "seconds")[:19]
+
+
+def format_timestamps(values):
+    """
+    Formats the creation times of a chunk of rows.
+
+    The result is the one of strftime("%Y-%m-%d %H:%M:%S") (exports.DATE_FORMAT),
+    in the time zone of the values.
+
+    Args:
+        values (list): datetimes.
+
+    Returns:
+        list: Formatted strings in the order of the values.
+    """
+    result = []
+    previous = text = None
+    for value in values:
+        if value != previous:
+            previous, text = value, _format(value)
+        result.append(text)
+    return result
+
+
+def serialize_robots(rows):
+    """
+    Converts a chunk of rows to robot dicts.
+
+    Args:
+        rows (list): (model, version, created) tuples.
+
+    Returns:
+        list: Robots as dicts with the "model", "version" and "created" keys.
+    """
+    timestamps = format_timestamps([row[2] for row in rows])
+    return [
+        {"model": model, "version": version, "created": created}
+        for (model, version, _), created in zip(rows, timestamps)
+    ]
+
+
+def _encode_rows(rows):
+    """
+    Encodes every row as a JSON object.
+
+    Args:
+        rows (list): (model, version, created) tuples.
+
+    Returns:
+        list: The encoded robots (bytes).
+    """
+    prefixes = {}
+    encoded = []
+    previous = suffix = None
+    for model, version, created in rows:
+        prefix = prefixes.get((model, version))
+        if prefix is None:
+            prefix = prefixes[(model, version)] = (
+                b'{"model":'
+                + _dumps(model)
+                + b',"version":'
+                + _dumps(version)
+                + b',"created":"'
+            )
+        if created != previous:
+            previous, suffix = created, _format(created).encode() + b'"}'
+        encoded.append(prefix + suffix)
+    return encoded
+
+
+def encode_items(rows):
+    """
+    Encodes a chunk of rows as comma-separated JSON array items.
+
+    Args:
+        rows (list): (model, version, created) tuples.
+
+    Returns:
+        bytes: Robots with the "model", "version" and "created" keys,
+            without the enclosing brackets.
+    """
+    return b",".join(_encode_rows(rows))
+
+
+def encode_lines(rows):
+    """
+    Encodes a chunk of rows as NDJSON lines.
+
+    Args:
+        rows (list): (model, version, created) tuples.
+
+    Returns:
+        bytes: One robot per line, each line ending with a newline.
+    """
+    return b"\n".join(_encode_rows(rows)) + b"\n"
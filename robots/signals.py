@@ -0,0 +1,164 @@
+"""
+signals.py
+
+This module contains custom signals sent by the robots application
+and the handlers that keep robot caches up to date.
+
+Signals:
+- robots_created: Sent after a batch of robots has been saved with bulk_create,
+  inside the same transaction (like post_save), so work done by receivers is
+  committed or rolled back together with the robots.
+  Django does not send post_save for bulk inserts, so receivers that react to
+  new robots should listen to this signal as well.
+  Arguments: sender (the Robot class), robots (list of saved Robot instances).
+
+Handlers:
+- invalidate_robot_caches: Bumps the robots table version when robots change.
+- remember_rollup_key: Remembers the rollup row of a robot before it is updated.
+- add_to_rollup: Counts a new or moved robot in the daily production rollup.
+- remove_from_rollup: Removes a deleted robot from the daily production rollup.
+- reload_registry: Makes all processes reload the registry of models and versions.
+- delete_report_file: Deletes the file of a deleted report job.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from R4C.metrics import instrument_handler
+
+from .cache import bump_robots_version
+from .models import ReportJob, Robot, RobotModel, RobotVersion
+from .registry import invalidate_registry
+from .rollup import record_robots, rollup_day
+
+robots_created = Signal()
+
+
+@receiver(post_save, sender=Robot)
+@receiver(post_delete, sender=Robot)
+@receiver(robots_created, sender=Robot)
+@instrument_handler
+def invalidate_robot_caches(sender, **kwargs):
+    """
+    Bumps the robots table version once the change is committed,
+    making cached reports, pages and fragments stale.
+
+    Bumping before the commit would let a concurrent request cache
+    the old robots under the new version.
+
+    Parameters:
+        sender: The model class that sends the signal (Robot).
+        kwargs: Additional arguments.
+    """
+    transaction.on_commit(bump_robots_version)
+
+
+@receiver(pre_save, sender=Robot)
+def remember_rollup_key(sender, instance, raw=False, **kwargs):
+    """
+    Remembers the stored creation time, model and version of an updated robot,
+    so add_to_rollup can move it to its new rollup row.
+
+    Runs inside the transaction of Robot.save; the row is locked
+    until the rollup is updated.
+
+    Parameters:
+        sender: The model class that sends the signal (Robot).
+        instance: The model instance being saved.
+        raw: Whether the instance is being loaded from a fixture.
+        kwargs: Additional arguments.
+    """
+    instance._rollup_previous = None
+    if instance.pk is not None and not raw:
+        instance._rollup_previous = (
+            Robot.objects.select_for_update()
+            .filter(pk=instance.pk)
+            .values("created", "model", "version")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Robot)
+@instrument_handler
+def add_to_rollup(sender, instance, created, raw=False, **kwargs):
+    """
+    Counts a new robot in the daily production rollup, or moves an updated
+    robot whose day, model or version changed to its new rollup row.
+
+    Runs inside the transaction of Robot.save, so the robot
+    and its count are committed together. QuerySet.update() sends
+    no signals; run "rebuild_rollup" after such bulk changes.
+
+    Parameters:
+        sender: The model class that sends the signal (Robot).
+        instance: The model instance that was saved.
+        created: A boolean flag indicating whether a new instance was created.
+        raw: Whether the instance is being loaded from a fixture.
+        kwargs: Additional arguments.
+    """
+    if raw:
+        return
+    if created:
+        record_robots([instance])
+        return
+
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous is None:
+        return
+    old = Robot(**previous)
+    if (rollup_day(old.created), old.model, old.version) != (
+        rollup_day(instance.created),
+        instance.model,
+        instance.version,
+    ):
+        record_robots([old], sign=-1)
+        record_robots([instance])
+
+
+@receiver(post_delete, sender=Robot)
+@instrument_handler
+def remove_from_rollup(sender, instance, **kwargs):
+    """
+    Removes a deleted robot from the daily production rollup.
+
+    Parameters:
+        sender: The model class that sends the signal (Robot).
+        instance: The model instance that was deleted.
+        kwargs: Additional arguments.
+    """
+    record_robots([instance], sign=-1)
+
+
+@receiver(post_save, sender=RobotModel)
+@receiver(post_delete, sender=RobotModel)
+@receiver(post_save, sender=RobotVersion)
+@receiver(post_delete, sender=RobotVersion)
+def reload_registry(sender, **kwargs):
+    """
+    Makes all processes reload the registry of models and versions
+    once the change is committed.
+
+    Reports list the registered models, so they are made stale as well.
+
+    Parameters:
+        sender: The model class that sends the signal (RobotModel or RobotVersion).
+        kwargs: Additional arguments.
+    """
+    transaction.on_commit(invalidate_registry)
+    transaction.on_commit(bump_robots_version)
+
+
+@receiver(post_delete, sender=ReportJob)
+def delete_report_file(sender, instance, **kwargs):
+    """
+    Deletes the file of a deleted report job once the deletion is committed.
+
+    Parameters:
+        sender: The model class that sends the signal (ReportJob).
+        instance: The model instance that was deleted.
+        kwargs: Additional arguments.
+    """
+    if instance.file:
+        name, storage = instance.file.name, instance.file.storage
+        transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,207 @@
+"""
+summary.py
+
+This module contains the production summary of robots aggregated by the database.
+
+Functions:
+- summary_queryset: Builds the aggregating query over the robots table.
+- production_summary: Counts robots per model and version (and period) in a date window,
+  reading whole days from the daily production rollup.
+- group_by_model: Groups summary rows into a {model: {version: count}} dictionary.
+- window_from_params: Builds the summary window from the request parameters.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .exports import ExportFilterError, parse_bound
+from .models import Robot
+from .rollup import daily_counts, rollup_day
+
+GRANULARITIES = ("day", "week", "month")
+
+# Length of the default summary window
+DEFAULT_WINDOW = timedelta(days=7)
+
+# Resolution of the window bounds
+EPSILON = timedelta(microseconds=1)
+
+
+def summary_queryset(start, end, granularity=None):
+    """
+    Builds the query counting robots per model and version in the date window.
+
+    Args:
+        start (datetime): Start of the window (inclusive).
+        end (datetime): End of the window (inclusive).
+        granularity (str): Optional period ("day", "week" or "month").
+
+    Returns:
+        QuerySet: The aggregating query (not evaluated yet).
+
+    Raises:
+        ValueError: If the granularity is not supported.
+    """
+    robots = Robot.objects.filter(created__gte=start, created__lte=end)
+    fields = ["model", "version"]
+
+    if granularity:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}.")
+        robots = robots.annotate(period=Trunc("created", granularity))
+        fields.insert(0, "period")
+
+    return robots.values(*fields).annotate(count=Count("id")).order_by(*fields)
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _raw_daily_counts(start, end):
+    """
+    Counts robots per day, model and version in the robots table.
+
+    Args:
+        start (datetime): Start of the window (inclusive).
+        end (datetime): End of the window (inclusive).
+
+    Returns:
+        list: Tuples of (day, model, version, count).
+    """
+    if start > end:
+        return []
+    return [
+        (rollup_day(row["period"]), row["model"], row["version"], row["count"])
+        for row in summary_queryset(start, end, "day")
+    ]
+
+
+def _period(day, granularity):
+    """
+    Returns the start of the period containing a day.
+
+    Args:
+        day (date): The day.
+        granularity (str): "day", "week", "month" or None.
+
+    Returns:
+        datetime: Aware midnight of the first day of the period, or None.
+    """
+    if granularity is None:
+        return None
+    if granularity == "week":
+        day -= timedelta(days=day.weekday())
+    elif granularity == "month":
+        day = day.replace(day=1)
+    return _midnight(day)
+
+
+def production_summary(start, end, granularity=None):
+    """
+    Counts robots per model and version produced in the date window.
+
+    Whole days of the window are read from the daily production rollup,
+    only the partial days at its edges are counted in the robots table
+    (served by the (created, model, version) index). The cost of a summary
+    therefore depends on the length of the window, not on the number of robots.
+
+    Args:
+        start (datetime): Start of the window (inclusive).
+        end (datetime): End of the window (inclusive).
+        granularity (str): Optional period ("day", "week" or "month")
+            to additionally group by.
+
+    Returns:
+        list: Dicts with "model", "version", "count" keys
+            and a "period" key if granularity is given.
+
+    Raises:
+        ValueError: If the granularity is not supported.
+    """
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}.")
+
+    # whole days inside the window
+    first_day = rollup_day(start)
+    if start > _midnight(first_day):
+        first_day += timedelta(days=1)
+    last_day = rollup_day(end)
+    if end + EPSILON < _midnight(last_day + timedelta(days=1)):
+        last_day -= timedelta(days=1)
+
+    if first_day > last_day:
+        daily = _raw_daily_counts(start, end)
+    else:
+        daily = _raw_daily_counts(start, _midnight(first_day) - EPSILON)
+        daily += [
+            (row["day"], row["model"], row["version"], row["count"])
+            for row in daily_counts(first_day, last_day)
+        ]
+        daily += _raw_daily_counts(_midnight(last_day + timedelta(days=1)), end)
+
+    counts = {}
+    for day, model, version, count in daily:
+        key = (_period(day, granularity), model, version)
+        counts[key] = counts.get(key, 0) + count
+
+    rows = []
+    for (period, model, version), count in sorted(counts.items()):
+        row = {"model": model, "version": version, "count": count}
+        if granularity:
+            row = {"period": period, **row}
+        rows.append(row)
+    return rows
+
+
+def group_by_model(rows):
+    """
+    Groups summary rows by model and version.
+
+    Args:
+        rows (list): Rows returned by production_summary.
+
+    Returns:
+        dict: A dictionary of the form {model: {version: count}}.
+    """
+    data = {}
+    for row in rows:
+        versions = data.setdefault(row["model"], {})
+        versions[row["version"]] = versions.get(row["version"], 0) + row["count"]
+    return data
+
+
+def window_from_params(params):
+    """
+    Builds the summary window from the request parameters.
+
+    Supported parameters: start, end (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)
+    and granularity. Without dates the window covers the last seven days.
+
+    Args:
+        params (QueryDict): The request GET parameters.
+
+    Returns:
+        tuple: Start, end and granularity (None if not given).
+
+    Raises:
+        ExportFilterError: If a parameter is invalid.
+    """
+    end = timezone.now()
+    if params.get("end"):
+        end, whole_day = parse_bound(params["end"])
+        if whole_day:
+            end += timedelta(days=1) - timedelta(microseconds=1)
+
+    start = end - DEFAULT_WINDOW
+    if params.get("start"):
+        start, _ = parse_bound(params["start"])
+
+    granularity = params.get("granularity") or None
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise ExportFilterError(f"Unsupported granularity: {granularity}.")
+
+    return start, end, granularity
@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from django.utils import timezone
+
+from robots.models import Robot
+from robots.registry import invalidate_registry
+
+from .utils import RobotTestCase, make_robot
+
+
+class AsyncViewTests(RobotTestCase):
+    robot = {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"}
+
+    async def content(self, response):
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    async def test_api_creates_robot(self):
+        invalidate_registry()
+        response = await self.async_client.post(
+            reverse("robots:robot_api_async"),
+            self.robot,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        robot = await Robot.objects.aget(pk=response.json()["id"])
+        self.assertEqual(robot.serial, "R2-D2")
+
+    async def test_api_rejects_invalid_robot(self):
+        response = await self.async_client.post(
+            reverse("robots:robot_api_async"),
+            {**self.robot, "model": "ZZ"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["code"], "invalid_model")
+        self.assertFalse(await Robot.objects.aexists())
+
+    async def test_api_rejects_malformed_json(self):
+        with self.assertLogs("robots.async_views", "ERROR"):
+            response = await self.async_client.post(
+                reverse("robots:robot_api_async"), "{", content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid JSON."})
+
+    async def test_json_download_streams_robots(self):
+        await Robot.objects.acreate(
+            model="R2",
+            version="D2",
+            serial="R2-D2",
+            created=timezone.make_aware(datetime(2024, 1, 1, 10, 0)),
+        )
+        response = await self.async_client.get(reverse("robots:robot_json_async"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(await self.content(response)), [self.robot])
+
+        response = await self.async_client.get(
+            reverse("robots:robot_json_async"), {"format": "ndjson"}
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = (await self.content(response)).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [self.robot])
+
+    async def test_json_download_rejects_invalid_filters(self):
+        response = await self.async_client.get(
+            reverse("robots:robot_json_async"), {"created_from": "yesterday"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_excel_download(self):
+        response = await self.async_client.get(reverse("robots:download_excel_async"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b"PK"))
+        etag = response["ETag"]
+
+        cached = await self.async_client.get(
+            reverse("robots:download_excel_async"), headers={"If-None-Match": etag}
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_json_download_matches_the_sync_view(self):
+        await sync_to_async(make_robot)()
+        await sync_to_async(make_robot)(
+            "X5", "LO", created=datetime(2024, 1, 2, 23, 59)
+        )
+
+        def sync_download(query):
+            response = self.client.get(reverse("robots:robot_json"), query)
+            return b"".join(response.streaming_content)
+
+        for query in ({}, {"format": "ndjson"}, {"model": "X5"}):
+            with self.subTest(query=query):
+                response = await self.async_client.get(
+                    reverse("robots:robot_json_async"), query
+                )
+                self.assertEqual(
+                    await self.content(response),
+                    await sync_to_async(sync_download)(query),
+                )
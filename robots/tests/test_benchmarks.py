@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from customers.models import Customer
+from orders.models import Order
+
+from robots.benchmarks import run_scenarios
+
+from .utils import RobotTestCase, make_robot
+
+
+class BenchmarkTests(RobotTestCase):
+    def test_scenarios_leave_the_default_cache_alone(self):
+        make_robot()
+        cache.set("sentinel", 1)
+
+        results = run_scenarios(["download_excel", "json_view"], iterations=2)
+
+        self.assertEqual(cache.get("sentinel"), 1)
+        self.assertEqual(set(results), {"download_excel", "json_view"})
+        self.assertEqual(results["download_excel"]["iterations"], 2)
+        # the report is built again for every run, not served from the cache
+        self.assertGreater(results["download_excel"]["queries"], 0)
+
+    def test_orders_are_placed_without_sorting_customers(self):
+        Customer.objects.bulk_create(
+            Customer(email=f"customer{i}@example.com") for i in range(3)
+        )
+
+        with CaptureQueriesContext(connection) as captured:
+            run_scenarios(["order_create"], iterations=2)
+
+        # a warm-up run, the measured runs and a traced run
+        self.assertEqual(Order.objects.count(), 4)
+        self.assertFalse(
+            [query for query in captured if "RANDOM()" in query["sql"].upper()]
+        )
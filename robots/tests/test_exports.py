@@ -0,0 +1,145 @@
+import html
+import json
+from datetime import datetime
+from unittest import mock
+
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+
+from robots.exports import (
+    ExportFilterError,
+    filter_robots,
+    parse_bound,
+    stream_indented_json,
+    stream_json_array,
+    stream_ndjson,
+)
+from robots.models import Robot
+
+from .utils import RobotTestCase, make_robot
+
+
+class FilterTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        self.r2 = make_robot(created=datetime(2024, 1, 1, 10, 0))
+        self.x5 = make_robot("X5", "LO", created=datetime(2024, 1, 2, 23, 59))
+        self.late = make_robot("X5", "XS", created=datetime(2024, 1, 3, 0, 0))
+
+    def filtered(self, query):
+        return list(filter_robots(QueryDict(query)))
+
+    def test_parse_bound(self):
+        self.assertEqual(
+            parse_bound("2024-01-02"),
+            (timezone.make_aware(datetime(2024, 1, 2)), True),
+        )
+        self.assertEqual(
+            parse_bound("2024-01-02 10:30:00"),
+            (timezone.make_aware(datetime(2024, 1, 2, 10, 30)), False),
+        )
+        for value in ("yesterday", "2024-13-01"):
+            with self.subTest(value=value), self.assertRaises(ExportFilterError):
+                parse_bound(value)
+
+    def test_exact_filters(self):
+        self.assertEqual(self.filtered("model=X5"), [self.x5, self.late])
+        self.assertEqual(self.filtered("model=X5&version=LO"), [self.x5])
+        self.assertEqual(self.filtered(""), [self.r2, self.x5, self.late])
+
+    def test_date_only_end_includes_the_whole_day(self):
+        self.assertEqual(
+            self.filtered("created_from=2024-01-02&created_to=2024-01-02"), [self.x5]
+        )
+
+    def test_end_with_time_is_inclusive(self):
+        self.assertEqual(
+            self.filtered("created_to=2024-01-02 23:59:00"), [self.r2, self.x5]
+        )
+
+    def test_invalid_date_is_rejected(self):
+        with self.assertRaises(ExportFilterError):
+            self.filtered("created_from=soon")
+
+
+class StreamTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        for hour in range(5):
+            make_robot(created=datetime(2024, 1, 1, hour, 0))
+        make_robot("X5", "LO", created=datetime(2024, 1, 2, 10, 0))
+        self.expected = [
+            {
+                "model": robot.model,
+                "version": robot.version,
+                "created": robot.created.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            for robot in Robot.objects.order_by("pk")
+        ]
+
+    def joined(self, stream):
+        return b"".join(stream(Robot.objects.order_by("pk")))
+
+    @mock.patch("robots.exports.EXPORT_CHUNK_SIZE", 2)
+    def test_json_array_spans_chunks(self):
+        self.assertEqual(json.loads(self.joined(stream_json_array)), self.expected)
+
+    @mock.patch("robots.exports.EXPORT_CHUNK_SIZE", 2)
+    def test_ndjson_has_one_robot_per_line(self):
+        lines = self.joined(stream_ndjson).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.expected)
+
+    @mock.patch("robots.exports.EXPORT_CHUNK_SIZE", 2)
+    def test_indented_json_matches_json_dumps(self):
+        text = "".join(stream_indented_json(Robot.objects.order_by("pk")))
+        self.assertEqual(text, json.dumps(self.expected, ensure_ascii=False, indent=4))
+
+    def test_empty_exports(self):
+        self.assertEqual(b"".join(stream_json_array(Robot.objects.none())), b"[]")
+        self.assertEqual(b"".join(stream_ndjson(Robot.objects.none())), b"")
+        self.assertEqual("".join(stream_indented_json(Robot.objects.none())), "[]")
+
+
+class ExportViewTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        make_robot()
+        make_robot("X5", "LO")
+
+    def test_json_download(self):
+        response = self.client.get(reverse("robots:robot_json"), {"model": "X5"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn('filename="robots.json"', response["Content-Disposition"])
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)),
+            [{"model": "X5", "version": "LO", "created": "2024-01-01 10:00:00"}],
+        )
+
+    def test_ndjson_download(self):
+        response = self.client.get(reverse("robots:robot_json"), {"format": "ndjson"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 2)
+
+    def test_invalid_filter_returns_400(self):
+        for name in ("robot_json", "json_view"):
+            with self.subTest(view=name):
+                response = self.client.get(
+                    reverse(f"robots:{name}"), {"created_to": "never"}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_json_page_is_streamed(self):
+        response = self.client.get(reverse("robots:json_view"), {"model": "R2"})
+
+        self.assertTrue(response.streaming)
+        page = b"".join(response.streaming_content).decode()
+        self.assertIn("<h1>", page)
+        data = page[page.index("<pre>") + 5 : page.index("</pre>")]
+        self.assertEqual(
+            json.loads(html.unescape(data)),
+            [{"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"}],
+        )
@@ -0,0 +1,131 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from robots.idempotency import (
+    IDEMPOTENCY_HEADER,
+    IDEMPOTENCY_TTL,
+    KEY_MAX_LENGTH,
+    REPLAYED_HEADER,
+)
+from robots.models import IdempotencyKey, Robot
+
+from .utils import RobotTestCase
+
+
+class IdempotencyTests(RobotTestCase):
+    robot = {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"}
+
+    def post(self, url, data, key):
+        return self.client.post(
+            url,
+            json.dumps(data),
+            content_type="application/json",
+            headers={IDEMPOTENCY_HEADER: key},
+        )
+
+    def test_retry_replays_the_stored_response(self):
+        url = reverse("robots:robot_api")
+        first = self.post(url, self.robot, "key-1")
+        retry = self.post(url, self.robot, "key-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn(REPLAYED_HEADER, first)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry[REPLAYED_HEADER], "true")
+        self.assertEqual(retry.json()["id"], first.json()["id"])
+        self.assertEqual(Robot.objects.count(), 1)
+
+    def test_batch_retry_replays_the_stored_response(self):
+        url = reverse("robots:robot_batch_api")
+        first = self.post(url, [self.robot, self.robot], "batch-1")
+        retry = self.post(url, [self.robot, self.robot], "batch-1")
+
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Robot.objects.count(), 2)
+
+    def test_key_reused_with_another_body_returns_422(self):
+        url = reverse("robots:robot_api")
+        self.post(url, self.robot, "key-1")
+        response = self.post(url, {**self.robot, "version": "C3"}, "key-1")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Robot.objects.count(), 1)
+
+    def test_keys_are_scoped_per_endpoint(self):
+        self.post(reverse("robots:robot_api"), self.robot, "key-1")
+        response = self.post(reverse("robots:robot_batch_api"), [self.robot], "key-1")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn(REPLAYED_HEADER, response)
+        self.assertEqual(Robot.objects.count(), 2)
+
+    def test_rejected_payload_is_replayed(self):
+        url = reverse("robots:robot_api")
+        first = self.post(url, {**self.robot, "model": "ZZ"}, "key-1")
+        retry = self.post(url, {**self.robot, "model": "ZZ"}, "key-1")
+
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(retry.status_code, 400)
+        self.assertEqual(retry[REPLAYED_HEADER], "true")
+
+    def test_key_in_the_payload(self):
+        url = reverse("robots:robot_api")
+        body = json.dumps({**self.robot, "idempotency_key": "field-1"})
+        for _ in range(2):
+            response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response[REPLAYED_HEADER], "true")
+        self.assertEqual(Robot.objects.count(), 1)
+
+    def test_invalid_keys_return_400(self):
+        url = reverse("robots:robot_api")
+        for key in ("", "k" * (KEY_MAX_LENGTH + 1)):
+            with self.subTest(length=len(key)):
+                self.assertEqual(self.post(url, self.robot, key).status_code, 400)
+        response = self.client.post(
+            url,
+            json.dumps({**self.robot, "idempotency_key": 5}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Robot.objects.exists())
+
+    def test_expired_keys_are_reused_and_purged(self):
+        url = reverse("robots:robot_api")
+        self.post(url, self.robot, "key-1")
+        IdempotencyKey.objects.update(
+            created=timezone.now() - IDEMPOTENCY_TTL - timedelta(minutes=1)
+        )
+
+        # an expired key runs the request again, even with another body
+        response = self.post(url, {**self.robot, "version": "C3"}, "key-1")
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn(REPLAYED_HEADER, response)
+        self.assertEqual(Robot.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+        IdempotencyKey.objects.update(
+            created=timezone.now() - IDEMPOTENCY_TTL - timedelta(minutes=1)
+        )
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+        self.assertIn("Deleted 1 expired keys.", out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    async def test_async_api_replays_idempotent_requests(self):
+        url = reverse("robots:robot_api_async")
+        headers = {IDEMPOTENCY_HEADER: "async-1"}
+        first = await self.async_client.post(
+            url, self.robot, content_type="application/json", headers=headers
+        )
+        retry = await self.async_client.post(
+            url, self.robot, content_type="application/json", headers=headers
+        )
+        self.assertEqual(retry[REPLAYED_HEADER], "true")
+        self.assertEqual(retry.json()["id"], first.json()["id"])
+        self.assertEqual(await Robot.objects.acount(), 1)
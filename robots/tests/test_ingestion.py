@@ -0,0 +1,111 @@
+import json
+
+from django.urls import reverse
+
+from robots.ingestion import MAX_BATCH_SIZE, BatchError, parse_batch
+from robots.models import Robot
+
+from .utils import RobotTestCase
+
+
+class ParseBatchTests(RobotTestCase):
+    def test_json_array(self):
+        records = parse_batch(b'[{"model": "R2"}, {"model": "X5"}]', "application/json")
+        self.assertEqual(records, [{"model": "R2"}, {"model": "X5"}])
+
+    def test_ndjson_skips_blank_lines_and_keeps_undecodable_ones(self):
+        body = b'{"model": "R2"}\n\nnot json\n{"model": "X5"}\n'
+        for content_type in ("application/x-ndjson", "application/jsonl"):
+            with self.subTest(content_type=content_type):
+                self.assertEqual(
+                    parse_batch(body, content_type),
+                    [{"model": "R2"}, None, {"model": "X5"}],
+                )
+
+    def test_rejects_bodies_that_are_not_batches(self):
+        for body in (b"{not json", b'{"model": "R2"}', b"[]"):
+            with self.subTest(body=body), self.assertRaises(BatchError):
+                parse_batch(body, "application/json")
+
+    def test_rejects_too_large_batches(self):
+        body = json.dumps([{}] * (MAX_BATCH_SIZE + 1)).encode()
+        with self.assertRaises(BatchError):
+            parse_batch(body, "application/json")
+
+
+class BatchIngestionTests(RobotTestCase):
+    url = reverse("robots:robot_batch_api")
+
+    def post(self, body, content_type="application/json"):
+        return self.client.post(self.url, body, content_type=content_type)
+
+    def test_all_valid_returns_201(self):
+        robots = [
+            {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"},
+            {"model": "X5", "version": "LO", "created": "2024-01-01 11:00:00"},
+        ]
+        response = self.post(json.dumps(robots))
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data["accepted"], data["rejected"]), (2, 0))
+        ids = [result["id"] for result in data["results"]]
+        self.assertEqual(
+            list(Robot.objects.filter(pk__in=ids).values_list("serial", flat=True)),
+            ["R2-D2", "X5-LO"],
+        )
+
+    def test_partially_valid_returns_207(self):
+        robots = [
+            {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"},
+            {"model": "ZZ", "version": "D2", "created": "not a date"},
+        ]
+        response = self.post(json.dumps(robots))
+
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual((data["accepted"], data["rejected"]), (1, 1))
+        rejected = data["results"][1]
+        self.assertEqual(rejected["status"], "rejected")
+        self.assertNotIn("id", rejected)
+        self.assertEqual(
+            {error["code"] for error in rejected["errors"]},
+            {"invalid_model", "invalid_date"},
+        )
+        self.assertEqual(Robot.objects.count(), 1)
+
+    def test_all_invalid_returns_400(self):
+        response = self.post(json.dumps([{"model": "ZZ", "version": "D2"}]))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["accepted"], 0)
+        self.assertFalse(Robot.objects.exists())
+
+    def test_malformed_body_returns_400(self):
+        for body in ("{not json", json.dumps({"model": "R2"}), "[]"):
+            with self.subTest(body=body), self.assertLogs("robots.views", "ERROR"):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+    def test_ndjson_rejects_undecodable_lines_individually(self):
+        body = (
+            '{"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"}\n'
+            "not json\n"
+        )
+        response = self.post(body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()["results"][1]["status"], "rejected")
+
+    def test_robots_are_saved_in_one_transaction(self):
+        robots = [
+            {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"}
+        ] * 3
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.post(json.dumps(robots))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Robot.objects.count(), 3)
+        # the cache version is bumped once for the whole batch, after the commit
+        self.assertEqual(len(callbacks), 1)
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from robots.jobs import STALE_AFTER, cleanup_reports, process_pending_jobs
+from robots.models import ReportJob
+
+from .utils import RobotTestCase, make_robot
+
+
+class ReportJobTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        make_robot(created=datetime(2024, 1, 2, 10, 0))
+        make_robot(model="X5", version="LO", created=datetime(2024, 1, 3, 10, 0))
+
+    def create_job(self, **params):
+        return self.client.post(
+            reverse("robots:report_jobs"),
+            {"start": "2024-01-01", "end": "2024-01-31", "format": "csv", **params},
+        )
+
+    def test_job_lifecycle(self):
+        response = self.create_job()
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual(job["status"], ReportJob.STATUS_PENDING)
+        self.assertNotIn("download_url", job)
+
+        download_url = reverse("robots:report_job_download", args=[job["id"]])
+        self.assertEqual(self.client.get(download_url).status_code, 409)
+
+        self.assertEqual(process_pending_jobs(), (1, 0))
+
+        job = self.client.get(response["Location"]).json()
+        self.assertEqual(job["status"], ReportJob.STATUS_DONE)
+        self.assertEqual(job["progress"], 100)
+        download = self.client.get(job["download_url"])
+        self.assertEqual(download.status_code, 200)
+        content = b"".join(download.streaming_content).decode()
+        self.assertIn("R2", content)
+        self.assertIn("X5", content)
+
+        # the finished report is reused for an identical request
+        again = self.create_job()
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()["id"], job["id"])
+
+    def test_identical_requests_share_a_job(self):
+        first = self.create_job().json()
+        second = self.create_job().json()
+        other = self.create_job(format="json").json()
+
+        self.assertEqual(second["id"], first["id"])
+        self.assertNotEqual(other["id"], first["id"])
+        self.assertEqual(ReportJob.objects.count(), 2)
+
+    def test_default_window_requests_share_a_job(self):
+        first = self.client.post(reverse("robots:report_jobs"), {"format": "csv"})
+        second = self.client.post(reverse("robots:report_jobs"), {"format": "csv"})
+        self.assertEqual(second.json()["id"], first.json()["id"])
+
+    def test_invalid_parameters_return_400(self):
+        self.assertEqual(self.create_job(format="pdf").status_code, 400)
+        self.assertEqual(
+            self.create_job(start="2024-02-01", end="2024-01-01").status_code, 400
+        )
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_unknown_job_returns_404(self):
+        response = self.client.get(reverse("robots:report_job", args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_job_records_the_error(self):
+        job_id = self.create_job().json()["id"]
+        with mock.patch("robots.jobs.write_report", side_effect=OSError("disk full")):
+            with self.assertLogs("robots.jobs", "ERROR"):
+                self.assertEqual(process_pending_jobs(), (0, 1))
+
+        job = ReportJob.objects.get(pk=job_id)
+        self.assertEqual(
+            (job.status, job.error), (ReportJob.STATUS_FAILED, "disk full")
+        )
+        self.assertIsNotNone(job.finished)
+
+    def test_abandoned_jobs_are_claimed_again(self):
+        job_id = self.create_job().json()["id"]
+        ReportJob.objects.filter(pk=job_id).update(
+            status=ReportJob.STATUS_RUNNING,
+            started=timezone.now() - timedelta(minutes=5),
+        )
+        # still running in another worker
+        self.assertEqual(process_pending_jobs(), (0, 0))
+
+        ReportJob.objects.filter(pk=job_id).update(
+            started=timezone.now() - STALE_AFTER - timedelta(minutes=1)
+        )
+        self.assertEqual(process_pending_jobs(), (1, 0))
+        self.assertEqual(ReportJob.objects.get(pk=job_id).status, ReportJob.STATUS_DONE)
+
+    def test_cleanup_deletes_expired_jobs_and_their_files(self):
+        job_id = self.create_job().json()["id"]
+        self.create_job(format="json")
+        process_pending_jobs()
+        process_pending_jobs()
+        job = ReportJob.objects.get(pk=job_id)
+        path = job.file.path
+        self.assertTrue(os.path.exists(path))
+
+        ReportJob.objects.filter(pk=job_id).update(
+            finished=timezone.now() - timedelta(days=8)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(cleanup_reports(), 1)
+
+        self.assertFalse(ReportJob.objects.filter(pk=job_id).exists())
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(ReportJob.objects.count(), 1)
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from django.urls import reverse
+
+from robots.models import Robot
+from robots.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    paginate_robots,
+)
+
+from .utils import RobotTestCase, make_robot
+
+
+class KeysetPaginationTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        # pairs of robots share a timestamp, so the id breaks the ties
+        start = datetime(2024, 1, 1, 10, 0)
+        for i in range(11):
+            make_robot(created=start + timedelta(minutes=i // 2))
+        self.newest_first = list(Robot.objects.order_by("-created", "-pk"))
+
+    def test_cursor_round_trip(self):
+        robot = self.newest_first[0]
+        self.assertEqual(decode_cursor(encode_cursor(robot)), (robot.created, robot.pk))
+
+    def test_walks_every_robot_once_in_both_directions(self):
+        pages = [paginate_robots(Robot.objects.all(), per_page=4)]
+        while pages[-1].next_cursor:
+            pages.append(
+                paginate_robots(
+                    Robot.objects.all(), after=pages[-1].next_cursor, per_page=4
+                )
+            )
+        self.assertEqual([len(page.items) for page in pages], [4, 4, 3])
+        self.assertEqual(
+            [robot for page in pages for robot in page.items], self.newest_first
+        )
+        self.assertIsNone(pages[0].previous_cursor)
+
+        backwards = [pages[-1]]
+        while backwards[-1].previous_cursor:
+            backwards.append(
+                paginate_robots(
+                    Robot.objects.all(),
+                    before=backwards[-1].previous_cursor,
+                    per_page=4,
+                )
+            )
+        self.assertEqual(
+            [page.items for page in backwards[::-1]], [page.items for page in pages]
+        )
+
+    def test_deep_pages_cost_one_query(self):
+        cursor = encode_cursor(self.newest_first[-2])
+        with self.assertNumQueries(1):
+            page = paginate_robots(Robot.objects.all(), after=cursor, per_page=4)
+        self.assertEqual(page.items, self.newest_first[-1:])
+        self.assertIsNone(page.next_cursor)
+
+    def test_keeps_filters(self):
+        make_robot(model="X5", version="LO")
+        page = paginate_robots(Robot.objects.filter(model="X5"), per_page=4)
+        self.assertEqual([robot.model for robot in page.items], ["X5"])
+        self.assertIsNone(page.next_cursor)
+
+    def test_rejects_malformed_cursors(self):
+        # not base64, no separator, no timestamp, no id
+        cursors = [
+            "not-a-cursor!",
+            "bm8tc2VwYXJhdG9y",
+            "eWVzdGVyZGF5fDE",
+            "MjAyNC0wMS0wMXx4",
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginate_robots(Robot.objects.all(), after=cursor)
+        response = self.client.get(reverse("robots:robot_view"), {"after": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_links_the_neighbouring_pages(self):
+        cursor = encode_cursor(self.newest_first[3])
+        response = self.client.get(
+            reverse("robots:robot_view"), {"model": "R2", "after": cursor}
+        )
+        page = response.context["page"]
+        self.assertEqual(page["robots"], self.newest_first[4:])
+        self.assertIsNone(page["next_url"])
+        self.assertIn("model=R2", page["previous_url"])
+        self.assertIn(
+            f"before={encode_cursor(self.newest_first[4])}", page["previous_url"]
+        )
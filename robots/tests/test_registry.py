@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.core.cache import cache
+
+from robots.models import RobotModel, RobotVersion
+from robots.registry import (
+    CHECK_INTERVAL,
+    VERSION_KEY,
+    aget_registry,
+    get_registry,
+    is_valid_product,
+)
+
+from .utils import RobotTestCase
+
+
+class RegistryTests(RobotTestCase):
+    def test_seeded_models_accept_any_version(self):
+        self.assertEqual(
+            get_registry(), {"R2": frozenset(), "13": frozenset(), "X5": frozenset()}
+        )
+        self.assertEqual(is_valid_product("R2", "ZZ"), (True, True))
+        self.assertEqual(is_valid_product("ZZ", "D2"), (False, False))
+
+    def test_lookups_within_the_interval_run_no_queries(self):
+        get_registry()
+        with self.assertNumQueries(0):
+            get_registry()
+
+    def test_saving_models_and_versions_invalidates_after_commit(self):
+        get_registry()
+        with self.captureOnCommitCallbacks() as callbacks:
+            x5 = RobotModel.objects.get(code="X5")
+            RobotVersion.objects.create(robot_model=x5, code="LO")
+            RobotModel.objects.create(code="T1")
+        # not committed yet: other requests keep the previous registry
+        self.assertNotIn("T1", get_registry())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_registry()["X5"], frozenset({"LO"}))
+        self.assertIn("T1", get_registry())
+        self.assertEqual(is_valid_product("X5", "XS"), (True, False))
+
+    def test_deleting_and_deactivating_invalidate(self):
+        x5 = RobotModel.objects.get(code="X5")
+        version = RobotVersion.objects.create(robot_model=x5, code="LO")
+        RobotVersion.objects.create(robot_model=x5, code="XS")
+        with self.captureOnCommitCallbacks(execute=True):
+            version.delete()
+        self.assertEqual(get_registry()["X5"], frozenset({"XS"}))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            x5.is_active = False
+            x5.save()
+        self.assertNotIn("X5", get_registry())
+
+    def test_changes_of_another_process_are_seen_after_the_interval(self):
+        clock = [1000.0]
+        with mock.patch("robots.registry.time.monotonic", lambda: clock[0]):
+            get_registry()
+            # another process changes the table and bumps the shared version
+            RobotModel.objects.create(code="T1")
+            cache.set(VERSION_KEY, "changed elsewhere", timeout=None)
+
+            clock[0] += CHECK_INTERVAL - 1
+            self.assertNotIn("T1", get_registry())
+            clock[0] += 1
+            self.assertIn("T1", get_registry())
+
+    def test_unchanged_version_does_not_reload(self):
+        clock = [1000.0]
+        with mock.patch("robots.registry.time.monotonic", lambda: clock[0]):
+            get_registry()
+            clock[0] += CHECK_INTERVAL
+            # one cache lookup, no database query
+            with self.assertNumQueries(0):
+                get_registry()
+
+    def test_cleared_cache_reloads(self):
+        clock = [1000.0]
+        with mock.patch("robots.registry.time.monotonic", lambda: clock[0]):
+            get_registry()
+            RobotModel.objects.create(code="T1")
+            cache.clear()
+
+            clock[0] += CHECK_INTERVAL
+            self.assertIn("T1", get_registry())
+            self.assertIsNotNone(cache.get(VERSION_KEY))
+
+    async def test_async_lookup(self):
+        self.assertIn("R2", await aget_registry())
@@ -0,0 +1,173 @@
+import csv
+import importlib.util
+import io
+import json
+import random
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.http import QueryDict
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from robots.reports import (
+    REPORT_FORMATS,
+    SUMMARY_SHEET_TITLE,
+    ReportError,
+    ReportSpec,
+    _chunk_bounds,
+    iter_report_rows,
+    spec_from_params,
+    write_report,
+)
+from robots.summary import production_summary
+
+from .utils import RobotTestCase, make_robot
+
+PRODUCTS = [("R2", "D2"), ("R2", "A1"), ("X5", "LO"), ("13", "XS")]
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+# a zone with DST changes in the range, so days are not all 24 hours long
+@override_settings(TIME_ZONE="America/New_York")
+class ReportRowsTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(20240101)
+        first = datetime(2024, 1, 1)
+        for _ in range(300):
+            moment = first + timedelta(minutes=rng.randrange(200 * 24 * 60))
+            make_robot(*rng.choice(PRODUCTS), created=moment)
+
+    def test_chunks_cover_the_range_without_gaps(self):
+        start, end = aware(2024, 1, 10, 12), aware(2024, 6, 3, 8, 30)
+        for granularity in (None, "day", "week", "month"):
+            with self.subTest(granularity=granularity):
+                chunks = list(_chunk_bounds(start, end, granularity))
+                self.assertGreater(len(chunks), 1)
+                self.assertEqual((chunks[0][0], chunks[-1][1]), (start, end))
+                for (_, previous_end), (chunk_start, _) in zip(chunks, chunks[1:]):
+                    self.assertEqual(
+                        chunk_start - previous_end, timedelta(microseconds=1)
+                    )
+                    # chunks start at local midnight on a period boundary
+                    local = timezone.localtime(chunk_start)
+                    self.assertEqual(local.time(), datetime.min.time())
+                    if granularity == "week":
+                        self.assertEqual(local.weekday(), 0)
+                    else:
+                        self.assertEqual(local.day, 1)
+
+    def test_chunked_rows_match_a_single_summary(self):
+        start, end = aware(2024, 1, 10, 12), aware(2024, 6, 3, 8, 30)
+        for granularity in (None, "day", "week", "month"):
+            with self.subTest(granularity=granularity):
+                rows = list(iter_report_rows(ReportSpec(start, end, granularity)))
+                expected = production_summary(start, end, granularity)
+                if granularity:
+                    expected = [
+                        {**row, "period": timezone.localtime(row["period"]).date()}
+                        for row in expected
+                    ]
+                self.assertEqual(rows, expected)
+
+    def test_progress_is_reported_per_chunk(self):
+        progress = mock.Mock()
+        spec = ReportSpec(aware(2024, 1, 10), aware(2024, 3, 20), "week")
+        list(iter_report_rows(spec, progress))
+        self.assertEqual(
+            progress.call_args_list, [mock.call(index, 3) for index in (1, 2, 3)]
+        )
+
+
+class WriteReportTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        make_robot(created=datetime(2024, 1, 1, 10, 0))
+        make_robot(created=datetime(2024, 1, 2, 10, 0))
+        make_robot("X5", "LO", created=datetime(2024, 1, 2, 11, 0))
+        self.spec = ReportSpec(aware(2024, 1, 1), aware(2024, 1, 7, 23, 59), "day")
+
+    def write(self, spec):
+        out = io.BytesIO()
+        write_report(spec, out)
+        return out.getvalue()
+
+    def test_csv(self):
+        content = self.write(ReportSpec(self.spec.start, self.spec.end, "day", "csv"))
+        self.assertEqual(
+            list(csv.reader(io.StringIO(content.decode()))),
+            [
+                ["Период", "Модель", "Версия", "Количество"],
+                ["2024-01-01", "R2", "D2", "1"],
+                ["2024-01-02", "R2", "D2", "1"],
+                ["2024-01-02", "X5", "LO", "1"],
+            ],
+        )
+
+    def test_json(self):
+        content = self.write(ReportSpec(self.spec.start, self.spec.end, None, "json"))
+        report = json.loads(content)
+        self.assertIsNone(report["granularity"])
+        self.assertEqual(
+            report["rows"],
+            [
+                {"model": "R2", "version": "D2", "count": 2},
+                {"model": "X5", "version": "LO", "count": 1},
+            ],
+        )
+
+    def test_xlsx_has_a_summary_and_a_sheet_per_model(self):
+        workbook = load_workbook(io.BytesIO(self.write(self.spec)))
+        self.assertEqual(workbook.sheetnames, [SUMMARY_SHEET_TITLE, "13", "R2", "X5"])
+        summary = list(workbook[SUMMARY_SHEET_TITLE].iter_rows(values_only=True))
+        self.assertEqual(
+            summary[1:],
+            [("R2", "D2", 2), ("X5", "LO", 1), (SUMMARY_SHEET_TITLE, None, 3)],
+        )
+        self.assertEqual(len(list(workbook["R2"].iter_rows())), 3)
+
+    def test_parquet(self):
+        if not HAS_PYARROW:
+            self.skipTest("pyarrow is not installed.")
+        import pyarrow.parquet
+
+        content = self.write(
+            ReportSpec(self.spec.start, self.spec.end, "day", "parquet")
+        )
+        table = pyarrow.parquet.read_table(io.BytesIO(content))
+        self.assertEqual(table.column("count").to_pylist(), [1, 1, 1])
+        self.assertEqual(table.column("period").to_pylist()[0], date(2024, 1, 1))
+
+
+class ReportFormatTests(RobotTestCase):
+    def test_parquet_is_offered_only_with_pyarrow(self):
+        self.assertEqual("parquet" in REPORT_FORMATS, HAS_PYARROW)
+        response = self.client.get(reverse("robots:summary_view"))
+        self.assertEqual(b"value='parquet'" in response.content, HAS_PYARROW)
+
+    def test_unavailable_formats_are_rejected(self):
+        with mock.patch.dict(REPORT_FORMATS):
+            REPORT_FORMATS.pop("parquet", None)
+            for report_format in ("parquet", "xls"):
+                with self.subTest(format=report_format):
+                    with self.assertRaisesMessage(ReportError, "Unsupported format"):
+                        spec_from_params(QueryDict(f"format={report_format}"))
+                    response = self.client.get(
+                        reverse("robots:report"), {"format": report_format}
+                    )
+                    self.assertEqual(response.status_code, 400)
+
+    def test_default_window_is_truncated_to_the_minute(self):
+        spec = spec_from_params(QueryDict())
+        self.assertEqual((spec.end.second, spec.end.microsecond), (0, 0))
+        self.assertEqual(spec.format, "xlsx")
+        with self.assertRaises(ReportError):
+            spec_from_params(QueryDict("start=2024-02-01&end=2024-01-01"))
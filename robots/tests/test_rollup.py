@@ -0,0 +1,86 @@
+import json
+from collections import Counter
+from datetime import date, datetime
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from robots.models import ProductionRollup, Robot
+from robots.rollup import daily_counts, rebuild_rollup, rollup_day
+
+from .utils import RobotTestCase, make_robot
+
+
+class RollupTests(RobotTestCase):
+    def assertRollupMatchesRobots(self):
+        robots = Counter(
+            (rollup_day(robot.created), robot.model, robot.version)
+            for robot in Robot.objects.all()
+        )
+        rollup = {
+            (row.day, row.model, row.version): row.count
+            for row in ProductionRollup.objects.filter(count__gt=0)
+        }
+        self.assertEqual(rollup, dict(robots))
+
+    def test_created_robots_are_counted(self):
+        make_robot()
+        make_robot()
+        make_robot(model="X5", version="LO", created=datetime(2024, 1, 2, 10, 0))
+        self.client.post(
+            reverse("robots:robot_batch_api"),
+            json.dumps(
+                [{"model": "13", "version": "XS", "created": "2024-01-01 12:00:00"}]
+            ),
+            content_type="application/json",
+        )
+        self.assertRollupMatchesRobots()
+        self.assertEqual(ProductionRollup.objects.get(model="R2").count, 2)
+
+    def test_edited_robots_move_to_their_new_row(self):
+        robot = make_robot()
+        other = make_robot()
+
+        robot.model, robot.version, robot.serial = "X5", "LO", "X5-LO"
+        robot.save()
+        other.created = timezone.make_aware(datetime(2024, 1, 5, 10, 0))
+        other.save()
+        self.assertRollupMatchesRobots()
+
+        # an unchanged save does not count the robot twice
+        other.save()
+        self.assertRollupMatchesRobots()
+
+    def test_deleted_robots_are_subtracted(self):
+        robot = make_robot()
+        make_robot()
+        robot.delete()
+        self.assertRollupMatchesRobots()
+        self.assertEqual(ProductionRollup.objects.get(model="R2").count, 1)
+
+    def test_daily_counts_skip_empty_rows(self):
+        make_robot(created=datetime(2024, 1, 1, 10, 0)).delete()
+        make_robot("X5", "LO", created=datetime(2024, 1, 2, 10, 0))
+
+        self.assertEqual(
+            list(daily_counts(date(2024, 1, 1), date(2024, 1, 2))),
+            [{"day": date(2024, 1, 2), "model": "X5", "version": "LO", "count": 1}],
+        )
+
+    @override_settings(TIME_ZONE="America/New_York")
+    def test_rebuild_restores_changes_made_bypassing_save(self):
+        # 23:30 local is already the next day in UTC
+        make_robot(created=datetime(2024, 1, 1, 23, 30))
+        make_robot("X5", "LO", created=datetime(2024, 1, 3, 10, 0))
+        Robot.objects.filter(model="X5").update(version="XS")
+        ProductionRollup.objects.filter(day=date(2024, 1, 1)).update(count=7)
+
+        self.assertEqual(rebuild_rollup(since=date(2024, 1, 2)), 1)
+        self.assertEqual(ProductionRollup.objects.get(day=date(2024, 1, 1)).count, 7)
+        self.assertEqual(
+            ProductionRollup.objects.get(day=date(2024, 1, 3)).version, "XS"
+        )
+
+        self.assertEqual(rebuild_rollup(), 2)
+        self.assertRollupMatchesRobots()
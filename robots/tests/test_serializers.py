@@ -0,0 +1,78 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from robots import serializers
+from robots.benchmarks import _legacy_items, _legacy_lines
+from robots.exports import DATE_FORMAT
+from robots.serializers import (
+    encode_items,
+    encode_lines,
+    format_timestamps,
+    serialize_robots,
+)
+
+
+def make_rows(count=200, seed=0):
+    """Rows as fetched by the exports: batches of robots share a timestamp."""
+    rng = random.Random(seed)
+    products = [("R2", "D2"), ("X5", "LO"), ("13", "XS"), ('"\\', "é\n"), ("Ж", " ")]
+    created = timezone.localtime(
+        datetime(2024, 3, 9, 23, 59, 58, 999999, tzinfo=dt_timezone.utc)
+    )
+    rows = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            created += timedelta(microseconds=rng.randrange(3 * 10**6))
+        rows.append((*rng.choice(products), created))
+    return rows
+
+
+class LegacyEquivalenceTests(SimpleTestCase):
+    """The encoders must produce the robots of the strftime/json.dumps encoder."""
+
+    def assertEquivalent(self, rows):
+        self.assertEqual(
+            json.loads(b"[" + encode_items(rows) + b"]"),
+            json.loads(b"[" + _legacy_items(rows) + b"]"),
+        )
+        lines = encode_lines(rows)
+        legacy = _legacy_lines(rows)
+        self.assertTrue(lines.endswith(b"\n"))
+        self.assertEqual(
+            [json.loads(line) for line in lines.splitlines()],
+            [json.loads(line) for line in legacy.splitlines()],
+        )
+        self.assertEqual(lines.count(b"\n"), legacy.count(b"\n"))
+
+    def test_random_rows(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                self.assertEquivalent(make_rows(seed=seed))
+
+    def test_without_orjson(self):
+        with mock.patch.object(serializers, "orjson", None):
+            self.assertEquivalent(make_rows())
+
+    def test_single_row(self):
+        self.assertEquivalent(make_rows(count=1))
+
+    def test_timestamps_match_strftime(self):
+        values = [row[2] for row in make_rows()] + [
+            datetime(2024, 1, 1),
+            datetime(2024, 1, 1, 10, 0, 0, 1),
+            datetime(1999, 12, 31, 23, 59, 59, 999999, tzinfo=dt_timezone.utc),
+        ]
+        self.assertEqual(
+            format_timestamps(values), [value.strftime(DATE_FORMAT) for value in values]
+        )
+
+    def test_serialize_robots_matches_the_legacy_dicts(self):
+        rows = make_rows()
+        self.assertEqual(
+            serialize_robots(rows), json.loads(b"[" + _legacy_items(rows) + b"]")
+        )
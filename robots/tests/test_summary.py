@@ -0,0 +1,125 @@
+import random
+from datetime import datetime, timedelta
+
+from django.http import QueryDict
+from django.test import override_settings
+from django.utils import timezone
+
+from robots.exports import ExportFilterError
+from robots.models import Robot
+from robots.summary import (
+    DEFAULT_WINDOW,
+    group_by_model,
+    production_summary,
+    summary_queryset,
+    window_from_params,
+)
+
+from .utils import RobotTestCase, make_robot
+
+PRODUCTS = [("R2", "D2"), ("R2", "A1"), ("X5", "LO"), ("13", "XS")]
+
+
+# a zone with a DST change in the window, so days are not all 24 hours long
+@override_settings(TIME_ZONE="America/New_York")
+class ProductionSummaryTests(RobotTestCase):
+    first = datetime(2024, 2, 25)
+
+    def setUp(self):
+        super().setUp()
+        self.random = random.Random(20240310)
+        for _ in range(300):
+            moment = self.first + timedelta(minutes=self.random.randrange(40 * 24 * 60))
+            make_robot(*self.random.choice(PRODUCTS), created=moment)
+        # robots right at the day boundaries
+        for moment in (datetime(2024, 3, 5), datetime(2024, 3, 5, 23, 59, 59)):
+            make_robot(created=moment)
+
+    def assertSummaryMatches(self, start, end):
+        for granularity in (None, "day", "week", "month"):
+            with self.subTest(start=start, end=end, granularity=granularity):
+                self.assertEqual(
+                    production_summary(start, end, granularity),
+                    # the plain GROUP BY over the robots table
+                    list(summary_queryset(start, end, granularity)),
+                )
+
+    def aware(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_random_windows(self):
+        for _ in range(25):
+            start = self.first + timedelta(
+                minutes=self.random.randrange(-2 * 24 * 60, 42 * 24 * 60)
+            )
+            end = start + timedelta(minutes=self.random.randrange(20 * 24 * 60))
+            self.assertSummaryMatches(
+                timezone.make_aware(start), timezone.make_aware(end)
+            )
+
+    def test_window_inside_one_day(self):
+        self.assertSummaryMatches(self.aware(2024, 3, 5, 6), self.aware(2024, 3, 5, 18))
+
+    def test_whole_days_only(self):
+        self.assertSummaryMatches(
+            self.aware(2024, 3, 5),
+            self.aware(2024, 3, 12) - timedelta(microseconds=1),
+        )
+
+    def test_window_across_the_dst_change(self):
+        self.assertSummaryMatches(
+            self.aware(2024, 3, 9, 12), self.aware(2024, 3, 11, 1, 30)
+        )
+
+    def test_boundary_robots(self):
+        rows = production_summary(
+            self.aware(2024, 3, 5), self.aware(2024, 3, 5, 23, 59, 59)
+        )
+        expected = Robot.objects.filter(
+            created__gte=self.aware(2024, 3, 5),
+            created__lte=self.aware(2024, 3, 5, 23, 59, 59),
+        ).count()
+        self.assertEqual(sum(row["count"] for row in rows), expected)
+
+    def test_empty_and_inverted_windows(self):
+        self.assertEqual(
+            production_summary(self.aware(2023, 1, 1), self.aware(2023, 1, 9)), []
+        )
+        self.assertEqual(
+            production_summary(self.aware(2024, 3, 9), self.aware(2024, 3, 8)), []
+        )
+
+    def test_unsupported_granularity(self):
+        with self.assertRaises(ValueError):
+            production_summary(self.aware(2024, 3, 1), self.aware(2024, 3, 2), "year")
+
+
+class SummaryHelperTests(RobotTestCase):
+    def test_group_by_model(self):
+        rows = [
+            {"model": "R2", "version": "D2", "count": 2},
+            {"model": "R2", "version": "A1", "count": 1},
+            {"model": "R2", "version": "D2", "count": 3},
+        ]
+        self.assertEqual(group_by_model(rows), {"R2": {"D2": 5, "A1": 1}})
+
+    def test_window_defaults_to_the_last_week(self):
+        start, end, granularity = window_from_params(QueryDict())
+        self.assertEqual(end - start, DEFAULT_WINDOW)
+        self.assertLess(timezone.now() - end, timedelta(minutes=1))
+        self.assertIsNone(granularity)
+
+    def test_date_only_end_covers_the_whole_day(self):
+        start, end, granularity = window_from_params(
+            QueryDict("start=2024-01-01&end=2024-01-07&granularity=week")
+        )
+        self.assertEqual(start, timezone.make_aware(datetime(2024, 1, 1)))
+        self.assertEqual(
+            end, timezone.make_aware(datetime(2024, 1, 8)) - timedelta(microseconds=1)
+        )
+        self.assertEqual(granularity, "week")
+
+    def test_invalid_parameters(self):
+        for query in ("granularity=year", "start=soon"):
+            with self.subTest(query=query), self.assertRaises(ExportFilterError):
+                window_from_params(QueryDict(query))
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from robots.validation import (
+    MAX_CLOCK_SKEW,
+    error_response_data,
+    parse_created,
+    validate_batch,
+    validate_robot,
+)
+
+from .utils import RobotTestCase
+
+# R2 accepts any version, X5 only LO
+REGISTRY = {"R2": frozenset(), "X5": frozenset({"LO"})}
+
+ROBOT = {"model": "X5", "version": "LO", "created": "2024-01-01 10:00:00"}
+
+
+def codes(errors):
+    return {(error["field"], error["code"]) for error in errors}
+
+
+@override_settings(TIME_ZONE="UTC")
+class ParseCreatedTests(SimpleTestCase):
+    def test_iso_formats(self):
+        expected = datetime(2024, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+        for value in (
+            "2024-01-01 10:00:00",
+            "2024-01-01T10:00:00",
+            "2024-01-01T12:00:00+02:00",
+            "2024-01-01T10:00:00Z",
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(parse_created(value), expected)
+
+    def test_invalid_values(self):
+        for value in ("", "2024-13-01 10:00:00", "01.01.2024", None, 1704103200):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_created(value))
+
+
+class ValidateRobotTests(SimpleTestCase):
+    def validate(self, **changes):
+        return validate_robot({**ROBOT, **changes}, registry=REGISTRY)
+
+    def test_valid_robot(self):
+        cleaned, errors = self.validate()
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            cleaned,
+            {
+                "serial": "X5-LO",
+                "model": "X5",
+                "version": "LO",
+                "created": timezone.make_aware(datetime(2024, 1, 1, 10, 0)),
+            },
+        )
+        self.assertEqual(self.validate(serial="X5-01")[0]["serial"], "X5-01")
+
+    def test_every_invalid_field_is_reported(self):
+        cleaned, errors = self.validate(
+            model="ZZ", version="LONG", serial="TOO-LONG", created="yesterday"
+        )
+        self.assertIsNone(cleaned)
+        self.assertEqual(
+            codes(errors),
+            {
+                ("model", "invalid_model"),
+                ("version", "invalid_version"),
+                ("serial", "invalid_serial"),
+                ("created", "invalid_date"),
+            },
+        )
+        self.assertEqual(
+            error_response_data(errors),
+            {"error": "Invalid model.", "errors": errors},
+        )
+
+    def test_unknown_model_or_version(self):
+        cases = [
+            ({"model": "ZZ"}, {("model", "invalid_model")}),
+            ({"model": None}, {("model", "invalid_model")}),
+            ({"model": ["X5"]}, {("model", "invalid_model")}),
+            ({"version": "XS"}, {("version", "invalid_version")}),
+            ({"version": 5}, {("version", "invalid_version")}),
+            ({"version": ""}, {("version", "invalid_version")}),
+        ]
+        for changes, expected in cases:
+            with self.subTest(changes=changes):
+                self.assertEqual(codes(self.validate(**changes)[1]), expected)
+        # a model without registered versions accepts any version
+        self.assertEqual(self.validate(model="R2", version="XS")[1], [])
+
+    def test_malformed_or_future_created(self):
+        now = timezone.now()
+        cases = [
+            ("2024-02-30 10:00:00", "invalid_date"),
+            ("", "invalid_date"),
+            (None, "invalid_date"),
+            ((now + MAX_CLOCK_SKEW * 2).isoformat(), "future_date"),
+        ]
+        for created, code in cases:
+            with self.subTest(created=created):
+                self.assertEqual(
+                    codes(self.validate(created=created)[1]), {("created", code)}
+                )
+        # controllers whose clock is slightly ahead are accepted
+        self.assertEqual(
+            self.validate(created=(now + timedelta(minutes=1)).isoformat())[1], []
+        )
+
+    def test_payload_must_be_an_object(self):
+        for data in (None, [ROBOT], "R2-D2"):
+            with self.subTest(data=data):
+                self.assertEqual(
+                    validate_robot(data, registry=REGISTRY),
+                    (
+                        None,
+                        [
+                            {
+                                "field": None,
+                                "code": "invalid_payload",
+                                "message": "Invalid JSON.",
+                            }
+                        ],
+                    ),
+                )
+
+
+class ValidateBatchTests(RobotTestCase):
+    def test_results_follow_the_records(self):
+        results = validate_batch(
+            [
+                {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"},
+                {"model": "ZZ", "version": "D2", "created": "2024-01-01 10:00:00"},
+                {"model": "R2", "version": "D2", "created": "2024-01-01T10:00:00"},
+                {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:01"},
+                {"model": "R2", "version": "D2", "created": "2024-01-01 10:00:00"},
+            ]
+        )
+
+        self.assertEqual(
+            [
+                (cleaned is not None, codes(errors), duplicate)
+                for cleaned, errors, duplicate in results
+            ],
+            [
+                (True, set(), None),
+                (False, {("model", "invalid_model")}, None),
+                # the same time written differently is the same robot
+                (True, set(), 0),
+                (True, set(), None),
+                (True, set(), 0),
+            ],
+        )
+
+    def test_validation_runs_no_queries_once_the_registry_is_cached(self):
+        records = [dict(ROBOT, created=f"2024-01-01 10:00:{i:02}") for i in range(10)]
+        validate_batch(records)
+        with self.assertNumQueries(0):
+            results = validate_batch(records)
+        self.assertEqual([errors for _, errors, _ in results], [[]] * 10)
@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+from datetime import datetime
+
+from django.core.cache import CacheHandler
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from robots.cache import VERSION_KEY, bump_robots_version, robots_version
+from robots.checks import check_shared_cache
+from robots.models import Robot
+
+from .utils import RobotTestCase, make_robot
+
+
+class ConditionalViewTests(RobotTestCase):
+    """ETags of the robot list and the JSON page."""
+
+    urls = ("robots:robot_view", "robots:json_view")
+
+    def setUp(self):
+        super().setUp()
+        make_robot()
+
+    def get(self, name, query="", etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.get(f"{reverse(name)}?{query}", headers=headers)
+
+    def test_unchanged_robots_return_304_without_queries(self):
+        for name in self.urls:
+            with self.subTest(view=name):
+                response = self.get(name)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response["Last-Modified"])
+
+                with self.assertNumQueries(0):
+                    cached = self.get(name, etag=response["ETag"])
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_etag_depends_on_the_parameters_not_their_order(self):
+        for name in self.urls:
+            with self.subTest(view=name):
+                both = self.get(name, "model=R2&version=D2")["ETag"]
+                self.assertEqual(self.get(name, "version=D2&model=R2")["ETag"], both)
+                self.assertNotEqual(self.get(name, "model=R2")["ETag"], both)
+
+    def test_etag_goes_stale_after_commit(self):
+        etags = {name: self.get(name)["ETag"] for name in self.urls}
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_robot("X5", "LO")
+        for name in self.urls:
+            # not committed yet: the cached pages still match the visible robots
+            self.assertEqual(self.get(name, etag=etags[name]).status_code, 304)
+
+        for callback in callbacks:
+            callback()
+        for name in self.urls:
+            with self.subTest(view=name):
+                self.assertContains(self.get(name, etag=etags[name]), "X5")
+
+    def test_deleted_robots_make_the_etag_stale(self):
+        etag = self.get("robots:json_view")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Robot.objects.get().delete()
+        self.assertNotContains(self.get("robots:json_view", etag=etag), "R2")
+
+    def test_robot_cards_are_served_from_the_fragment_cache(self):
+        self.get("robots:robot_view")
+        # same version and URL: neither the page of robots nor the registry is read
+        with self.assertNumQueries(0):
+            response = self.get("robots:robot_view")
+        self.assertContains(response, "R2-D2")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Robot.objects.create(
+                model="13",
+                version="XS",
+                serial="13-XS",
+                created=timezone.make_aware(datetime(2024, 1, 2, 10, 0)),
+            )
+        self.assertContains(self.get("robots:robot_view"), "13-XS")
+
+
+class SharedCacheTests(RobotTestCase):
+    def setUp(self):
+        super().setUp()
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+
+    def file_cache(self):
+        return {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": self.location,
+            }
+        }
+
+    def test_local_memory_cache_is_reported(self):
+        warnings = check_shared_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["robots.W001"])
+        with override_settings(CACHES=self.file_cache()):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_versions_are_shared_between_processes(self):
+        with override_settings(CACHES=self.file_cache()):
+            # a cache handler of its own stands for another worker process
+            other = CacheHandler()["default"]
+
+            version, _ = bump_robots_version()
+            self.assertEqual(other.get(VERSION_KEY)["version"], version)
+
+            etag = self.client.get(reverse("robots:robot_view"))["ETag"]
+            other.set(
+                VERSION_KEY,
+                {"version": "elsewhere", "modified": timezone.now()},
+                timeout=None,
+            )
+            self.assertEqual(robots_version()[0], "elsewhere")
+            response = self.client.get(
+                reverse("robots:robot_view"), headers={"If-None-Match": etag}
+            )
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,96 @@
+import io
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from robots.cache import report_etag, robots_version
+from robots.views import RobotExcel
+
+from .utils import RobotTestCase, make_robot
+
+END = timezone.make_aware(datetime(2024, 1, 8, 12, 0))
+WINDOW = (END - timedelta(days=7), END)
+
+
+@mock.patch.object(RobotExcel, "get_report_window", return_value=WINDOW)
+class WeeklyReportTests(RobotTestCase):
+    url = reverse("robots:download_excel")
+
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            make_robot(created=datetime(2024, 1, 5, 10, 0))
+            make_robot(created=datetime(2024, 1, 6, 10, 0))
+            make_robot("X5", "LO", created=datetime(2024, 1, 7, 10, 0))
+            # outside the window
+            make_robot("X5", "LO", created=datetime(2023, 12, 1, 10, 0))
+
+    def download(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def test_workbook_has_a_sheet_per_model(self, _):
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("robots.xlsx", response["Content-Disposition"])
+        workbook = load_workbook(io.BytesIO(response.content))
+        self.assertEqual(workbook.sheetnames, ["13", "R2", "X5"])
+        self.assertEqual(
+            [
+                list(row)
+                for row in workbook["R2"].iter_rows(min_row=2, values_only=True)
+            ],
+            [["R2", "D2", 2]],
+        )
+        self.assertEqual(workbook["X5"]["C2"].value, 1)
+
+    def test_etag_matches_the_robots_version(self, _):
+        response = self.download()
+        version, _ = robots_version()
+        self.assertEqual(response["ETag"], report_etag(version, *WINDOW))
+
+    def test_repeat_download_is_not_modified(self, _):
+        etag = self.download()["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.download(**{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_cached_report_runs_no_queries(self, _):
+        first = self.download()
+        with self.assertNumQueries(0):
+            second = self.download()
+        self.assertEqual(second.content, first.content)
+
+    def test_new_robot_makes_the_etag_stale_after_commit(self, _):
+        etag = self.download()["ETag"]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_robot(created=datetime(2024, 1, 7, 11, 0))
+            # not committed yet: the cached report still describes committed robots
+            self.assertEqual(self.download()["ETag"], etag)
+            self.assertEqual(self.download(**{"If-None-Match": etag}).status_code, 304)
+        for callback in callbacks:
+            callback()
+
+        response = self.download(**{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        workbook = load_workbook(io.BytesIO(response.content))
+        self.assertEqual(workbook["R2"]["C2"].value, 3)
+
+    def test_deleted_robot_makes_the_etag_stale_after_commit(self, _):
+        robot = make_robot(created=datetime(2024, 1, 7, 11, 0))
+        etag = self.download()["ETag"]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            robot.delete()
+        self.assertEqual(self.download()["ETag"], etag)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(self.download()["ETag"], etag)
@@ -0,0 +1,57 @@
+"""
+utils.py
+
+This module contains the helpers shared by the tests of the robots application.
+
+Classes:
+- RobotTestCase: TestCase with a private cache and a fresh registry.
+
+Functions:
+- make_robot: Saves a robot created at a given time.
+"""
+
+from datetime import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from robots.models import Robot
+from robots.registry import invalidate_registry
+
+PRIVATE_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def make_robot(model="R2", version="D2", created=None):
+    """
+    Saves a robot created at a given time.
+
+    Args:
+        model (str): The robot's model.
+        version (str): The robot's version.
+        created (datetime): Naive local creation time, 2024-01-01 10:00 by default.
+
+    Returns:
+        Robot: The saved robot.
+    """
+    created = created or datetime(2024, 1, 1, 10, 0)
+    return Robot.objects.create(
+        model=model, version=version, created=timezone.make_aware(created)
+    )
+
+
+# a private cache, so the tests neither see nor clear the cache of a running server
+@override_settings(CACHES=PRIVATE_CACHE)
+class RobotTestCase(TestCase):
+    """
+    TestCase with a private cache and a fresh registry.
+
+    The registry and the robots version live in the cache and in the memory
+    of the process, not in the database, so they are reset before every test.
+    """
+
+    def setUp(self):
+        cache.clear()
+        invalidate_registry()
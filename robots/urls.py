@@ -1,6 +1,19 @@
 from django.urls import path
-from .views import RobotView, RobotJson, JsonView, RobotApiView, RobotExcel
-
+from .async_views import AsyncRobotApiView, AsyncRobotJson, AsyncRobotExcel
+from .views import (
+    RobotView,
+    RobotJson,
+    JsonView,
+    RobotApiView,
+    RobotBatchApiView,
+    RobotExcel,
+    RobotReport,
+    ReportJobCreateView,
+    ReportJobView,
+    ReportJobDownload,
+    RobotSummaryJson,
+    RobotSummaryView,
+)
 
 app_name = "robots"
 
@@ -13,7 +26,38 @@ urlpatterns = [
     path(
         "api/robots/", RobotApiView.as_view(), name="robot_api"
     ),  # endpoint for working with JSON with API
+    path(
+        "api/robots/batch/", RobotBatchApiView.as_view(), name="robot_batch_api"
+    ),  # endpoint for creating many robots in one request (JSON array or NDJSON)
+    path(
+        "summary/", RobotSummaryView.as_view(), name="summary_view"
+    ),  # To display the production summary
+    path(
+        "api/robots/summary/", RobotSummaryJson.as_view(), name="summary_json"
+    ),  # production summary in JSON format
     path(
         "download_excel/", RobotExcel.as_view(), name="download_excel"
     ),  # To download Excel
+    path(
+        "reports/", RobotReport.as_view(), name="report"
+    ),  # production report for any range, in xlsx, csv, json or parquet (with pyarrow)
+    path(
+        "api/reports/", ReportJobCreateView.as_view(), name="report_jobs"
+    ),  # queues a report to be built in the background
+    path(
+        "api/reports/<int:pk>/", ReportJobView.as_view(), name="report_job"
+    ),  # status and progress of a report job
+    path(
+        "api/reports/<int:pk>/download/",
+        ReportJobDownload.as_view(),
+        name="report_job_download",
+    ),  # the finished report of a job
+    # async versions of the API and downloads for ASGI deployments
+    path("async/api/robots/", AsyncRobotApiView.as_view(), name="robot_api_async"),
+    path("async/download/", AsyncRobotJson.as_view(), name="robot_json_async"),
+    path(
+        "async/download_excel/",
+        AsyncRobotExcel.as_view(),
+        name="download_excel_async",
+    ),
 ]
@@ -1,16 +1,59 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views import View
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.html import escape
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date, urlencode
 import json
-from .models import Robot
+import tempfile
+from itertools import chain
+from .cache import (
+    REPORT_CACHE_TIMEOUT,
+    VIEW_CACHE_TIMEOUT,
+    report_etag,
+    report_key,
+    robots_version,
+    view_etag,
+)
+from .jobs import enqueue_report, report_spec
+from .models import ReportJob, Robot
+from .ingestion import BatchError, parse_batch, ingest_batch
+from .idempotency import (
+    REPLAYED_HEADER,
+    IdempotencyError,
+    idempotency_key,
+    run_once,
+)
+from .exports import (
+    DATE_FORMAT,
+    ExportFilterError,
+    filter_robots,
+    stream_indented_json,
+    stream_json_array,
+    stream_ndjson,
+)
+from .pagination import InvalidCursor, decode_cursor, paginate_robots
+from .registry import get_registry
+from .reports import (
+    REPORT_FORMATS,
+    ReportError,
+    spec_from_params,
+    weekly_workbook,
+    write_report,
+)
+from .summary import production_summary, group_by_model, window_from_params
+from .validation import error_response_data, validate_robot
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
-VALID_MODELS = ["R2", "13", "X5"]
-
 
 class RobotView(View):
     template_name = "robots/index.html"
@@ -19,14 +62,99 @@ class RobotView(View):
         """
         Handles GET requests to display robot cards.
 
+        Robots are shown newest first, one page at a time, with keyset pagination:
+        the "after"/"before" parameters hold the cursor of a neighbouring page.
+
+        The cards are a template fragment cached per URL and robots table version,
+        and the page is only read from the database when the fragment is rendered,
+        so a cached page makes no queries. A repeated load with a matching
+        ETag/Last-Modified gets 304 Not Modified.
+
+        Query parameters:
+            model, version: Exact filters.
+            after, before: Page cursors.
+
         Args:
             request: The request object.
 
         Returns:
             HttpResponse: Displays the page with robot cards.
         """
-        robots = Robot.objects.all()
-        return render(request, self.template_name, {"robots": robots})
+        filters = {}
+        for field in ("model", "version"):
+            if request.GET.get(field):
+                filters[field] = request.GET[field]
+        after = request.GET.get("after")
+        before = request.GET.get("before")
+        try:
+            # malformed cursors are rejected before the cached fragment is looked up
+            for cursor in (after, before):
+                if cursor:
+                    decode_cursor(cursor)
+        except InvalidCursor as ic:
+            return JsonResponse({"error": str(ic)}, status=400)
+
+        version, modified = robots_version()
+        etag = view_etag(version, "robot_view", request.GET)
+        last_modified = int(modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            registry = get_registry()
+            context = {
+                "page": SimpleLazyObject(
+                    lambda: self.get_page(filters, after=after, before=before)
+                ),
+                "filters": filters,
+                "models": list(registry),
+                "versions": sorted(set().union(*registry.values())),
+                "cache_version": version,
+                "cache_timeout": VIEW_CACHE_TIMEOUT,
+            }
+            response = render(request, self.template_name, context)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_page(self, filters, after=None, before=None):
+        """
+        Reads a page of robots.
+
+        Args:
+            filters (dict): Active filters.
+            after (str): Cursor of the last robot of the previous page.
+            before (str): Cursor of the first robot of the next page.
+
+        Returns:
+            dict: "robots" of the page and the "next_url" and "previous_url"
+                query strings of the neighbouring pages.
+        """
+        page = paginate_robots(
+            Robot.objects.filter(**filters), after=after, before=before
+        )
+        return {
+            "robots": page.items,
+            "next_url": self.page_url(filters, after=page.next_cursor),
+            "previous_url": self.page_url(filters, before=page.previous_cursor),
+        }
+
+    def page_url(self, filters, **cursor):
+        """
+        Builds the query string of a neighbouring page.
+
+        Args:
+            filters (dict): Active filters.
+            cursor: Either after=<cursor> or before=<cursor>.
+
+        Returns:
+            str: The query string, or None if there is no such page.
+        """
+        name, value = next(iter(cursor.items()))
+        if value is None:
+            return None
+        return "?" + urlencode({**filters, name: value})
 
     def post(self, request):
         """
@@ -38,27 +166,45 @@ class RobotView(View):
         Returns:
             HttpResponse: Redirects to the page with robot cards or returns an error.
         """
-        serial = request.POST.get("serial")
-        model = request.POST.get("model")
-        version = request.POST.get("version")
-        created = request.POST.get("created")
-
-        # Input data validation
-        if model not in VALID_MODELS:
-            return JsonResponse({"error": "Invalid model."}, status=400)
+        cleaned, errors = validate_robot(request.POST.dict())
+        if errors:
+            return JsonResponse(error_response_data(errors), status=400)
 
         # Creating a new robot
-        robot = Robot(serial=serial, model=model, version=version, created=created)
+        robot = Robot(**cleaned)
         robot.save()
 
         return redirect("robots:robot_view")  # Redirect to a page with a list of robots
 
 
+def idempotent_response(data, status, replayed):
+    """
+    Builds the response of an ingestion request.
+
+    Args:
+        data (dict): The response data.
+        status (int): The status code.
+        replayed (bool): Whether the response is replayed from a stored result.
+
+    Returns:
+        JsonResponse: The response, marked with the Idempotent-Replayed header
+            if it was replayed.
+    """
+    response = JsonResponse(data, status=status)
+    if replayed:
+        response[REPLAYED_HEADER] = "true"
+    return response
+
+
 class RobotApiView(View):
     def post(self, request):
         """
         Handles POST requests to create a new robot via the API.
 
+        A request with an idempotency key (Idempotency-Key header or
+        "idempotency_key" field) creates the robot once; retries with
+        the same key get the original response.
+
         Args:
             request: The request object.
 
@@ -69,58 +215,141 @@ class RobotApiView(View):
             data = json.loads(request.body)
             logger.info(f"Received data: {data}")
 
-            model = data.get("model")
-            version = data.get("version")
-            created = data.get("created")
+            key = idempotency_key(request, data)
+            result = run_once(
+                "robot", key, request.body, lambda: self.create_robot(data)
+            )
+            return idempotent_response(*result)
 
-            # Input data validation
-            if model not in VALID_MODELS:
-                return JsonResponse({"error": "Invalid model."}, status=400)
+        except json.JSONDecodeError:
+            logger.error("Invalid JSON received.")
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+        except IdempotencyError as ie:
+            return JsonResponse({"error": str(ie)}, status=ie.status_code)
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+            return JsonResponse({"error": "An unexpected error occurred."}, status=500)
 
-            # Converting a date string to a datetime object
-            created_date = datetime.strptime(created, "%Y-%m-%d %H:%M:%S")
+    def create_robot(self, data):
+        """
+        Validates a payload and creates the robot.
 
-            # Creating a new robot
-            robot = Robot(model=model, version=version, created=created_date)
-            robot.save()
+        Args:
+            data: The decoded payload.
 
-            return JsonResponse({"message": "Robot created successfully."}, status=201)
+        Returns:
+            tuple: The response data and the status code (201, or 400 if invalid).
+        """
+        cleaned, errors = validate_robot(data)
+        if errors:
+            return error_response_data(errors), 400
 
-        except json.JSONDecodeError:
-            logger.error("Invalid JSON received.")
-            return JsonResponse({"error": "Invalid JSON."}, status=400)
-        except ValueError as ve:
-            logger.error(f"Date format error: {ve}")
-            return JsonResponse({"error": "Invalid date format."}, status=400)
+        # Creating a new robot
+        robot = Robot(**cleaned)
+        robot.save()
+
+        return {
+            "message": "Robot created successfully.",
+            "id": robot.pk,
+            "serial": robot.serial,
+        }, 201
+
+
+class RobotBatchApiView(View):
+    def post(self, request):
+        """
+        Handles POST requests to create many robots via the API in one request.
+
+        The body is either a JSON array of robots or NDJSON
+        (Content-Type: application/x-ndjson), one robot per line.
+        All valid robots are saved in a single transaction,
+        invalid ones are reported individually.
+        A request with an Idempotency-Key header is processed once;
+        retries with the same key get the original response.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            JsonResponse: Counters and per-item results. Status 201 if every robot
+                was accepted, 207 if only some were, 400 if none were.
+        """
+        try:
+            records = parse_batch(request.body, request.content_type)
+        except BatchError as be:
+            logger.error(f"Invalid batch received: {be}")
+            return JsonResponse({"error": str(be)}, status=400)
+
+        try:
+            key = idempotency_key(request)
+            result = run_once("batch", key, request.body, lambda: self.ingest(records))
+        except IdempotencyError as ie:
+            return JsonResponse({"error": str(ie)}, status=ie.status_code)
         except Exception as e:
             logger.error(f"An error occurred: {e}")
             return JsonResponse({"error": "An unexpected error occurred."}, status=500)
 
+        return idempotent_response(*result)
+
+    def ingest(self, records):
+        """
+        Saves the valid records.
+
+        Args:
+            records (list): Decoded records.
+
+        Returns:
+            tuple: The response data and the status code.
+        """
+        results = ingest_batch(records)
+        accepted = sum(1 for result in results if result["status"] == "accepted")
+        rejected = len(results) - accepted
+        logger.info(f"Batch received: {accepted} accepted, {rejected} rejected")
+
+        if not rejected and accepted:
+            status = 201
+        elif accepted:
+            status = 207
+        else:
+            status = 400
+
+        return {"accepted": accepted, "rejected": rejected, "results": results}, status
+
 
 class RobotJson(View):
     def get(self, request):
         """
-        Processes GET requests to return a list of robots in JSON format.
+        Processes GET requests to download the list of robots in JSON format.
+
+        The file is streamed while the robots are read from the database,
+        so the whole table is never loaded into memory.
+
+        Query parameters:
+            format: "json" (default) for a JSON array or "ndjson" for one robot per line.
+            model, version: Exact filters.
+            created_from, created_to: Date range (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS).
 
         Args:
             request: The request object.
 
         Returns:
-            JsonResponse: A list of robots in JSON format with a download button.
+            StreamingHttpResponse: A list of robots to download.
         """
-        robots = Robot.objects.all()
-        robots_list = [
-            {
-                "model": robot.model,
-                "version": robot.version,
-                "created": robot.created.strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            for robot in robots
-        ]
-
-        response = JsonResponse(robots_list, safe=False)
+        try:
+            robots = filter_robots(request.GET)
+        except ExportFilterError as fe:
+            return JsonResponse({"error": str(fe)}, status=400)
 
-        response["Content-Disposition"] = 'attachment; filename="robots.json"'
+        if request.GET.get("format") == "ndjson":
+            response = StreamingHttpResponse(
+                stream_ndjson(robots), content_type="application/x-ndjson"
+            )
+            response["Content-Disposition"] = 'attachment; filename="robots.ndjson"'
+        else:
+            response = StreamingHttpResponse(
+                stream_json_array(robots), content_type="application/json"
+            )
+            response["Content-Disposition"] = 'attachment; filename="robots.json"'
 
         return response
 
@@ -128,34 +357,120 @@ class RobotJson(View):
 class JsonView(View):
     template_name = "robots/json_view.html"
 
+    # stands for the JSON text in the rendered page, which is streamed in its place
+    json_placeholder = "ROBOTS_JSON_DATA"
+
     def get(self, request):
         """
         Processes GET requests to display a list of robots in JSON format on a web page.
 
+        Accepts the same filters as RobotJson. The page is streamed while
+        the robots are read from the database, so the whole table is never
+        loaded into memory, and a repeated load with a matching
+        ETag/Last-Modified gets 304 Not Modified.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            StreamingHttpResponse: Displays a page with JSON data of the robots.
+        """
+        try:
+            robots = filter_robots(request.GET)
+        except ExportFilterError as fe:
+            return JsonResponse({"error": str(fe)}, status=400)
+
+        version, modified = robots_version()
+        etag = view_etag(version, "json_view", request.GET)
+        last_modified = int(modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            page = render_to_string(
+                self.template_name, {"json_data": self.json_placeholder}, request
+            )
+            head, tail = page.split(self.json_placeholder)
+            response = StreamingHttpResponse(
+                chain(
+                    [head],
+                    (escape(part) for part in stream_indented_json(robots)),
+                    [tail],
+                ),
+                content_type="text/html; charset=utf-8",
+            )
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class RobotSummaryJson(View):
+    def get(self, request):
+        """
+        Processes GET requests to return the production summary in JSON format.
+
+        Query parameters:
+            start, end: Date window (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS),
+                the last seven days by default.
+            granularity: Optional "day", "week" or "month" grouping.
+
         Args:
             request: The request object.
 
         Returns:
-            HttpResponse: Displays a page with JSON data of the robots.
+            JsonResponse: The window and the counts per model and version.
         """
-        robots = Robot.objects.all()
-        robots_list = [
+        try:
+            start, end, granularity = window_from_params(request.GET)
+        except ExportFilterError as fe:
+            return JsonResponse({"error": str(fe)}, status=400)
+
+        rows = production_summary(start, end, granularity)
+        return JsonResponse(
             {
-                "model": robot.model,
-                "version": robot.version,
-                "created": robot.created.strftime("%Y-%m-%d %H:%M:%S"),
+                "start": start.strftime(DATE_FORMAT),
+                "end": end.strftime(DATE_FORMAT),
+                "granularity": granularity,
+                "rows": rows,
             }
-            for robot in robots
-        ]
-        json_data = json.dumps(robots_list, ensure_ascii=False, indent=4)
-        return render(request, self.template_name, {"json_data": json_data})
+        )
 
 
-# -------------------------------------------------------------------------------------------------------------
-"""Task 2."""
+class RobotSummaryView(View):
+    template_name = "robots/summary.html"
 
+    def get(self, request):
+        """
+        Processes GET requests to display the production summary on a web page.
 
-import pandas as pd
+        Accepts the same parameters as RobotSummaryJson.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            HttpResponse: Displays a page with the production summary table.
+        """
+        try:
+            start, end, granularity = window_from_params(request.GET)
+        except ExportFilterError as fe:
+            return JsonResponse({"error": str(fe)}, status=400)
+
+        rows = production_summary(start, end, granularity)
+        context = {
+            "start": start,
+            "end": end,
+            "granularity": granularity,
+            "rows": rows,
+            "total": sum(row["count"] for row in rows),
+            "report_formats": list(REPORT_FORMATS),
+        }
+        return render(request, self.template_name, context)
+
+
+# -------------------------------------------------------------------------------------------------------------
+"""Task 2."""
 
 
 class RobotExcel(View):
@@ -163,76 +478,248 @@ class RobotExcel(View):
         """
         Processes GET requests to generate and download an Excel file with a summary of robot production for the last week.
 
+        The workbook is built in memory, so simultaneous downloads do not share any file.
+        Both the counts and the built file are cached until the robots change,
+        and repeat downloads with a matching ETag/Last-Modified get 304 Not Modified.
+
         Args:
             request: Request object.
         Returns:
             HttpResponse: Excel file to download.
         """
-        robots_data = self.get_robots_data()
-        excel_file_path = self.create_excel_file(robots_data)
-        return self.send_excel_file(excel_file_path)
+        start_date, end_date = self.get_report_window()
+        version, modified = robots_version()
+        etag = report_etag(version, start_date, end_date)
+        # the window moves with time, so the report can change without new robots
+        last_modified = int(max(modified, end_date).timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            xlsx_key = report_key(version, start_date, end_date, "xlsx")
+            excel_file = cache.get(xlsx_key)
+            if excel_file is None:
+                robots_data = cache.get_or_set(
+                    report_key(version, start_date, end_date, "counts"),
+                    lambda: self.get_robots_data(start_date, end_date),
+                    REPORT_CACHE_TIMEOUT,
+                )
+                excel_file = self.create_excel_file(robots_data)
+                cache.set(xlsx_key, excel_file, REPORT_CACHE_TIMEOUT)
+            response = self.send_excel_file(excel_file)
 
-    def get_robots_data(self):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_report_window(self):
         """
-        Gets robot production data for the last week.
+        Gets the window of the weekly report.
+
+        The end of the window is truncated to the minute,
+        so all requests within a minute share the cached report.
 
         Returns:
-            dict: A dictionary containing data about robot models and versions.
+            tuple: Start and end of the window.
         """
-        end_date = datetime.now()
+        end_date = timezone.now().replace(second=0, microsecond=0)
         start_date = end_date - timedelta(days=7)
+        return start_date, end_date
 
-        robots = Robot.objects.filter(created__range=[start_date, end_date])
-        data = {}
-
-        for robot in robots:
-            model = robot.model
-            version = robot.version
-
-            if model not in data:
-                data[model] = {}
+    def get_robots_data(self, start_date, end_date):
+        """
+        Gets robot production data for the report window.
 
-            if version not in data[model]:
-                data[model][version] = 0
-            data[model][version] += 1
+        Args:
+            start_date (datetime): Start of the window.
+            end_date (datetime): End of the window.
 
-        return data
+        Returns:
+            dict: A dictionary containing data about robot models and versions.
+        """
+        return group_by_model(production_summary(start_date, end_date))
 
     def create_excel_file(self, data):
         """
         Creates an Excel file with a summary of robot production.
 
+        Every registered model gets a sheet, even without robots in the window
+        (see reports.weekly_workbook).
+
         Args:
             data (dict): Data about robot models and versions.
 
         Returns:
-            str: Path to the created Excel file.
+            bytes: Content of the created Excel file.
         """
-        excel_file_path = "robots.xlsx"
-        with pd.ExcelWriter(excel_file_path) as writer:
-            for model, versions in data.items():
-                df = pd.DataFrame(
-                    list(versions.items()), columns=["Версия", "Количество за неделю"]
-                )
-                df.insert(0, "Модель", model)
-                df.to_excel(writer, sheet_name=model, index=False)
-
-        return excel_file_path
+        return weekly_workbook(data)
 
-    def send_excel_file(self, file_path):
+    def send_excel_file(self, content):
         """
         Sends an Excel file to the user.
 
         Args:
-            file_path (str): Path to the Excel file.
+            content (bytes): Content of the Excel file.
 
         Returns:
             HttpResponse: Response with the file to download.
         """
-        with open(file_path, "rb") as f:
-            response = HttpResponse(
-                f.read(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        response = HttpResponse(
+            content,
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        response["Content-Disposition"] = "attachment; filename=robots.xlsx"
+        return response
+
+
+class RobotReport(View):
+    def get(self, request):
+        """
+        Processes GET requests to download a production report for any date range.
+
+        Query parameters:
+            start, end: Date range (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS),
+                the last seven days by default.
+            granularity: Optional "day", "week" or "month" breakdown.
+            format: "xlsx" (default), "csv", "json" or "parquet" (if pyarrow
+                is installed).
+
+        The report is written chunk by chunk into a temporary file,
+        which is then streamed to the client.
+
+        Args:
+            request: Request object.
+
+        Returns:
+            FileResponse: The report file, or a JSON error with status 400.
+        """
+        try:
+            spec = spec_from_params(request.GET)
+        except ReportError as re:
+            return JsonResponse({"error": str(re)}, status=400)
+
+        report = tempfile.TemporaryFile()
+        try:
+            write_report(spec, report)
+        except ReportError as re:
+            report.close()
+            return JsonResponse({"error": str(re)}, status=400)
+
+        report.seek(0)
+        return FileResponse(
+            report,
+            as_attachment=True,
+            filename=spec.filename,
+            content_type=spec.content_type,
+        )
+
+
+def report_job_data(request, job):
+    """
+    Builds the API representation of a report job.
+
+    Args:
+        request: Request object, used to build absolute links.
+        job (ReportJob): The job.
+
+    Returns:
+        dict: Status, progress, timestamps and the links to poll and download the job.
+    """
+    data = {
+        "id": job.pk,
+        "status": job.status,
+        "progress": job.progress,
+        "created": job.created,
+        "started": job.started,
+        "finished": job.finished,
+        "status_url": request.build_absolute_uri(
+            reverse("robots:report_job", args=[job.pk])
+        ),
+    }
+    if job.status == ReportJob.STATUS_DONE:
+        data["download_url"] = request.build_absolute_uri(
+            reverse("robots:report_job_download", args=[job.pk])
+        )
+    if job.status == ReportJob.STATUS_FAILED:
+        data["error"] = job.error
+    return data
+
+
+class ReportJobCreateView(View):
+    def post(self, request):
+        """
+        Processes POST requests to build a production report in the background.
+
+        Takes the parameters of RobotReport (start, end, granularity, format)
+        from the query string or the form body. An identical report that is
+        queued, running or already built is returned instead of a new job.
+
+        Args:
+            request: Request object.
+
+        Returns:
+            JsonResponse: The job with status 202 (queued or running) or 200 (built),
+                or a JSON error with status 400.
+        """
+        params = request.POST if request.POST else request.GET
+        try:
+            spec = spec_from_params(params)
+        except ReportError as re:
+            return JsonResponse({"error": str(re)}, status=400)
+
+        job, created = enqueue_report(spec)
+        if created:
+            logger.info(f"Report job {job.pk} queued")
+        data = report_job_data(request, job)
+        status = 200 if job.status == ReportJob.STATUS_DONE else 202
+        response = JsonResponse(data, status=status)
+        response["Location"] = data["status_url"]
+        return response
+
+
+class ReportJobView(View):
+    def get(self, request, pk):
+        """
+        Processes GET requests to poll a report job.
+
+        Args:
+            request: Request object.
+            pk (int): The job id.
+
+        Returns:
+            JsonResponse: The job, or status 404 if it does not exist (or has expired).
+        """
+        job = get_object_or_404(ReportJob, pk=pk)
+        return JsonResponse(report_job_data(request, job))
+
+
+class ReportJobDownload(View):
+    def get(self, request, pk):
+        """
+        Processes GET requests to download the report of a finished job.
+
+        Args:
+            request: Request object.
+            pk (int): The job id.
+
+        Returns:
+            FileResponse: The report file; a JSON error with status 409 if the
+                report is not built, 404 if the job or its file does not exist.
+        """
+        job = get_object_or_404(ReportJob, pk=pk)
+        if job.status != ReportJob.STATUS_DONE:
+            return JsonResponse(
+                {"error": "The report is not ready.", "status": job.status},
+                status=409,
             )
-            response["Content-Disposition"] = "attachment; filename=robots.xlsx"
-            return response
+        if not job.file or not job.file.storage.exists(job.file.name):
+            return JsonResponse({"error": "The report has expired."}, status=404)
+
+        spec = report_spec(job)
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=spec.filename,
+            content_type=spec.content_type,
+        )